@@ -0,0 +1,63 @@
+"""
+Leaf rendering benchmark: per-leaf ``Leaf.draw`` polygons vs. ``LeafAtlas`` blits.
+
+Runs headless under SDL's dummy video driver:
+
+    python benchmarks/leaf_draw.py --leaves 10 100 1000 --angles 16 64 256
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import giraffe_game as gg  # noqa: E402
+
+
+def make_leaves(count, seed=0):
+    rng = random.Random(seed)
+    leaves = []
+    for _ in range(count):
+        leaf = gg.Leaf(rng.randint(40, gg.WIDTH - 40), rng.uniform(0, gg.GROUND_Y), rng.random() < 0.25, 0.0)
+        leaf.angle = rng.uniform(0, math.tau)
+        leaves.append(leaf)
+    return leaves
+
+
+def time_per_frame(fn, repeat):
+    fn()  # warm up (builds the atlas on first call)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--leaves", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--angles", type=int, nargs="+", default=[gg.LEAF_ANGLE_STEPS])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    surf = gg.pygame.Surface((gg.WIDTH, gg.HEIGHT))
+    print(f"{'leaves':>7} {'polygon ms':>11} " + " ".join(f"{f'atlas/{n} ms':>13}" for n in args.angles))
+    for count in args.leaves:
+        leaves = make_leaves(count)
+
+        def polygons():
+            for leaf in leaves:
+                leaf.draw(surf)
+
+        row = [time_per_frame(polygons, args.repeat)]
+        for steps in args.angles:
+            atlas = gg.LeafAtlas(steps)
+            row.append(time_per_frame(lambda: atlas.draw(surf, leaves), args.repeat))
+        print(f"{count:>7} " + " ".join(f"{t * 1000:>11.3f}" if i == 0 else f"{t * 1000:>13.3f}" for i, t in enumerate(row)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Frame pacing of the blocking game loop against the asyncio one.
+
+Plays the real ``giraffe_game.game_loop`` under each driver (``run_blocking``
+and ``run_async``) with SDL's dummy video driver. The giraffe stands still;
+whenever a static screen comes up the script presses SPACE and R, so it plays
+round after round. Every round end saves a replay, exports the profile and
+submits the score to a local stand-in HTTP server that takes ``--latency``
+seconds to answer:
+
+    python benchmarks/pacing.py --frames 1200 --latency 0.2
+
+For each loop it prints the achieved frame rate, the spread of the intervals
+between gameplay frames, how many came later than 1.5 frame budgets, and the
+longest single frame (the blocking loop's round-end frame waits for the
+score server).
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def start_score_server(latency):
+    """A stand-in score server on a free local port; returns (server, list of received bodies)."""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            time.sleep(latency)
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, received
+
+
+def scripted(game, frames, pygame, log):
+    """Wrap ``game``: press SPACE and R on static screens, quit after ``frames`` frames.
+
+    Appends (start, duration, idle) for every frame to ``log``.
+    """
+    idle = next(game)
+    for _ in range(frames):
+        dt, events = yield idle
+        if idle:
+            events += [pygame.event.Event(pygame.KEYDOWN, key=key) for key in (pygame.K_SPACE, pygame.K_r)]
+        start = time.perf_counter()
+        idle = game.send((dt, events))
+        log.append((start, time.perf_counter() - start, idle))
+    try:
+        game.send((0.0, [pygame.event.Event(pygame.QUIT)]))
+    except StopIteration:
+        pass
+
+
+def measure(gg, pygame, use_async, frames, argv):
+    options = gg.parse_args(argv)
+    window = gg.Window()
+    clock = pygame.time.Clock()
+    log = []
+    if use_async:
+        jobs = gg.BackgroundJobs()
+        game = scripted(gg.game_loop(options, window, jobs), frames, pygame, log)
+        asyncio.run(gg.run_async(game, clock, options.fps, jobs))
+    else:
+        game = scripted(gg.game_loop(options, window), frames, pygame, log)
+        gg.run_blocking(game, clock, options.fps)
+    pygame.quit()
+
+    # Intervals between consecutive gameplay frames (none that follow a static screen)
+    intervals = sorted(b[0] - a[0] for a, b in zip(log, log[1:]) if not a[2] and not b[2])
+    budget = 1.0 / options.fps
+    rounds = sum(1 for a, b in zip(log, log[1:]) if not a[2] and b[2])
+    return {
+        "fps": 1.0 / statistics.fmean(intervals),
+        "p50": intervals[len(intervals) // 2] * 1000,
+        "p95": intervals[len(intervals) * 95 // 100] * 1000,
+        "p99": intervals[len(intervals) * 99 // 100] * 1000,
+        "max": intervals[-1] * 1000,
+        "late": sum(1 for t in intervals if t > 1.5 * budget),
+        "slowest": max(d for _, d, _ in log) * 1000,
+        "rounds": rounds,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=1200, help="frames per loop (default: %(default)s)")
+    parser.add_argument("--latency", type=float, default=0.2,
+                        help="seconds the score server takes to answer (default: %(default)s)")
+    parser.add_argument("--fps", type=int, default=60)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    import pygame
+    import giraffe_game as gg
+
+    server, received = start_score_server(args.latency)
+    url = f"http://127.0.0.1:{server.server_address[1]}/scores"
+    print(f"{'loop':<10}{'fps':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'late':>6}"
+          f"{'slowest frame ms':>18}{'rounds':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for use_async in (False, True):
+            argv = ["--fps", str(args.fps), "--seed", "1", "--submit-url", url,
+                    "--record", os.path.join(tmp, "run.grec"), "--profile-out", os.path.join(tmp, "profile.json")]
+            r = measure(gg, pygame, use_async, args.frames, argv)
+            print(f"{'async' if use_async else 'blocking':<10}{r['fps']:>7.1f}{r['p50']:>9.2f}{r['p95']:>9.2f}"
+                  f"{r['p99']:>9.2f}{r['max']:>9.2f}{r['late']:>6}{r['slowest']:>18.1f}{r['rounds']:>8}")
+    server.shutdown()
+    print(f"{len(received)} scores received")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Cost of a whole gameplay frame at each visual quality level.
+
+One frame is what the game loop does with a ``FullFrameRenderer`` at that
+level: restore the background, draw leaves, giraffe and HUD, then present.
+Runs under SDL's dummy video driver, so the numbers are the CPU side only:
+
+    python benchmarks/quality.py --leaves 100 1000 3000
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from suite import make_state, time_per_call  # noqa: E402
+
+
+def frame_cost(gg, quality, leaves, min_time, scale=1.0):
+    """Seconds per frame drawn and presented at ``quality``."""
+    window = gg.Window(scale)
+    state = make_state(gg, leaves)
+    atlas = gg.LeafAtlas(scale=scale) if quality.fancy_leaves else gg.LeafAtlas(1, scale, outline=False)
+    timer_digits = gg.GlyphStrip(gg.get_font(gg.FONT_SIZE, scale), gg.DARK)
+    renderer = gg.FullFrameRenderer(window.canvas, gg.render_background(scale), window)
+
+    def frame():
+        renderer.clear()
+        renderer.present(gg.draw_frame(window.canvas, state, atlas, timer_digits, None, scale, quality))
+
+    return time_per_call(frame, min_time)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--leaves", type=int, nargs="+", default=[100, 1000, 3000])
+    parser.add_argument("--render-scale", type=float, default=1.0)
+    parser.add_argument("--min-time", type=float, default=0.3)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    import giraffe_game as gg
+
+    print(f"ms per frame at render scale {args.render_scale:g}")
+    print(f"{'leaves':<8}" + "".join(f"{q.name:>10}" for q in gg.QUALITY_LEVELS))
+    for leaves in args.leaves:
+        costs = [frame_cost(gg, q, leaves, args.min_time, args.render_scale) for q in gg.QUALITY_LEVELS]
+        print(f"{leaves:<8}" + "".join(f"{c * 1000:>10.2f}" for c in costs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Cost of a whole gameplay frame at several render scales and window sizes.
+
+One frame is what the game loop does with a ``FullFrameRenderer``: restore
+the background and draw leaves, giraffe and HUD onto the ``Window`` canvas
+("draw"), then present it, scaling the canvas to the window when their sizes
+differ ("present"). Runs under SDL's dummy video driver, so the numbers are
+the CPU side only:
+
+    python benchmarks/render_scale.py --scales 1 0.75 0.5 --windows 1000x700 1920x1080
+    python benchmarks/render_scale.py --sdl-scaled    # SDL scales instead of pygame.transform
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from suite import make_state, time_per_call  # noqa: E402
+
+
+def frame_cost(gg, scale, size, leaves, min_time, sdl_scaled=False):
+    """(draw, present) seconds per frame."""
+    window = gg.Window(scale, size, sdl_scaled=sdl_scaled)
+    state = make_state(gg, leaves)
+    atlas = gg.LeafAtlas(scale=scale)
+    timer_digits = gg.GlyphStrip(gg.get_font(gg.FONT_SIZE, scale), gg.DARK)
+    renderer = gg.FullFrameRenderer(window.canvas, gg.render_background(scale), window)
+
+    def draw():
+        renderer.clear()
+        return gg.draw_frame(window.canvas, state, atlas, timer_digits, None, scale)
+
+    dirty = draw()
+    return time_per_call(draw, min_time), time_per_call(lambda: renderer.present(dirty), min_time)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0, 0.75, 0.5])
+    parser.add_argument("--windows", nargs="+", default=["1000x700", "1920x1080"])
+    parser.add_argument("--leaves", type=int, default=100)
+    parser.add_argument("--min-time", type=float, default=0.3)
+    parser.add_argument("--sdl-scaled", action="store_true", help="open the windows with pygame.SCALED")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    import giraffe_game as gg
+
+    sizes = [gg.window_size(w) for w in args.windows]
+    print(f"ms per frame (draw + present), {args.leaves} leaves")
+    print(f"{'window':<12}" + "".join(f"{f'scale {s:g}':>20}" for s in args.scales))
+    for size in sizes:
+        cells = []
+        for scale in args.scales:
+            draw, present = frame_cost(gg, scale, size, args.leaves, args.min_time, args.sdl_scaled)
+            cells.append(f"{draw * 1000:.2f} + {present * 1000:.2f}")
+        print(f"{'%dx%d' % size:<12}" + "".join(f"{c:>20}" for c in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Start-up time: from importing giraffe_game to the first presented frame.
+
+Runs ``giraffe_game.py --startup-time`` in fresh processes under SDL's dummy
+video driver, once with an empty font cache (the system font scan runs) and
+then with the cache filled by that first run:
+
+    python benchmarks/startup.py --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIELDS = ("import", "display", "first_frame", "font_lookup")
+
+
+def measure(cache_home):
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1", XDG_CACHE_HOME=cache_home)
+    out = subprocess.run([sys.executable, os.path.join(ROOT, "giraffe_game.py"), "--startup-time"],
+                         env=env, capture_output=True, text=True, check=True).stdout
+    for line in out.splitlines():
+        if line.startswith("startup "):
+            return json.loads(line[len("startup "):])
+    raise RuntimeError(f"no startup line in output: {out!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="warm-cache runs (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as cache_home:
+        cold = measure(cache_home)
+        warm = [measure(cache_home) for _ in range(args.runs)]
+
+    print(f"{'ms since import':<16}" + "".join(f"{name:>13}" for name in FIELDS))
+    print(f"{'cold font cache':<16}" + "".join(f"{cold[name]:>13.1f}" for name in FIELDS))
+    print(f"{'warm (median)':<16}" + "".join(f"{statistics.median(r[name] for r in warm):>13.1f}"
+                                            for name in FIELDS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Per-frame cost of the simulation and rendering hot paths at several leaf counts.
+
+Each phase is timed the way one frame of the game runs it: leaf update,
+swept head collision and ground check (as in ``giraffe_sim.step``, and with an
+``ImpactQueue``), ``Leaf.draw`` polygons, the ``LeafAtlas`` blit the game
+actually uses, a burst and a full pool of particles, ``Giraffe.draw`` and
+the HUD, plus the cheaper leaves and giraffe of the lower quality levels
+(``*_low``) and ``GameState.snapshot``/``restore``. With NumPy installed the
+``LeafPool`` versions of the three simulation phases and of snapshot/restore
+are timed too. Runs headless under SDL's dummy video driver:
+
+    python benchmarks/suite.py --out baseline.json
+    python benchmarks/suite.py --compare baseline.json      # exit 1 on regressions
+
+Results are microseconds per frame, keyed by phase and then leaf count.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_COUNTS = (10, 100, 1000, 10000)
+
+
+def make_state(gg, count, seed=0):
+    """A game state with ``count`` live leaves spread over the sky."""
+    rng = random.Random(seed)
+    state = gg.GameState(giraffe_cls=gg.Giraffe, leaf_cls=gg.Leaf, seed=seed)
+    for _ in range(count):
+        leaf = gg.Leaf(rng.randint(40, gg.WIDTH - 40), rng.uniform(0, gg.GROUND_Y), rng.random() < 0.25,
+                       rng.uniform(120, 420), rng)
+        leaf.angle = rng.uniform(0, math.tau)
+        state.leaves.append(leaf)
+    state.elapsed = 83.4
+    state.score = 157
+    return state
+
+
+def make_pool(state):
+    from giraffe_leafpool import LeafPool
+
+    pool = LeafPool(len(state.leaves))
+    for leaf in state.leaves:
+        pool.spawn(leaf.x, leaf.y, leaf.rotten, 0.0)
+        pool.fall_speed[pool.n - 1] = leaf.fall_speed
+    return pool
+
+
+def phases(gg, state, surf):
+    """Name -> zero-argument callable doing one frame's worth of that phase.
+
+    The simulation phases mirror ``giraffe_sim._advance_leaf_list`` but leave
+    the state untouched, so every repetition sees the same leaves.
+    """
+    sim = gg.giraffe_sim
+    leaves = state.leaves
+    hx, hy = state.giraffe.head_pos()
+    dt = 1.0 / sim.SIM_HZ
+    atlas = gg.LeafAtlas()
+    flat_atlas = gg.LeafAtlas(1, outline=False)
+    timer_digits = gg.GlyphStrip(gg.get_font(), gg.DARK)
+    step_dt = [dt]
+    snap = state.snapshot()
+
+    def leaf_update():
+        # Alternate the sign of dt so the leaves stay where they are.
+        step_dt[0] = d = -step_dt[0]
+        for leaf in leaves:
+            leaf.update(d)
+
+    # The head walking right for one step, swept against each leaf's fall as step does
+    x0 = hx - sim.MOVE_SPEED_START * dt
+
+    def collision():
+        return [leaf for leaf in leaves if not leaf.swept_by(x0, hy, hx, hy, sim.HEAD_RADIUS, dt)]
+
+    def ground_check():
+        return [leaf for leaf in leaves if leaf.y + leaf.h / 2 >= sim.GROUND_Y]
+
+    impacts = sim.ImpactQueue()
+    for leaf in leaves:
+        impacts.insert(leaf)
+    # A pool filled to capacity by leaves eaten all over the sky
+    particles = gg.ParticlePool()
+    for leaf in leaves[:particles.capacity]:
+        particles.eaten(leaf)
+    while particles.count < particles.capacity:
+        particles.landed(leaves[0])
+    particle_sprites = gg.ParticleSprites(particles)
+
+    def leaf_draw():
+        for leaf in leaves:
+            leaf.draw(surf)
+
+    table = {
+        "leaf_update": leaf_update,
+        "collision": collision,
+        "ground_check": ground_check,
+        # A step on which no leaf is due; leaves already on the ground are popped by the first call.
+        "ground_queue": lambda: impacts.advance(0.0),
+        "leaf_draw": leaf_draw,
+        "leaf_atlas": lambda: atlas.draw(surf, leaves),
+        "giraffe_draw": lambda: state.giraffe.draw(surf),
+        "hud": lambda: gg.draw_hud(surf, state, timer_digits),
+        "leaf_atlas_low": lambda: flat_atlas.draw(surf, leaves),
+        "particle_burst": lambda: particles.burst(gg.EAT, 500.0, 300.0),
+        "particle_draw": lambda: particle_sprites.draw(surf),
+        "giraffe_draw_low": lambda: state.giraffe.draw(surf, fancy=False),
+        "snapshot": state.snapshot,
+        # restore() swaps in new leaf objects; the phases above keep the old, identical ones.
+        "restore": lambda: state.restore(snap),
+    }
+
+    try:
+        pool = make_pool(state)
+    except ImportError:
+        return table
+
+    pool_snap = pool.snapshot()
+
+    def pool_update():
+        step_dt[0] = d = -step_dt[0]
+        pool.update(d)
+
+    table.update({
+        "pool_update": pool_update,
+        # eat() removes what it hits; the benchmark head sits where nothing is.
+        "pool_collision": lambda: pool.eat(-1000.0, -1000.0, sim.HEAD_RADIUS),
+        "pool_ground_check": lambda: pool.land(sim.GROUND_Y + 1000),
+        "pool_snapshot": pool.snapshot,
+        "pool_restore": lambda: pool.restore(pool_snap),
+    })
+    return table
+
+
+def time_per_call(fn, min_time, rounds=5):
+    """Best-of-``rounds`` mean seconds per call, each round lasting about ``min_time``."""
+    fn()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        took = time.perf_counter() - start
+        if took >= min_time / rounds or number >= 1 << 20:
+            break
+        number *= 2
+    best = took / number
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def run_suite(counts=DEFAULT_COUNTS, only=None, min_time=0.2, log=None):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    import giraffe_game as gg
+
+    surf = gg.pygame.Surface((gg.WIDTH, gg.HEIGHT))
+    results = {}
+    for count in counts:
+        state = make_state(gg, count)
+        for name, fn in phases(gg, state, surf).items():
+            if only and name not in only:
+                continue
+            us = time_per_call(fn, min_time) * 1e6
+            results.setdefault(name, {})[str(count)] = round(us, 3)
+            if log:
+                log(f"{name:>18} {count:>6} leaves {us:>12.2f} us")
+    return {"meta": environment(gg), "results": results}
+
+
+def environment(gg):
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pygame": gg.pygame.version.ver,
+        "numpy": numpy_version,
+        "video_driver": os.environ.get("SDL_VIDEODRIVER"),
+    }
+
+
+def compare(baseline, current, threshold=0.25, min_delta_us=2.0):
+    """Rows of (phase, count, baseline_us, current_us, ratio, regressed) for results in both runs.
+
+    A row regresses when it is more than ``threshold`` slower *and* more than
+    ``min_delta_us`` slower, so timer noise on sub-microsecond phases is not flagged.
+    """
+    rows = []
+    for name, by_count in current["results"].items():
+        for count, us in by_count.items():
+            base = baseline["results"].get(name, {}).get(count)
+            if base is None:
+                continue
+            ratio = us / base if base else math.inf
+            regressed = ratio > 1 + threshold and us - base > min_delta_us
+            rows.append((name, count, base, us, ratio, regressed))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--leaves", type=int, nargs="+", default=list(DEFAULT_COUNTS))
+    parser.add_argument("--only", nargs="+", metavar="PHASE", help="time only these phases")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds spent timing each phase")
+    parser.add_argument("--out", help="write results as JSON to this file ('-' for stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON from an earlier --out run")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="flag phases more than this fraction slower than the baseline")
+    args = parser.parse_args(argv)
+
+    log = None if args.out == "-" else print
+    report = run_suite(args.leaves, args.only, args.min_time, log)
+
+    if args.out == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.out}")
+
+    if not args.compare:
+        return 0
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    rows = compare(baseline, report, args.threshold)
+    regressions = [row for row in rows if row[5]]
+    print(f"\n{'phase':>18} {'leaves':>6} {'baseline us':>12} {'now us':>12} {'ratio':>7}")
+    for name, count, base, us, ratio, regressed in rows:
+        print(f"{name:>18} {count:>6} {base:>12.2f} {us:>12.2f} {ratio:>7.2f}" + ("  REGRESSION" if regressed else ""))
+    print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%} against {args.compare}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
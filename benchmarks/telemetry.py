@@ -0,0 +1,107 @@
+"""
+Telemetry file size and speed: the binary format against JSON lines.
+
+Plays ``--frames`` headless frames with ``--leaves`` leaves falling, logging
+each one with ``TelemetryWriter`` and as one JSON object per line, then
+times reading a random frame, a score column over every frame and the
+leaves of a 1,000-frame range back from each. Needs NumPy for reading:
+
+    python benchmarks/telemetry.py --frames 20000 --leaves 20 200
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import giraffe_sim as sim  # noqa: E402
+from suite import make_state  # noqa: E402
+from giraffe_telemetry import TelemetryReader, TelemetryWriter, record_dtypes  # noqa: E402
+
+
+def _states(frames, leaves):
+    """Yield a state with ``leaves`` leaves falling, once per frame."""
+    state = make_state(sim, leaves)
+    for frame in range(frames):
+        for leaf in state.leaves:
+            leaf.update(1 / 60)
+            if leaf.y > sim.GROUND_Y:
+                leaf.y = 0.0
+        state.elapsed += 1 / 60
+        state.score = frame // 60
+        yield state
+
+
+def _json_line(state, dt, inputs):
+    g = state.giraffe
+    return json.dumps({"inputs": inputs, "dt": dt, "elapsed": state.elapsed, "score": state.score,
+                       "base_x": g.base_x, "head_offset": g.head_offset, "neck": g.neck,
+                       "leaves": [[leaf.x, leaf.y, leaf.angle, leaf.rotten] for leaf in state.leaves]}) + "\n"
+
+
+def compare(frames, leaves, tmp):
+    binary, text = os.path.join(tmp, "run.gtel"), os.path.join(tmp, "run.jsonl")
+    start = time.perf_counter()
+    with TelemetryWriter(binary) as writer:
+        for state in _states(frames, leaves):
+            writer.append(state, 1 / 60, 0)
+    write_binary = time.perf_counter() - start
+    # the simulation's own share of that, to subtract from both
+    start = time.perf_counter()
+    for _ in _states(frames, leaves):
+        pass
+    sim_time = time.perf_counter() - start
+    start = time.perf_counter()
+    with open(text, "w") as f:
+        for state in _states(frames, leaves):
+            f.write(_json_line(state, 1 / 60, 0))
+    write_text = time.perf_counter() - start
+
+    picks = random.Random(0).sample(range(frames), 100)
+    start = time.perf_counter()
+    with TelemetryReader(binary) as reader:
+        for i in picks:
+            reader.frame(i)[1]["x"].sum()
+        scores = reader.frames()["score"]
+        in_range = len(reader.leaves(frames // 2, frames // 2 + 1000))
+    read_binary = time.perf_counter() - start
+    start = time.perf_counter()
+    with open(text) as f:
+        rows = [json.loads(line) for line in f]
+    for i in picks:
+        sum(leaf[0] for leaf in rows[i]["leaves"])
+    assert [row["score"] for row in rows] == scores.tolist()
+    assert sum(len(row["leaves"]) for row in rows[frames // 2:frames // 2 + 1000]) == in_range
+    read_text = time.perf_counter() - start
+
+    us = 1e6 / frames
+    return [
+        ("bytes per frame", os.path.getsize(binary) / frames, os.path.getsize(text) / frames),
+        ("write us per frame", (write_binary - sim_time) * us, (write_text - sim_time) * us),
+        ("open + read ms", read_binary * 1000, read_text * 1000),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=20_000)
+    parser.add_argument("--leaves", type=int, nargs="+", default=[20, 200])
+    args = parser.parse_args(argv)
+    record_dtypes()  # loads NumPy up front, so the first read is not charged for the import
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for leaves in args.leaves:
+            print(f"{args.frames} frames, {leaves} leaves")
+            print(f"  {'':<20}{'binary':>10}{'json':>10}")
+            for name, binary, text in compare(args.frames, leaves, tmp):
+                print(f"  {name:<20}{binary:>10.1f}{text:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
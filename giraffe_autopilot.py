@@ -0,0 +1,378 @@
+"""
+Real-time autopilot: plans intercepts for the green leaves and dodges rotten ones.
+
+Leaves fall straight down at a constant speed, so the moment a leaf spawns
+it is known where it will be at any later time. ``Autopilot`` orders the
+green leaves into a catch plan: for each leaf, the earliest time the body
+can be under it and the head at its height, walking and moving the head no
+faster than the current ``move_speed``/``head_speed`` allow, starting from
+where the previous catch left the giraffe. It steers for the first catch of
+the plan and keeps the head's next few frames clear of rotten leaves.
+
+Planning is incremental and bounded. The plan is re-checked every frame
+(cheap, one pass over it) but only searched again when a green leaf spawns
+or the current order stops working, and a search gives up after ``budget``
+seconds or ``max_nodes`` partial orders, keeping the best plan found so far.
+
+At default difficulty the games it loses are nearly all decided when a leaf
+spawns: a short neck only meets a leaf in the last moments of its fall, so
+green leaves that land close together but far apart cannot all be caught
+in any order. The tests pin that, and its margin over ``giraffe_sweep.chase``.
+
+It is a ``policy(state) -> inputs`` for ``giraffe_sim.run``, plays the
+windowed game with ``--autopilot`` and sweeps with ``giraffe_sweep.py
+--policy autopilot``. Run on its own it is a soak test that reports how
+long its games last and how long each frame's planning took:
+
+    python giraffe_autopilot.py --games 20
+    python giraffe_autopilot.py --games 5 --set SPAWN_PER_SEC_CAP=12 --set SPAWN_ACCEL=0.5
+
+It needs the list leaf store (not a ``LeafPool``). Like giraffe_sim, this
+module does not import pygame.
+"""
+import argparse
+import math
+import statistics
+import sys
+import time
+
+import giraffe_sim as sim
+
+# How close the body and the head must get to a leaf to count as catching it;
+# the head circle and leaf box actually overlap a little beyond both.
+REACH = 20.0
+HEAD_TOL = 16.0
+# A catch planned later than this before the leaf lands is too late.
+LAND_MARGIN = 1.0 / 60
+# Movement within this of a target is not worth a key press.
+DEADBAND = 2.0
+# Share of the budget a plan search may use; steering and dodging take the rest.
+SEARCH_SHARE = 0.8
+# Rotten leaves are avoided over this many seconds ahead, in frames of 1/60 s.
+DODGE_FRAMES = 12
+DODGE_MARGIN = 3.0
+
+
+def _deadline(leaf):
+    """Seconds until ``leaf`` lands."""
+    return (sim.GROUND_Y - sim.LEAF_H / 2 - leaf.y) / leaf.fall_speed
+
+
+def catch(leaf, t, x, h, neck, move_speed, head_speed, deadline=None):
+    """Earliest way to catch ``leaf`` with the body at ``x`` and the head ``h`` above the ground at time ``t``.
+
+    Times are seconds from now. Returns (time, body x, head offset) of the
+    catch, or None if the leaf lands first (``deadline``, when known) or the
+    head cannot meet it.
+    """
+    v = leaf.fall_speed
+    o = sim.GROUND_Y - leaf.y - v * t  # the leaf's height above the ground at ``t``
+    away = abs(leaf.x - x) - REACH
+    t_body = t + away / move_speed if away > 0 else t
+    gap = o - h
+    if gap > HEAD_TOL:
+        # Above the head: rise to meet it, but no higher than the neck
+        lo = max((gap - HEAD_TOL) / (v + head_speed), (o - neck - HEAD_TOL) / v)
+    elif gap < -HEAD_TOL:
+        # Below: the head has to chase it down
+        if head_speed <= v:
+            return None
+        lo = (-gap - HEAD_TOL) / (head_speed - v)
+    else:
+        lo = 0.0
+    # A leaf falling faster than the head moves gets away from it eventually
+    hi = (gap + HEAD_TOL) / (v - head_speed) if v > head_speed else math.inf
+    when = max(t_body, t + lo)
+    if deadline is None:
+        deadline = _deadline(leaf)
+    if when > t + hi or when > deadline - LAND_MARGIN:
+        return None
+    if away > 0:
+        x = leaf.x - REACH if leaf.x > x else leaf.x + REACH
+    return when, x, sim.clamp(o - v * (when - t), 20.0, neck)
+
+
+def _after_catch(h, neck):
+    """(head offset, neck) once a green leaf is eaten: the neck grows and the head keeps its place on it."""
+    grown = sim.clamp(neck + sim.NECK_GROW, sim.NECK_MIN, sim.NECK_CAP)
+    return sim.clamp(h * grown / neck, 20.0, grown), grown
+
+
+def _head_hits(hx, hy, leaf, t):
+    y = leaf.y + leaf.fall_speed * t
+    half_w, half_h = leaf.w / 2, leaf.h / 2
+    dx = hx - min(max(hx, leaf.x - half_w), leaf.x + half_w)
+    dy = hy - min(max(hy, y - half_h), y + half_h)
+    reach = sim.HEAD_RADIUS + DODGE_MARGIN
+    return dx * dx + dy * dy <= reach * reach
+
+
+class Autopilot:
+    """Catch-planning policy; call it with a ``GameState`` once per step to get that step's inputs.
+
+    One instance can play game after game: a new state (or a reset one) starts
+    a new plan. ``budget`` caps a plan search in seconds of wall-clock time
+    (None: no cap, so play is reproducible) and ``max_nodes`` in partial
+    orders tried; ``horizon`` is how many of the soonest-landing green leaves
+    are ordered by the search (the rest follow in landing order).
+
+    Per-call cost is kept in ``calls``, ``total``, ``worst`` (seconds) and
+    ``over_budget`` (calls that took longer than ``budget``); ``searches``
+    counts the plan searches run.
+    """
+
+    def __init__(self, budget=0.0005, max_nodes=2000, horizon=6):
+        self.budget = budget
+        self.max_nodes = max_nodes
+        self.horizon = horizon
+        self.calls = 0
+        self.total = 0.0
+        self.worst = 0.0
+        self.over_budget = 0
+        self.searches = 0
+        self._state = None
+        self._started = None
+        self._elapsed = 0.0
+        self._known = set()
+        self._plan = []
+
+    def __call__(self, state):
+        start = self._started = time.perf_counter()
+        inputs = self.steer(state)
+        took = time.perf_counter() - start
+        self.calls += 1
+        self.total += took
+        if took > self.worst:
+            self.worst = took
+        if self.budget is not None and took > self.budget:
+            self.over_budget += 1
+        return inputs
+
+    def steer(self, state):
+        """The inputs for this step (``__call__`` without the timing)."""
+        if self._started is None:
+            self._started = time.perf_counter()
+        if state is not self._state or state.elapsed < self._elapsed:
+            self._state = state
+            self._known = set()
+            self._plan = []
+        self._elapsed = state.elapsed
+        _, _, move_speed, head_speed = sim.difficulty(state.elapsed)
+        giraffe = state.giraffe
+
+        greens = [leaf for leaf in state.leaves if not leaf.rotten]
+        live = set(greens)
+        spawned = not live <= self._known
+        self._known = live
+        plan = [leaf for leaf in self._plan if leaf in live]
+        first = None
+        pose = (giraffe.base_x, giraffe.head_offset, giraffe.neck)
+        if not spawned and plan:
+            first = catch(plan[0], 0.0, *pose, move_speed, head_speed)
+            works = len(self._walk(plan, 0.0, *pose, move_speed, head_speed)) == min(len(plan), self.horizon)
+            if first is not None and not works:
+                first = None  # the order no longer works out
+        if first is None and greens:
+            plan = self._search(greens, giraffe, move_speed, head_speed)
+            if plan:
+                first = catch(plan[0], 0.0, *pose, move_speed, head_speed)
+        self._plan = plan
+
+        if first is not None:
+            _, x, h = first
+        elif plan:
+            # Cannot be caught any more; go for it anyway
+            x, h = plan[0].x, 20.0
+        else:
+            # Nothing to catch: wait mid-field with the head halfway up
+            x, h = sim.WIDTH / 2, giraffe.neck / 2
+        inputs = 0
+        if x - giraffe.base_x > DEADBAND:
+            inputs |= sim.INPUT_RIGHT
+        elif x - giraffe.base_x < -DEADBAND:
+            inputs |= sim.INPUT_LEFT
+        if h - giraffe.head_offset > DEADBAND:
+            inputs |= sim.INPUT_UP
+        elif h - giraffe.head_offset < -DEADBAND:
+            inputs |= sim.INPUT_DOWN
+        self._started = None
+        return self._dodge(state, inputs, move_speed, head_speed)
+
+    def _walk(self, plan, t, x, h, neck, move_speed, head_speed):
+        """The catches of ``plan`` from (``t``, ``x``, ``h``, ``neck``) in order, up to the first one that fails."""
+        catches = []
+        for leaf in plan[:self.horizon]:
+            c = catch(leaf, t, x, h, neck, move_speed, head_speed)
+            if c is None:
+                break
+            catches.append(c)
+            t, x, h = c
+            h, neck = _after_catch(h, neck)
+        return catches
+
+    def _search(self, greens, giraffe, move_speed, head_speed):
+        """Best catch order found within the budget.
+
+        A green leaf that is not caught ends the game, so orders are ranked by
+        when the first leaf they leave out lands (never, ideally), then by how
+        soon their last catch is done. Depth-first over the ``horizon``
+        soonest-landing leaves, trying them in landing order at every level,
+        so the first complete order is the earliest-deadline-first plan and
+        the budget only cuts improvements.
+        """
+        self.searches += 1
+        deadlines = {leaf: _deadline(leaf) for leaf in greens}
+        order = sorted(greens, key=deadlines.__getitem__)
+        near, rest = order[:self.horizon], order[self.horizon:]
+        stop = None if self.budget is None else self._started + self.budget * SEARCH_SHARE
+        best = [[], -math.inf, math.inf]  # plan, when its first missed leaf lands, time of its last catch
+        nodes = 0
+
+        def extend(prefix, remaining, t, x, h, neck):
+            nonlocal nodes
+            nodes += 1
+            grew = False
+            for i, leaf in enumerate(remaining):
+                if nodes >= self.max_nodes or (stop is not None and time.perf_counter() > stop):
+                    break
+                if best[1] == math.inf and t >= best[2]:
+                    break  # cannot finish sooner than a plan that already catches everything
+                c = catch(leaf, t, x, h, neck, move_speed, head_speed, deadlines[leaf])
+                if c is None:
+                    continue
+                grew = True
+                h2, neck2 = _after_catch(c[2], neck)
+                extend(prefix + [leaf], remaining[:i] + remaining[i + 1:], c[0], c[1], h2, neck2)
+            if not grew:
+                survives = min(map(deadlines.__getitem__, remaining), default=math.inf)
+                if (survives, -t) > (best[1], -best[2]):
+                    best[:] = [prefix, survives, t]
+
+        extend([], near, 0.0, giraffe.base_x, giraffe.head_offset, giraffe.neck)
+        planned = best[0]
+        return planned + [leaf for leaf in near if leaf not in planned] + rest
+
+    def _dodge(self, state, inputs, move_speed, head_speed):
+        """``inputs``, or the closest alternative, that keeps the head off rotten leaves for the next frames."""
+        giraffe = state.giraffe
+        hx, hy = giraffe.head_pos()
+        ahead = DODGE_FRAMES / 60
+        x_reach = move_speed * ahead + sim.HEAD_RADIUS + sim.LEAF_W
+        threats = [leaf for leaf in state.leaves if leaf.rotten and abs(leaf.x - hx) < x_reach
+                   and -sim.HEAD_RADIUS - sim.LEAF_H - head_speed * ahead
+                   < hy - leaf.y < leaf.fall_speed * ahead + head_speed * ahead + sim.HEAD_RADIUS + sim.LEAF_H]
+        if not threats:
+            return inputs
+        horizontal = inputs & (sim.INPUT_LEFT | sim.INPUT_RIGHT)
+        vertical = inputs & (sim.INPUT_UP | sim.INPUT_DOWN)
+        h_options = [horizontal] + [o for o in (0, sim.INPUT_LEFT, sim.INPUT_RIGHT) if o != horizontal]
+        v_options = [vertical] + [o for o in (0, sim.INPUT_UP, sim.INPUT_DOWN) if o != vertical]
+        for h_bits in h_options:
+            for v_bits in v_options:
+                candidate = h_bits | v_bits
+                if not self._collides(giraffe, candidate, threats, move_speed, head_speed):
+                    return candidate
+        return inputs
+
+    @staticmethod
+    def _collides(giraffe, inputs, threats, move_speed, head_speed):
+        vx = move_speed * ((inputs & sim.INPUT_RIGHT != 0) - (inputs & sim.INPUT_LEFT != 0))
+        vh = head_speed * ((inputs & sim.INPUT_UP != 0) - (inputs & sim.INPUT_DOWN != 0))
+        for frame in range(1, DODGE_FRAMES + 1):
+            t = frame / 60
+            hx = sim.clamp(giraffe.base_x + vx * t, 60, sim.WIDTH - 60)
+            hy = giraffe.base_y - sim.clamp(giraffe.head_offset + vh * t, 20.0, giraffe.neck)
+            for leaf in threats:
+                if _head_hits(hx, hy, leaf, t):
+                    return True
+        return False
+
+
+# ----------------------------
+# Soak runs
+# ----------------------------
+
+def soak(games, max_time=300.0, seed=0, hz=sim.SIM_HZ, budget=0.0005):
+    """Play ``games`` seeded games with one ``Autopilot``; returns (results, timings, pilot).
+
+    ``results`` holds (elapsed, score, capped) per game, like ``giraffe_sweep.play``.
+    ``timings`` holds the seconds each pilot call took, and ``pilot`` is the
+    ``Autopilot`` itself, so callers can read its call and budget counters.
+    """
+    pilot = Autopilot(budget)
+    timings = []
+    results = []
+    perf_counter = time.perf_counter
+    for game_seed in range(seed, seed + games):
+        state = sim.GameState(seed=game_seed)
+        for _ in range(int(max_time * hz)):
+            start = perf_counter()
+            inputs = pilot(state)
+            timings.append(perf_counter() - start)
+            sim.step(state, inputs, 1.0 / hz)
+            if state.game_over:
+                break
+        results.append((state.elapsed, state.score, not state.game_over))
+    return results, timings, pilot
+
+
+def format_latency(timings, budget):
+    ordered = sorted(timings)
+    n = len(ordered)
+
+    def q(p):
+        return ordered[min(n - 1, p * n // 100)] * 1e6
+
+    over = sum(1 for t in ordered if budget is not None and t > budget)
+    return (f"planner us per step: p50 {q(50):.1f}  p99 {q(99):.1f}  p99.9 {ordered[min(n - 1, n * 999 // 1000)] * 1e6:.1f}"
+            f"  max {ordered[-1] * 1e6:.1f}  ({over} of {n} steps over the {budget * 1e6:.0f} us budget)"
+            if budget is not None else
+            f"planner us per step: p50 {q(50):.1f}  p99 {q(99):.1f}  max {ordered[-1] * 1e6:.1f}")
+
+
+def main(argv=None):
+    from giraffe_sweep import overridden, parse_set
+
+    parser = argparse.ArgumentParser(description="Soak-test the autopilot over headless games.")
+    parser.add_argument("--games", type=int, default=20, help="games to play (default: %(default)s)")
+    parser.add_argument("--max-time", type=float, default=300.0,
+                        help="stop a game after this many simulated seconds (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="first game seed (default: %(default)s)")
+    parser.add_argument("--sim-hz", type=int, default=sim.SIM_HZ, help="simulation tick rate (default: %(default)s)")
+    parser.add_argument("--budget-us", type=float, default=500.0,
+                        help="planning budget per step in microseconds (default: %(default)s)")
+    parser.add_argument("--set", type=parse_set, action="append", default=[], metavar="NAME=VALUE",
+                        help="override a giraffe_sim constant, e.g. SPAWN_PER_SEC_CAP=12 (repeatable)")
+    args = parser.parse_args(argv)
+    if args.games < 1:
+        parser.error("--games must be at least 1")
+
+    params = {}
+    for name, values in args.set:
+        if len(values) != 1:
+            parser.error(f"--set {name} takes one value here")
+        params[name] = values[0]
+    budget = args.budget_us / 1e6
+    try:
+        with overridden(params):
+            start = time.perf_counter()
+            results, timings, pilot = soak(args.games, args.max_time, args.seed, args.sim_hz, budget)
+            took = time.perf_counter() - start
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    elapsed = [r[0] for r in results]
+    scores = [r[1] for r in results]
+    capped = sum(1 for r in results if r[2])
+    label = " ".join(f"{k}={v:g}" for k, v in params.items()) or "default difficulty"
+    print(f"{args.games} games, {label}, {args.sim_hz} Hz")
+    print(f"survival s: mean {statistics.fmean(elapsed):.1f}  median {statistics.median(elapsed):.1f}"
+          f"  min {min(elapsed):.1f}  ({capped} reached {args.max_time:g} s)")
+    print(f"score: mean {statistics.fmean(scores):.1f}  max {max(scores)}")
+    print(format_latency(timings, budget))
+    print(f"{pilot.searches} plan searches over {len(timings)} steps; {took:.1f} s wall time")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""
+Vectorized batch of independent headless giraffe games.
+
+``BatchEnv`` steps N games at once: every giraffe's ``base_x``, ``neck`` and
+``head_offset`` is one entry of an array, and each game's leaves are one row
+of padded ``(N, slots)`` arrays with an ``alive`` mask. A step applies the
+rules of ``giraffe_sim.step`` (difficulty ramp, ``Giraffe.steer``, spawning,
+leaf motion, the swept head test against ``Leaf.bounds``' integer rect,
+``Giraffe.apply_neck_change`` in spawn order, the ground check) to all games
+as array operations, and resets each game that ends.
+
+Like giraffe_leafpool it needs NumPy, which the game itself does not.
+
+    python giraffe_batch.py --games 4096 --frames 2000
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+import giraffe_sim as sim
+from giraffe_leafpool import swept_circle_box_hits
+
+_NO_ORDER = np.iinfo(np.int64).max
+
+
+def _clamp(v, lo, hi):
+    """Array version of ``giraffe_sim.clamp`` (``lo`` wins when the bounds cross)."""
+    return np.where(v < lo, lo, np.where(v > hi, hi, v))
+
+
+class BatchEnv:
+    """``n`` giraffe games advanced together by ``step(inputs)``.
+
+    ``inputs`` holds one INPUT_* bitmask per game. Games whose green leaf
+    touches the ground are reset within the same step; their final time and
+    score are left in ``last_elapsed`` and ``last_score``. Leaf rows grow when
+    a game needs more than ``slots`` live leaves.
+
+    Tuning constants are read from giraffe_sim on every step, so overrides
+    (as made by giraffe_sweep) apply here too. Spawning draws from one NumPy
+    generator for the whole batch, so individual games do not reproduce
+    ``GameState(seed=...)`` games; the rules they follow are the same.
+    """
+
+    LEAF_FIELDS = ("leaf_x", "leaf_y", "leaf_speed", "leaf_rotten", "leaf_alive", "leaf_order")
+
+    def __init__(self, n, slots=16, seed=None, dt=1.0 / sim.SIM_HZ):
+        self.n = n
+        self.dt = dt
+        self.rng = np.random.default_rng(seed)
+        self.base_x = np.zeros(n)
+        self.neck = np.zeros(n)
+        self.head_offset = np.zeros(n)
+        self.elapsed = np.zeros(n)
+        self.spawn_accum = np.zeros(n)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.leaf_x = np.zeros((n, slots))
+        self.leaf_y = np.zeros((n, slots))
+        self.leaf_speed = np.zeros((n, slots))
+        self.leaf_rotten = np.zeros((n, slots), dtype=bool)
+        self.leaf_alive = np.zeros((n, slots), dtype=bool)
+        # Spawn sequence number, so leaves eaten in the same step apply in spawn order
+        self.leaf_order = np.zeros((n, slots), dtype=np.int64)
+        self._next_order = 0
+        self.last_elapsed = np.zeros(n)
+        self.last_score = np.zeros(n, dtype=np.int64)
+        self.frames = 0
+        self.episodes = 0
+        self.reset()
+
+    @property
+    def slots(self):
+        return self.leaf_x.shape[1]
+
+    @property
+    def base_y(self):
+        return float(sim.GROUND_Y)
+
+    def head_pos(self):
+        return self.base_x, self.base_y - self.head_offset
+
+    def reset(self, games=None):
+        """Start the selected games (a bool mask or index array; all by default) afresh."""
+        if games is None:
+            games = slice(None)
+        self.base_x[games] = sim.WIDTH // 2
+        self.neck[games] = sim.NECK_START
+        self.head_offset[games] = sim.NECK_START * 0.7
+        self.elapsed[games] = 0.0
+        self.spawn_accum[games] = 0.0
+        self.score[games] = 0
+        self.leaf_alive[games] = False
+
+    def step(self, inputs):
+        """Advance every game by ``dt``; returns a bool mask of the games that ended (and were reset)."""
+        dt = self.dt
+        inputs = np.asarray(inputs)
+        self.elapsed += dt
+        elapsed = self.elapsed
+
+        # Difficulty ramp
+        fall_speed = _clamp(sim.FALL_SPEED_START + sim.FALL_ACCEL * elapsed, sim.FALL_SPEED_START, sim.FALL_SPEED_CAP)
+        spawn_rate = _clamp(sim.SPAWN_PER_SEC_START + sim.SPAWN_ACCEL * elapsed,
+                            sim.SPAWN_PER_SEC_START, sim.SPAWN_PER_SEC_CAP)
+        move_speed = _clamp(sim.MOVE_SPEED_START + sim.MOVE_ACCEL * elapsed, sim.MOVE_SPEED_START, sim.MOVE_SPEED_CAP)
+        head_speed = _clamp(sim.HEAD_MOVE_SPEED_START + sim.HEAD_MOVE_ACCEL * elapsed,
+                            sim.HEAD_MOVE_SPEED_START, sim.HEAD_MOVE_SPEED_CAP)
+
+        # Giraffe.steer
+        hx0 = self.base_x
+        hy0 = self.base_y - self.head_offset
+        dx = (((inputs & sim.INPUT_RIGHT) != 0).astype(float) - ((inputs & sim.INPUT_LEFT) != 0)) * move_speed
+        self.base_x = _clamp(self.base_x + dx * dt, 60, sim.WIDTH - 60)
+        dh = (((inputs & sim.INPUT_UP) != 0).astype(float) - ((inputs & sim.INPUT_DOWN) != 0)) * head_speed
+        self.head_offset = _clamp(self.head_offset + dh * dt, 20.0, self.neck)
+
+        # Spawning (usually at most one leaf per game per step)
+        self.spawn_accum += spawn_rate * dt
+        while True:
+            games = np.flatnonzero(self.spawn_accum >= 1.0)
+            if games.size == 0:
+                break
+            self.spawn_accum[games] -= 1.0
+            self._spawn(games, fall_speed[games])
+
+        # Leaf motion
+        alive = self.leaf_alive
+        self.leaf_y += self.leaf_speed * dt
+
+        # Head collision against Leaf.bounds()' integer rect, swept over the
+        # step and tested only for leaves whose path crosses the band of
+        # heights the head swept (a cheap filter that leaves a few percent of
+        # the slots for the exact test)
+        hy = self.base_y - self.head_offset
+        reach = sim.HEAD_RADIUS + sim.LEAF_H / 2 + 1
+        fall = self.leaf_speed * dt
+        near = ((self.leaf_y - fall <= np.maximum(hy0, hy)[:, None] + reach)
+                & (self.leaf_y >= np.minimum(hy0, hy)[:, None] - reach))
+        near &= alive
+        games, slots = np.nonzero(near)
+        if games.size:
+            left = np.trunc(self.leaf_x[games, slots] - sim.LEAF_W / 2)
+            top = np.trunc(self.leaf_y[games, slots] - sim.LEAF_H / 2)
+            bitten = swept_circle_box_hits(hx0[games], hy0[games], self.base_x[games], hy[games], sim.HEAD_RADIUS,
+                                           left, top, left + sim.LEAF_W, top + sim.LEAF_H, 0.0, fall[games, slots])
+            if bitten.any():
+                hit = np.zeros_like(near)
+                hit[games[bitten], slots[bitten]] = True
+                self._eat(hit)
+
+        # Ground check
+        down = alive & (self.leaf_y + sim.LEAF_H / 2 >= sim.GROUND_Y)
+        alive &= ~(down & self.leaf_rotten)
+        done = (down & ~self.leaf_rotten).any(axis=1)
+
+        self.frames += self.n
+        if done.any():
+            self.last_elapsed[done] = self.elapsed[done]
+            self.last_score[done] = self.score[done]
+            self.episodes += int(np.count_nonzero(done))
+            self.reset(done)
+        return done
+
+    def _spawn(self, games, fall_speed):
+        free = ~self.leaf_alive[games]
+        if not free.any(axis=1).all():
+            self._grow(self.slots * 2)
+            free = ~self.leaf_alive[games]
+        slot = free.argmax(axis=1)  # first free slot in each row
+        k = games.size
+        rng = self.rng
+        self.leaf_x[games, slot] = rng.integers(40, sim.WIDTH - 40, size=k, endpoint=True)
+        self.leaf_y[games, slot] = -20.0
+        self.leaf_rotten[games, slot] = rng.random(k) < sim.ROTTEN_CHANCE
+        self.leaf_speed[games, slot] = fall_speed * rng.uniform(0.85, 1.15, size=k)
+        self.leaf_alive[games, slot] = True
+        self.leaf_order[games, slot] = np.arange(self._next_order, self._next_order + k)
+        self._next_order += k
+
+    def _eat(self, hit):
+        counts = hit.sum(axis=1)
+        most = int(counts.max())
+        if most == 1:
+            games = np.flatnonzero(counts)
+            slots = hit[games].argmax(axis=1)
+            self._apply_eat(games, self.leaf_rotten[games, slots])
+        else:
+            # Several leaves in one bite: apply them one at a time in spawn order,
+            # since the neck clamps make the order matter
+            ranked = np.argsort(np.where(hit, self.leaf_order, _NO_ORDER), axis=1)[:, :most]
+            for r in range(most):
+                games = np.flatnonzero(counts > r)
+                self._apply_eat(games, self.leaf_rotten[games, ranked[games, r]])
+        self.leaf_alive &= ~hit
+
+    def _apply_eat(self, games, rotten):
+        delta = np.where(rotten, -sim.NECK_SHRINK, sim.NECK_GROW)
+        self.score[games] += ~rotten
+        # Giraffe.apply_neck_change: keep the head at the same fraction of the neck
+        neck = self.neck[games]
+        ratio = np.where(neck > 0, self.head_offset[games] / np.where(neck > 0, neck, 1.0), 0.7)
+        new_neck = _clamp(neck + delta, sim.NECK_MIN, sim.NECK_CAP)
+        min_head = np.where(new_neck <= sim.NECK_MIN, sim.NECK_MIN, 20.0)
+        self.neck[games] = new_neck
+        self.head_offset[games] = _clamp(new_neck * ratio, min_head, new_neck)
+
+    def _grow(self, slots):
+        for name in self.LEAF_FIELDS:
+            arr = getattr(self, name)
+            grown = np.zeros((self.n, slots), dtype=arr.dtype)
+            grown[:, :arr.shape[1]] = arr
+            setattr(self, name, grown)
+
+
+def chase(env):
+    """Batch policy: head down, walk towards each game's lowest green leaf."""
+    green = env.leaf_alive & ~env.leaf_rotten
+    lowest = np.where(green, env.leaf_y, -np.inf).argmax(axis=1)
+    target = env.leaf_x[np.arange(env.n), lowest]
+    dx = np.where(green.any(axis=1), target - env.base_x, 0.0)
+    inputs = np.full(env.n, sim.INPUT_DOWN, dtype=np.int64)
+    inputs[dx > 4] |= sim.INPUT_RIGHT
+    inputs[dx < -4] |= sim.INPUT_LEFT
+    return inputs
+
+
+def _python_loop_rate(frames, seconds=1.0):
+    """Game-frames per second of plain ``giraffe_sim.step`` calls, one game at a time."""
+    state = sim.GameState(seed=0)
+    dt = 1.0 / sim.SIM_HZ
+    done = 0
+    start = time.perf_counter()
+    while done < frames and time.perf_counter() - start < seconds:
+        for _ in range(100):
+            sim.step(state, sim.INPUT_DOWN, dt)
+            if state.game_over:
+                state.reset()
+        done += 100
+    return done / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Step many headless giraffe games at once.")
+    parser.add_argument("--games", type=int, default=4096)
+    parser.add_argument("--frames", type=int, default=1000, help="steps of the whole batch")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    env = BatchEnv(args.games, seed=args.seed)
+    start = time.perf_counter()
+    for _ in range(args.frames):
+        env.step(chase(env))
+    took = time.perf_counter() - start
+
+    batch_rate = env.frames / took
+    loop_rate = _python_loop_rate(env.frames)
+    print(f"{args.games} games x {args.frames} steps in {took:.2f}s: {batch_rate:,.0f} game-frames/s "
+          f"({batch_rate / loop_rate:.0f}x one-game Python loop at {loop_rate:,.0f})")
+    print(f"{env.episodes} games finished, mean {env.last_elapsed[env.last_elapsed > 0].mean():.1f}s "
+          f"(leaf slots per game: {env.slots})" if env.episodes else "no game finished yet")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
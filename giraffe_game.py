@@ -1,17 +1,44 @@
+import time
+
+# Start of the import-to-first-frame measurement (--startup-time); taken before
+# pygame is imported so its import cost is included.
+_IMPORT_START = time.perf_counter()
+
+import argparse
+import asyncio
+import json
 import math
+import os
 import random
+import sqlite3
 import sys
+import urllib.parse
+from collections import OrderedDict, namedtuple
 import pygame
 
+import giraffe_sim
+from giraffe_autopilot import Autopilot
+from giraffe_particles import EAT, PUFF, SPLAT_GREEN, SPLAT_ROTTEN, KINDS, ParticlePool
+from giraffe_profile import FrameProfiler, QualityGovernor, write_export
+from giraffe_replay import MAX_HZ, MAX_SEED, Recording
+from giraffe_scores import DEFAULT_PATH as SCORES_PATH, ScoreStore
+from giraffe_telemetry import TelemetryWriter
+# Gameplay constants and rules live in giraffe_sim; re-exported here for callers
+# that only know about this module.
+from giraffe_sim import (
+    WIDTH, HEIGHT, FPS, GROUND_Y,
+    NECK_START, NECK_CAP, NECK_MIN,
+    HEAD_RADIUS, LEAF_W, LEAF_H,
+    INPUT_LEFT, INPUT_RIGHT, INPUT_UP, INPUT_DOWN,
+    clamp, lerp, circle_rect_collide,
+    SIM_HZ,
+    FixedStepper, GameState, ImpactQueue,
+)
+
 # ----------------------------
 # Giraffe Game
 # ----------------------------
 
-WIDTH, HEIGHT = 1000, 700
-FPS = 60
-
-GROUND_Y = HEIGHT - 60
-
 # Colors
 SKY = (170, 220, 255)
 GROUND = (70, 170, 90)
@@ -23,163 +50,404 @@ GREEN = (40, 170, 70)
 RED = (200, 60, 60)
 YELLOW = (240, 215, 80)
 
-# Difficulty scaling
-FALL_SPEED_START = 180.0
-FALL_SPEED_CAP = 520.0
-FALL_ACCEL = 6.0
-
-SPAWN_PER_SEC_START = 0.85
-SPAWN_PER_SEC_CAP = 3.6
-SPAWN_ACCEL = 0.035
-
-MOVE_SPEED_START = 260.0
-MOVE_SPEED_CAP = 520.0
-MOVE_ACCEL = 4.5
-
-HEAD_MOVE_SPEED_START = 260.0
-HEAD_MOVE_SPEED_CAP = 520.0
-HEAD_MOVE_ACCEL = 4.5
-
-ROTTEN_CHANCE = 0.22
-
-# Neck growth
-NECK_START = 90.0
-NECK_CAP = 520.0
-NECK_GROW = 18.0
-NECK_SHRINK = 26.0
-NECK_MIN = 40.0
-
-HEAD_RADIUS = 18
-LEAF_W, LEAF_H = 18, 12
-
-pygame.init()
-pygame.display.set_caption("Giraffe Game")
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-clock = pygame.time.Clock()
-font = pygame.font.SysFont("consolas", 22)
-bigfont = pygame.font.SysFont("consolas", 44)
-
-
-def clamp(v, lo, hi):
-    return lo if v < lo else hi if v > hi else v
-
-
-def lerp(a, b, t):
-    """Linear interpolation between a and b by t in [0, 1].
-    Accepts t outside [0,1] and extrapolates accordingly for generality.
+# How long the loop sleeps on the event queue while a static screen is shown
+IDLE_WAIT_MS = 500
+# The asyncio loop polls the queue this often instead, so side jobs keep running
+IDLE_POLL_MS = 10
+
+# Seconds allowed for connecting to the score server and for its reply
+SUBMIT_TIMEOUT = 5.0
+
+# Quantized leaf rotations pre-rendered by LeafAtlas (over half a turn; the
+# leaf shape repeats every pi radians)
+LEAF_ANGLE_STEPS = 64
+
+# Transparent colour of the sprites drawn without per-pixel alpha
+COLORKEY = (255, 0, 255)
+
+# Visual quality levels, best first. --quality pins one; by default a
+# QualityGovernor moves between them as frame times allow.
+#   fancy_leaves:  outlined, spinning leaves (else flat, colour-keyed, unrotated)
+#   fancy_giraffe: the alpha-blended shadow and the wagging tail
+#   particles:     eat, puff and splat effects
+Quality = namedtuple("Quality", "name fancy_leaves fancy_giraffe particles")
+QUALITY_LEVELS = (
+    Quality("high", True, True, True),
+    Quality("medium", False, True, True),
+    Quality("low", False, False, False),
+)
+
+# Particle colours by kind, and how many shrinking sizes ParticleSprites pre-renders
+PARTICLE_COLORS = {EAT: (120, 215, 90), PUFF: (120, 95, 110), SPLAT_GREEN: GREEN, SPLAT_ROTTEN: RED}
+PARTICLE_RADIUS = 4
+PARTICLE_SIZE_STEPS = 4
+
+# Text
+FONT_NAME = "consolas"
+FONT_SIZE = 22
+BIG_FONT_SIZE = 44
+# Where the resolved path of FONT_NAME is remembered between runs
+FONT_CACHE = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                          "giraffe_game", "fonts.json")
+
+# Nothing is initialised at import: the window is opened by Window() in main(),
+# and fonts are loaded by get_font() the first time text is drawn.
+_fonts = {}
+_startup = {}
+
+
+def find_font(name=FONT_NAME, cache_path=None):
+    """Path of the system font ``name``, or None for pygame's bundled default font.
+
+    ``pygame.font.match_font`` (what ``SysFont`` uses) scans the system font
+    database, which can take a good fraction of a second, so the answer is
+    kept in ``cache_path`` (default ``FONT_CACHE``) for later runs. Delete
+    that file after installing or removing fonts.
+    """
+    cache_path = FONT_CACHE if cache_path is None else cache_path
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        cached = {}
+    path = cached.get(name, "")
+    if path is None or (path and os.path.exists(path)):
+        return path
+
+    path = pygame.font.match_font(name)
+    cached[name] = path
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, "w") as f:
+            json.dump(cached, f)
+    except OSError:
+        pass  # no cache then; the next run scans again
+    return path
+
+
+def get_font(size=FONT_SIZE, scale=1.0):
+    """The game font at ``size`` points times ``scale``, loaded (and pygame.font initialised) on first use."""
+    size = max(1, round(size * scale))
+    if not pygame.font.get_init():
+        # First use, or pygame.quit() since, which invalidates loaded fonts
+        pygame.font.init()
+        _fonts.clear()
+    fnt = _fonts.get(size)
+    if fnt is None:
+        if "font_path" not in _startup:
+            start = time.perf_counter()
+            _startup["font_path"] = find_font()
+            _startup["font_lookup"] = time.perf_counter() - start
+        fnt = _fonts[size] = pygame.font.Font(_startup["font_path"], size)
+    return fnt
+
+
+def init_display(size=(WIDTH, HEIGHT), flags=0):
+    """Open the game window. Only the display is initialised; the game uses no audio or joysticks."""
+    pygame.display.init()
+    pygame.display.set_caption("Giraffe Game")
+    return pygame.display.set_mode(size, flags)
+
+
+def scaled(surf, scale):
+    """``surf`` resized by ``scale`` (smoothly: for art built once), or ``surf`` itself at 1."""
+    if scale == 1.0:
+        return surf
+    w, h = surf.get_size()
+    return pygame.transform.smoothscale(surf, (max(1, round(w * scale)), max(1, round(h * scale))))
+
+
+def scale_rect(rect, scale):
+    """The canvas pixels covered by the WIDTH x HEIGHT layout ``rect`` at ``scale``."""
+    if scale == 1.0:
+        return rect
+    left, top = math.floor(rect.left * scale), math.floor(rect.top * scale)
+    return pygame.Rect(left, top, math.ceil(rect.right * scale) - left, math.ceil(rect.bottom * scale) - top)
+
+
+class Window:
+    """The display, and the canvas the game draws on.
+
+    Everything is laid out for WIDTH x HEIGHT; the canvas is ``render_scale``
+    times that. When the canvas and the window are the same size the canvas
+    is the display surface itself. Otherwise ``flip`` scales the canvas into
+    the window once per frame, letterboxed to keep the aspect ratio, so a big
+    window or fullscreen costs one scale instead of a bigger fill and draw.
+    With ``sdl_scaled`` SDL does that scaling on the GPU (``pygame.SCALED``).
     """
-    return a + (b - a) * t
-
 
-class Leaf:
-    def __init__(self, x, y, rotten, fall_speed):
-        self.x = x
-        self.y = y
-        self.rotten = rotten
-        self.fall_speed = fall_speed * random.uniform(0.85, 1.15)
-        self.w = LEAF_W
-        self.h = LEAF_H
-        self.spin = random.uniform(-2.5, 2.5)
-        self.angle = random.uniform(0, math.tau)
+    def __init__(self, render_scale=1.0, size=None, fullscreen=False, sdl_scaled=False):
+        self.scale = render_scale
+        canvas_size = (round(WIDTH * render_scale), round(HEIGHT * render_scale))
+        self.display = None
+        if sdl_scaled:
+            try:
+                self.display = init_display(canvas_size, pygame.SCALED | (pygame.FULLSCREEN if fullscreen else 0))
+            except pygame.error as exc:
+                print(f"SDL scaling unavailable ({exc}); scaling in software", file=sys.stderr)
+        if self.display is None:
+            self.display = init_display((0, 0), pygame.FULLSCREEN) if fullscreen else init_display(size or (WIDTH, HEIGHT))
+        if self.display.get_size() == canvas_size:
+            # Also the SCALED case: the display surface is the canvas size
+            self.canvas = self.display
+            self._target = None
+            return
+        dw, dh = self.display.get_size()
+        fit = min(dw / canvas_size[0], dh / canvas_size[1])
+        w, h = round(canvas_size[0] * fit), round(canvas_size[1] * fit)
+        self.display.fill((0, 0, 0))
+        self._target = self.display.subsurface(pygame.Rect((dw - w) // 2, (dh - h) // 2, w, h))
+        self.canvas = pygame.Surface(canvas_size).convert(self.display)
+
+    def flip(self):
+        if self._target is not None:
+            pygame.transform.scale(self.canvas, self._target.get_size(), self._target)
+        pygame.display.flip()
 
+    def update(self, rects):
+        if self._target is not None:
+            self.flip()  # a scaled canvas is pushed whole
+        else:
+            pygame.display.update(rects)
+
+
+def keys_to_inputs(keys):
+    """Fold a ``pygame.key.get_pressed()`` snapshot into giraffe_sim INPUT_* bits."""
+    inputs = 0
+    if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+        inputs |= INPUT_LEFT
+    if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+        inputs |= INPUT_RIGHT
+    if keys[pygame.K_UP] or keys[pygame.K_w]:
+        inputs |= INPUT_UP
+    if keys[pygame.K_DOWN] or keys[pygame.K_s]:
+        inputs |= INPUT_DOWN
+    return inputs
+
+
+def leaf_points(cx, cy, angle, w=LEAF_W, h=LEAF_H):
+    pts = []
+    for k in range(4):
+        theta = angle + k * (math.pi / 2)
+        rx = (w / 2) * (1.0 if k % 2 == 0 else 0.6)
+        ry = (h / 2) * (1.0 if k % 2 == 0 else 0.6)
+        pts.append((cx + math.cos(theta) * rx, cy + math.sin(theta) * ry))
+    return pts
+
+
+class Leaf(giraffe_sim.Leaf):
     def rect(self):
         return pygame.Rect(int(self.x - self.w / 2), int(self.y - self.h / 2), self.w, self.h)
 
-    def update(self, dt):
-        self.y += self.fall_speed * dt
-        self.angle += self.spin * dt
-
     def draw(self, surf):
         r = self.rect()
         color = RED if self.rotten else GREEN
 
-        cx, cy = r.centerx, r.centery
-        a = self.angle
-        pts = []
-        for k in range(4):
-            theta = a + k * (math.pi / 2)
-            rx = (self.w / 2) * (1.0 if k % 2 == 0 else 0.6)
-            ry = (self.h / 2) * (1.0 if k % 2 == 0 else 0.6)
-            pts.append((cx + math.cos(theta) * rx, cy + math.sin(theta) * ry))
+        pts = leaf_points(r.centerx, r.centery, self.angle, self.w, self.h)
         pygame.draw.polygon(surf, color, pts)
         pygame.draw.polygon(surf, DARK, pts, 2)
-class Giraffe:
-    def __init__(self):
-        self.base_x = WIDTH // 2
-        self.base_y = GROUND_Y
-        self.neck = NECK_START
-        self.head_offset = self.neck * 0.7  # head starts 70% up the neck
 
-    def head_pos(self):
-        return self.base_x, self.base_y - self.head_offset
 
-    def top_pos(self):
-        return self.base_x, self.base_y - self.neck
+class LeafAtlas:
+    """Leaf sprites pre-rendered at ``steps`` quantized angles, drawn with one ``blits``.
 
-    def update(self, dt, keys, move_speed, head_speed):
-        # Move body left/right
-        dx = 0.0
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            dx -= move_speed
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            dx += move_speed
-        self.base_x += dx * dt
-        self.base_x = clamp(self.base_x, 60, WIDTH - 60)
-
-        # Move head up/down
-        dh = 0.0
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
-            dh += head_speed
-        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            dh -= head_speed
-        self.head_offset += dh * dt
-        self.head_offset = clamp(self.head_offset, 20.0, self.neck)
-
-    def apply_neck_change(self, delta):
-        # Keep head at same percentage of neck
-        if self.neck > 0:
-            ratio = self.head_offset / self.neck
+    Replaces the per-leaf trig and two ``draw.polygon`` calls of ``Leaf.draw``.
+    Sprites are built on first use (a display must exist by then), resized
+    for a canvas at ``scale``. Only leaves of the default LEAF_W x LEAF_H size
+    are supported.
+
+    With ``outline`` off the sprites are flat colour-keyed polygons, which
+    blit several times faster than alpha-blended ones; ``steps=1`` draws
+    every leaf unrotated and skips the angle lookup.
+    """
+
+    def __init__(self, steps=LEAF_ANGLE_STEPS, scale=1.0, outline=True):
+        self.steps = max(1, int(steps))
+        self.scale = scale
+        self.outline = outline
+        self.half = LEAF_W // 2 + 2  # room for the 2px outline
+        self.green = []
+        self.rotten = []
+
+    def build(self):
+        size = self.half * 2
+        s = self.scale
+        self.green, self.rotten = [], []
+        for i in range(self.steps):
+            pts = leaf_points(self.half, self.half, i * math.pi / self.steps)
+            for sprites, color in ((self.green, GREEN), (self.rotten, RED)):
+                if self.outline:
+                    sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+                    pygame.draw.polygon(sprite, color, pts)
+                    pygame.draw.polygon(sprite, DARK, pts, 2)
+                    sprites.append(scaled(sprite, s))
+                else:
+                    # Drawn at the canvas size: resampling would blend the key colour into the edges
+                    side = max(1, round(size * s))
+                    sprite = pygame.Surface((side, side))
+                    sprite.fill(COLORKEY)
+                    pygame.draw.polygon(sprite, color, [(x * s, y * s) for x, y in pts])
+                    sprite.set_colorkey(COLORKEY, pygame.RLEACCEL)
+                    sprites.append(sprite)
+
+    def sprite(self, angle, rotten):
+        if not self.green:
+            self.build()
+        i = int(round(angle * self.steps / math.pi)) % self.steps
+        return (self.rotten if rotten else self.green)[i]
+
+    def draw(self, surf, leaves, doreturn=False, lag=0.0):
+        """Draw ``Leaf`` objects (anything with x, y, angle and rotten).
+
+        With ``doreturn`` the affected rects are returned, as ``Surface.blits`` does.
+        ``lag`` draws each leaf where it was that many seconds ago (leaves fall
+        and spin at a constant rate), for fixed-timestep interpolation.
+        """
+        if lag:
+            items = ((leaf.x, leaf.y - leaf.fall_speed * lag, leaf.angle - leaf.spin * lag, leaf.rotten)
+                     for leaf in leaves)
         else:
-            ratio = 0.7  # fallback
+            items = ((leaf.x, leaf.y, leaf.angle, leaf.rotten) for leaf in leaves)
+        return self._blit_all(surf, items, doreturn)
+
+    def draw_arrays(self, surf, xs, ys, angles, rottens, doreturn=False):
+        """Draw leaves given as parallel sequences, e.g. ``LeafPool.live()``."""
+        return self._blit_all(surf, zip(xs, ys, angles, rottens), doreturn)
+
+    def _blit_all(self, surf, items, doreturn):
+        if not self.green:
+            self.build()
+        # Sprite top-left from the same integer centre Leaf.rect() uses
+        dx = LEAF_W // 2 - self.half
+        dy = LEAF_H // 2 - self.half
+        per_radian = self.steps / math.pi
+        steps = self.steps
+        green, rotten = self.green, self.rotten
+        seq = []
+        if steps == 1:
+            s = self.scale
+            green, rotten = green[0], rotten[0]
+            for x, y, _, is_rotten in items:
+                seq.append((rotten if is_rotten else green,
+                            (int((int(x - LEAF_W / 2) + dx) * s), int((int(y - LEAF_H / 2) + dy) * s))))
+        elif self.scale == 1.0:
+            for x, y, angle, is_rotten in items:
+                i = int(round(angle * per_radian)) % steps
+                seq.append(((rotten if is_rotten else green)[i],
+                            (int(x - LEAF_W / 2) + dx, int(y - LEAF_H / 2) + dy)))
+        else:
+            s = self.scale
+            for x, y, angle, is_rotten in items:
+                i = int(round(angle * per_radian)) % steps
+                seq.append(((rotten if is_rotten else green)[i],
+                            (int((int(x - LEAF_W / 2) + dx) * s), int((int(y - LEAF_H / 2) + dy) * s))))
+        return surf.blits(seq, doreturn)
 
-        new_neck = clamp(self.neck + delta, NECK_MIN, NECK_CAP)
 
-        # When the neck shrinks all the way to NECK_MIN, tests expect the head to be
-        # clamped up to NECK_MIN as well (so it sits at the very top of the neck),
-        # not the generic 20.0 lower bound used otherwise.
-        min_head = NECK_MIN if new_neck <= NECK_MIN else 20.0
+class ParticleSprites:
+    """Draws a ``giraffe_particles.ParticlePool`` with one ``blits`` call.
 
-        self.neck = new_neck
-        self.head_offset = clamp(new_neck * ratio, min_head, new_neck)
+    Each kind is pre-rendered as a colour-keyed dot at PARTICLE_SIZE_STEPS
+    sizes that shrink over a particle's life; sprites are built on first use,
+    for a canvas at ``scale``.
+    """
 
-    def draw(self, surf):
-        # --- ANIMATION TIMERS ---
-        t = pygame.time.get_ticks() / 1000.0
-        blink = (int(t * 2) % 7 == 0)
-        wag_angle = math.sin(t * 4) * 6
-        mouth_open = abs(self.head_offset - self.neck * 0.7) > 4
+    def __init__(self, pool, scale=1.0):
+        self.pool = pool
+        self.scale = scale
+        self.sprites = []
+
+    def build(self):
+        s = self.scale
+        self.sprites = []
+        for kind in range(KINDS):
+            for size_step in range(PARTICLE_SIZE_STEPS):
+                radius = max(1, round(PARTICLE_RADIUS * (PARTICLE_SIZE_STEPS - size_step) / PARTICLE_SIZE_STEPS * s))
+                sprite = pygame.Surface((2 * radius, 2 * radius))
+                sprite.fill(COLORKEY)
+                pygame.draw.circle(sprite, PARTICLE_COLORS[kind], (radius, radius), radius)
+                sprite.set_colorkey(COLORKEY, pygame.RLEACCEL)
+                self.sprites.append((sprite, radius))
+
+    def draw(self, surf, doreturn=False):
+        if not self.sprites:
+            self.build()
+        sprites = self.sprites
+        steps = PARTICLE_SIZE_STEPS
+        s = self.scale
+        seq = []
+        append = seq.append
+        for kind, x, y, age in self.pool.live():
+            sprite, radius = sprites[kind * steps + int(age * steps)]
+            append((sprite, (int(x * s) - radius, int(y * s) - radius)))
+        return surf.blits(seq, doreturn)
+
+
+class Giraffe(giraffe_sim.Giraffe):
+    # Shadow, body, spots and legs only ever move with base_x, and the head,
+    # ears and horns only with head_pos(), so both are pre-rendered once into
+    # layers shared by every giraffe. They are rebuilt only when a colour they
+    # were drawn with, or the render scale, changes (see _static_layers).
+    BODY_W, BODY_H = 110, 60
+    BODY_LAYER_SIZE = (120, 150)
+    BODY_ORIGIN = (60, 100)  # where (base_x, base_y) falls inside the layer
+    HEAD_LAYER_SIZE = (60, 60)
+    HEAD_ORIGIN = (30, 40)  # where head_pos() falls inside the layer
+
+    _layers = None
+    _layers_key = None
+    _plain = None
+    _plain_key = None
+
+    def update(self, dt, keys, move_speed, head_speed):
+        self.steer(dt, keys_to_inputs(keys), move_speed, head_speed)
+
+    @classmethod
+    def _static_layers(cls, scale=1.0):
+        key = (BROWN, BROWN_DARK, DARK, YELLOW, scale)
+        if cls._layers is None or cls._layers_key != key:
+            cls._layers = (scaled(cls._render_body_layer(), scale), scaled(cls._render_head_layer(), scale))
+            cls._layers_key = key
+        return cls._layers
+
+    @classmethod
+    def _plain_body(cls, scale=1.0):
+        """Colour-keyed body layer without the shadow and with the tail at rest (low quality)."""
+        key = (BROWN, BROWN_DARK, DARK, scale)
+        if cls._plain is None or cls._plain_key != key:
+            w, h = cls.BODY_LAYER_SIZE
+            layer = pygame.Surface((w + 20, h))  # wide enough for the tail
+            layer.fill(COLORKEY)
+            cls._render_body_layer(layer, shadow=False)
+            ox, oy = cls.BODY_ORIGIN
+            tail_base = (ox + 50, oy - cls.BODY_H + 20)
+            tail_end = (ox + 70, oy - cls.BODY_H + 40)
+            pygame.draw.line(layer, BROWN_DARK, tail_base, tail_end, 6)
+            pygame.draw.line(layer, DARK, tail_base, tail_end, 2)
+            pygame.draw.circle(layer, BROWN_DARK, tail_end, 6)
+            if scale != 1.0:
+                # Nearest-neighbour: smoothing would blend the key colour into the edges
+                layer = pygame.transform.scale(layer, (max(1, round((w + 20) * scale)), max(1, round(h * scale))))
+            layer.set_colorkey(COLORKEY, pygame.RLEACCEL)
+            cls._plain = layer
+            cls._plain_key = key
+        return cls._plain
+
+    @classmethod
+    def _render_body_layer(cls, layer=None, shadow=True):
+        if layer is None:
+            layer = pygame.Surface(cls.BODY_LAYER_SIZE, pygame.SRCALPHA)
+        ox, oy = cls.BODY_ORIGIN
+        body_w, body_h = cls.BODY_W, cls.BODY_H
 
         # --- SHADOW ---
-        shadow_rect = pygame.Rect(
-            int(self.base_x - 60),
-            int(self.base_y - 10),
-            120,
-            25
-        )
-        shadow_surf = pygame.Surface((shadow_rect.width, shadow_rect.height), pygame.SRCALPHA)
-        pygame.draw.ellipse(shadow_surf, (0, 0, 0, 60), shadow_surf.get_rect())
-        surf.blit(shadow_surf, shadow_rect.topleft)
+        if shadow:
+            pygame.draw.ellipse(layer, (0, 0, 0, 60), pygame.Rect(ox - 60, oy - 10, 120, 25))
 
         # --- BODY ---
-        body_w, body_h = 110, 60
-        body_rect = pygame.Rect(
-            int(self.base_x - body_w / 2),
-            int(self.base_y - body_h),
-            body_w,
-            body_h
-        )
-        pygame.draw.ellipse(surf, BROWN, body_rect)
-        pygame.draw.ellipse(surf, DARK, body_rect, 2)
+        body_rect = pygame.Rect(ox - body_w // 2, oy - body_h, body_w, body_h)
+        pygame.draw.ellipse(layer, BROWN, body_rect)
+        pygame.draw.ellipse(layer, DARK, body_rect, 2)
 
         # --- SPOTS ---
         spot_positions = [
@@ -189,113 +457,763 @@ class Giraffe:
             (-10, -30)
         ]
         for sx, sy in spot_positions:
-            pygame.draw.circle(
-                surf,
-                BROWN_DARK,
-                (int(self.base_x + sx), int(self.base_y - body_h + sy)),
-                8
-            )
+            pygame.draw.circle(layer, BROWN_DARK, (ox + sx, oy - body_h + sy), 8)
 
         # --- LEGS ---
         for lx in (-30, -10, 10, 30):
-            leg_rect = pygame.Rect(
-                int(self.base_x + lx - 6),
-                int(self.base_y - 5),
-                12,
-                50
-            )
-            pygame.draw.rect(surf, BROWN_DARK, leg_rect, border_radius=6)
-            pygame.draw.rect(surf, DARK, leg_rect, 2, border_radius=6)
-
-        # --- TAIL (wagging) ---
-        tail_base = (self.base_x + 50, self.base_y - body_h + 20)
-        tail_end = (
-            tail_base[0] + 20 + wag_angle,
-            tail_base[1] + 20
-        )
-        pygame.draw.line(surf, BROWN_DARK, tail_base, tail_end, 6)
-        pygame.draw.line(surf, DARK, tail_base, tail_end, 2)
-        pygame.draw.circle(surf, BROWN_DARK, tail_end, 6)
+            leg_rect = pygame.Rect(ox + lx - 6, oy - 5, 12, 50)
+            pygame.draw.rect(layer, BROWN_DARK, leg_rect, border_radius=6)
+            pygame.draw.rect(layer, DARK, leg_rect, 2, border_radius=6)
+        return layer
 
-        # --- NECK ---
-        topx, topy = self.top_pos()
-        pygame.draw.line(surf, BROWN_DARK,
-                         (self.base_x, self.base_y - body_h + 10),
-                         (topx, topy),
-                         20)
-        pygame.draw.line(surf, DARK,
-                         (self.base_x, self.base_y - body_h + 10),
-                         (topx, topy),
-                         2)
+    @classmethod
+    def _render_head_layer(cls):
+        layer = pygame.Surface(cls.HEAD_LAYER_SIZE, pygame.SRCALPHA)
+        hx, hy = cls.HEAD_ORIGIN
 
         # --- HEAD ---
-        hx, hy = self.head_pos()
-        head_rect = pygame.Rect(int(hx - 22), int(hy - 18), 44, 36)
-        pygame.draw.ellipse(surf, YELLOW, head_rect)
-        pygame.draw.ellipse(surf, DARK, head_rect, 2)
+        head_rect = pygame.Rect(hx - 22, hy - 18, 44, 36)
+        pygame.draw.ellipse(layer, YELLOW, head_rect)
+        pygame.draw.ellipse(layer, DARK, head_rect, 2)
 
         # --- EARS ---
-        pygame.draw.polygon(surf, YELLOW, [
+        pygame.draw.polygon(layer, YELLOW, [
             (hx - 18, hy - 10),
             (hx - 28, hy - 20),
             (hx - 14, hy - 18)
         ])
-        pygame.draw.polygon(surf, YELLOW, [
+        pygame.draw.polygon(layer, YELLOW, [
             (hx + 18, hy - 10),
             (hx + 28, hy - 20),
             (hx + 14, hy - 18)
         ])
 
         # --- HORNS ---
-        pygame.draw.line(surf, DARK, (hx - 8, hy - 18), (hx - 8, hy - 30), 4)
-        pygame.draw.line(surf, DARK, (hx + 8, hy - 18), (hx + 8, hy - 30), 4)
-        pygame.draw.circle(surf, DARK, (hx - 8, hy - 32), 4)
-        pygame.draw.circle(surf, DARK, (hx + 8, hy - 32), 4)
+        pygame.draw.line(layer, DARK, (hx - 8, hy - 18), (hx - 8, hy - 30), 4)
+        pygame.draw.line(layer, DARK, (hx + 8, hy - 18), (hx + 8, hy - 30), 4)
+        pygame.draw.circle(layer, DARK, (hx - 8, hy - 32), 4)
+        pygame.draw.circle(layer, DARK, (hx + 8, hy - 32), 4)
+        return layer
+
+    def draw(self, surf, scale=1.0, fancy=True):
+        """Draw onto a canvas at ``scale`` times the WIDTH x HEIGHT layout; returns ``bounds``.
+
+        Without ``fancy`` the shadow and the wagging tail are left out (see QUALITY_LEVELS).
+        """
+        def at(x, y):
+            return x * scale, y * scale
+
+        def width(w):
+            return max(1, round(w * scale))
+
+        # --- ANIMATION TIMERS ---
+        t = pygame.time.get_ticks() / 1000.0
+        blink = (int(t * 2) % 7 == 0)
+        wag_angle = math.sin(t * 4) * 6
+        mouth_open = abs(self.head_offset - self.neck * 0.7) > 4
+
+        body_layer, head_layer = self._static_layers(scale)
+        body_h = self.BODY_H
+
+        # --- SHADOW, BODY, SPOTS, LEGS ---
+        ox, oy = self.BODY_ORIGIN
+        body_pos = (int((int(self.base_x) - ox) * scale), int((int(self.base_y) - oy) * scale))
+        if fancy:
+            surf.blit(body_layer, body_pos)
+
+            # --- TAIL (wagging) ---
+            tail_base = at(self.base_x + 50, self.base_y - body_h + 20)
+            tail_end = at(self.base_x + 70 + wag_angle, self.base_y - body_h + 40)
+            pygame.draw.line(surf, BROWN_DARK, tail_base, tail_end, width(6))
+            pygame.draw.line(surf, DARK, tail_base, tail_end, width(2))
+            pygame.draw.circle(surf, BROWN_DARK, tail_end, width(6))
+        else:
+            surf.blit(self._plain_body(scale), body_pos)
+
+        # --- NECK ---
+        topx, topy = self.top_pos()
+        neck_base = at(self.base_x, self.base_y - body_h + 10)
+        pygame.draw.line(surf, BROWN_DARK, neck_base, at(topx, topy), width(20))
+        pygame.draw.line(surf, DARK, neck_base, at(topx, topy), width(2))
+
+        # --- HEAD, EARS, HORNS ---
+        hx, hy = self.head_pos()
+        ox, oy = self.HEAD_ORIGIN
+        surf.blit(head_layer, (int((int(hx) - ox) * scale), int((int(hy) - oy) * scale)))
 
         # --- EYE (blinks) ---
         if not blink:
-            pygame.draw.circle(surf, DARK, (int(hx + 10), int(hy - 2)), 4)
+            pygame.draw.circle(surf, DARK, (int((hx + 10) * scale), int((hy - 2) * scale)), width(4))
 
         # --- MOUTH ---
         if mouth_open:
-            pygame.draw.line(surf, DARK, (hx + 10, hy + 10), (hx + 20, hy + 12), 3)
+            pygame.draw.line(surf, DARK, at(hx + 10, hy + 10), at(hx + 20, hy + 12), width(3))
         else:
-            pygame.draw.line(surf, DARK, (hx + 10, hy + 10), (hx + 18, hy + 10), 2)
+            pygame.draw.line(surf, DARK, at(hx + 10, hy + 10), at(hx + 18, hy + 10), width(2))
 
         # --- TOP OF NECK MARKER ---
-        pygame.draw.circle(surf, WHITE, (int(topx), int(topy)), 4)
-def circle_rect_collide(cx, cy, radius, rect: pygame.Rect) -> bool:
-    closest_x = clamp(cx, rect.left, rect.right)
-    closest_y = clamp(cy, rect.top, rect.bottom)
-    dx = cx - closest_x
-    dy = cy - closest_y
-    return (dx * dx + dy * dy) <= radius * radius
+        pygame.draw.circle(surf, WHITE, (int(topx * scale), int(topy * scale)), width(4))
+
+        return self.bounds(scale)
+
+    def bounds(self, scale=1.0):
+        """Canvas rect covering everything ``draw`` touches (for dirty-rect updates)."""
+        x, y = int(self.base_x), int(self.base_y)
+        ox, oy = self.BODY_ORIGIN
+        left = x - ox
+        top = min(int(self.base_y - self.neck) - 12, int(self.base_y - self.head_offset) - self.HEAD_ORIGIN[1], y - oy)
+        right = x + 84  # wagging tail tip plus its end cap
+        bottom = y - oy + self.BODY_LAYER_SIZE[1]
+        return scale_rect(pygame.Rect(left, top, right - left, bottom - top), scale)
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed on (font, string, color)."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def render(self, fnt, text, color):
+        key = (fnt, text, color)
+        surf = self._surfaces.get(key)
+        if surf is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surf
+        self.misses += 1
+        surf = fnt.render(text, True, color)
+        self._surfaces[key] = surf
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surf
+
+
+class GlyphStrip:
+    """Pre-rendered single-character glyphs for fast-changing numbers.
+
+    Drawing "12.3" is four blits of cached glyphs instead of rasterizing a new
+    string every time the value changes.
+    """
+
+    def __init__(self, fnt, color, chars="0123456789."):
+        self.glyphs = {c: fnt.render(c, True, color) for c in chars}
+        self.height = max(g.get_height() for g in self.glyphs.values())
+
+    def draw(self, surf, text, pos):
+        x, y = pos
+        seq = []
+        for c in text:
+            glyph = self.glyphs[c]
+            seq.append((glyph, (x, y)))
+            x += glyph.get_width()
+        surf.blits(seq, False)
+        return pygame.Rect(pos[0], y, x - pos[0], self.height)
+
 
+text_cache = TextCache()
 
-def main():
-    giraffe = Giraffe()
-    leaves = []
-    rng = random.Random()
 
-    elapsed = 0.0
-    spawn_accum = 0.0
-    score = 0
+def render_text(fnt, text, color):
+    return text_cache.render(fnt, text, color)
 
-    game_over = False
-    death_reason = ""
+
+def render_background(scale=1.0):
+    """Sky, ground and the static controls line: everything that never moves."""
+    bg = pygame.Surface((WIDTH, HEIGHT))
+    bg.fill(SKY)
+
+    # Ground
+    pygame.draw.rect(bg, GROUND, pygame.Rect(0, GROUND_Y, WIDTH, HEIGHT - GROUND_Y))
+    pygame.draw.line(bg, DARK, (0, GROUND_Y), (WIDTH, GROUND_Y), 3)
+
+    inst = render_text(get_font(), "Move: A/D or ←/→   Head: W/S or ↑/↓   P = Pause", DARK)
+    bg.blit(inst, (18, HEIGHT - 32))
+    return scaled(bg, scale)
+
+
+class FullFrameRenderer:
+    """Redraws the whole gameplay frame and flips the full display every frame.
+
+    Static screens (menus, pause, game over) are composed and presented once
+    when entered; ``idle`` is true while one is on display, so the main loop
+    can sleep on the event queue instead of redrawing. With a ``Window``,
+    ``surf`` is its canvas and presenting goes through it.
+    """
+
+    def __init__(self, surf, background, window=None):
+        self.surf = surf
+        self.background = background
+        self.window = window
+        self._static = None
+
+    @property
+    def idle(self):
+        return self._static is not None
+
+    def begin_static(self, key):
+        """Whether the static screen ``key`` still has to be drawn (it is not on display yet)."""
+        if self._static == key:
+            return False
+        self._static = key
+        return True
+
+    def present_static(self, composed=None):
+        if composed is not None:
+            self.surf.blit(composed, (0, 0))
+        self._flip()
+
+    def invalidate(self):
+        self._static = None
+
+    def clear(self):
+        self.surf.blit(self.background, (0, 0))
+
+    def present(self, rects):
+        self._flip()
+        self._static = None
+
+    def _flip(self):
+        if self.window is not None:
+            self.window.flip()
+        else:
+            pygame.display.flip()
+
+
+class DirtyRectRenderer(FullFrameRenderer):
+    """Restores and updates only the regions that changed between frames.
+
+    Gameplay frames blit the cached background back over last frame's rects,
+    and ``present`` pushes last frame's plus this frame's rects to the display
+    with ``pygame.display.update``.
+    """
+
+    def __init__(self, surf, background, window=None):
+        super().__init__(surf, background, window)
+        self._last = []
+        self._full = True
+
+    def present_static(self, composed=None):
+        super().present_static(composed)
+        self._full = True
+
+    def invalidate(self):
+        super().invalidate()
+        self._full = True
+
+    def clear(self):
+        if self._full:
+            self.surf.blit(self.background, (0, 0))
+            return
+        for r in self._last:
+            self.surf.blit(self.background, r, r)
+
+    def present(self, rects):
+        if self._full:
+            self._flip()
+            self._full = False
+        elif self.window is not None:
+            self.window.update(self._last + rects)
+        else:
+            pygame.display.update(self._last + rects)
+        self._last = rects
+        self._static = None
+
+
+_dim_overlays = {}
+
+
+def dim_overlay(alpha, size=(WIDTH, HEIGHT)):
+    """Translucent black overlay covering ``size``, allocated once per alpha and size."""
+    overlay = _dim_overlays.get((alpha, size))
+    if overlay is None:
+        overlay = pygame.Surface(size, pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, alpha))
+        _dim_overlays[alpha, size] = overlay
+    return overlay
+
+
+def blit_centered(surf, text_surf, y):
+    surf.blit(text_surf, (surf.get_width() // 2 - text_surf.get_width() // 2, y))
+
+
+def compose_start_screen(best=()):
+    """The title screen, listing ``best`` (giraffe_scores runs) below the prompts."""
+    surf = pygame.Surface((WIDTH, HEIGHT))
+    surf.fill(SKY)
+    blit_centered(surf, render_text(get_font(BIG_FONT_SIZE), "GIRAFFE GAME", DARK), HEIGHT // 2 - 120)
+    blit_centered(surf, render_text(get_font(), "Press SPACE to Start", DARK), HEIGHT // 2)
+    blit_centered(surf, render_text(get_font(), "Press I for Instructions", DARK), HEIGHT // 2 + 40)
+    if best:
+        blit_centered(surf, render_text(get_font(), "HIGH SCORES", DARK), HEIGHT // 2 + 100)
+        for i, run in enumerate(best, 1):
+            line = f"{i}. {run.score:>3} leaves  {run.elapsed:6.1f}s"
+            blit_centered(surf, render_text(get_font(), line, DARK), HEIGHT // 2 + 100 + 28 * i)
+    return surf
+
+
+def compose_instructions_screen():
+    surf = pygame.Surface((WIDTH, HEIGHT))
+    surf.fill(WHITE)
+
+    lines = [
+        "INSTRUCTIONS",
+        "",
+        "Move Left/Right: A/D or ←/→",
+        "Move Head Up/Down: W/S or ↑/↓",
+        "Eat green leaves to grow your neck",
+        "Avoid letting green leaves hit the ground",
+        "",
+        "Press B to go back"
+    ]
+
+    y = 120
+    for line in lines:
+        blit_centered(surf, render_text(get_font(), line, DARK), y)
+        y += 40
+    return surf
+
+
+def draw_frame(surf, state, leaf_atlas, timer_digits, stepper=None, scale=1.0, quality=None, particles=None):
+    """Draw leaves, particles, giraffe and HUD for ``state`` over the background; returns the dirty rects.
+
+    With a ``FixedStepper``, leaves and giraffe are drawn between its last two
+    simulation ticks. ``scale`` is the canvas size relative to WIDTH x HEIGHT;
+    ``leaf_atlas`` and ``timer_digits`` must have been built for it.
+
+    ``quality`` (one of QUALITY_LEVELS) picks the giraffe's detail and is
+    shown in the HUD; the caller picks the matching ``leaf_atlas``.
+    ``particles`` (``ParticleSprites``) are drawn unless the quality leaves them out.
+    """
+    lag, prev_pose, alpha = (stepper.lag, stepper.prev_pose, stepper.alpha) if stepper else (0.0, None, 1.0)
+
+    prof = state.profiler
+
+    # Leaves
+    dirty = leaf_atlas.draw(surf, state.leaves, True, lag=lag) or []
+    if prof is not None:
+        prof.lap("draw_leaves")
+
+    # Particles
+    if particles is not None and (quality is None or quality.particles):
+        dirty.extend(particles.draw(surf, True) or [])
+        if prof is not None:
+            prof.lap("draw_particles")
+
+    # Giraffe
+    giraffe = state.giraffe.interpolated(prev_pose, alpha)
+    dirty.append(giraffe.draw(surf, scale, quality is None or quality.fancy_giraffe))
+    if prof is not None:
+        prof.lap("draw_giraffe")
+
+    # HUD
+    dirty.extend(draw_hud(surf, state, timer_digits, scale, quality.name if quality is not None else None))
+    if prof is not None:
+        prof.lap("hud")
+    return dirty
+
+
+def draw_hud(surf, state, timer_digits, scale=1.0, quality=None):
+    """Draw time, score, neck length and the ``quality`` level name if given; returns the dirty rects."""
+    # The timer changes every tenth of a second: draw its digits from the
+    # glyph strip rather than rendering a new string each time.
+    fnt = get_font(FONT_SIZE, scale)
+    left = round(18 * scale)
+    dirty = []
+    timer_label = render_text(fnt, "Time: ", DARK)
+    dirty.append(surf.blit(timer_label, (left, round(14 * scale))))
+    x = left + timer_label.get_width()
+    timer_rect = timer_digits.draw(surf, f"{state.elapsed:0.1f}", (x, round(14 * scale)))
+    dirty.append(timer_rect)
+    dirty.append(surf.blit(render_text(fnt, "s", DARK), (timer_rect.right, round(14 * scale))))
+
+    score_text = render_text(fnt, f"Leaves eaten: {state.score}", DARK)
+    neck_text = render_text(fnt, f"Neck: {int(state.giraffe.neck)}/{int(NECK_CAP)}", DARK)
+
+    dirty.append(surf.blit(score_text, (left, round(40 * scale))))
+    dirty.append(surf.blit(neck_text, (left, round(66 * scale))))
+    if quality is not None:
+        dirty.append(surf.blit(render_text(fnt, f"Quality: {quality}", DARK), (left, round(92 * scale))))
+    return dirty
+
+
+class ProfilerOverlay:
+    """Panel of rolling per-phase timings from a ``FrameProfiler`` (toggled with F3).
+
+    The panel is re-rendered every ``refresh`` frames, straight through the
+    font so the ever-changing numbers stay out of ``text_cache``; in between
+    it is just blitted again.
+    """
+
+    def __init__(self, refresh=15, scale=1.0):
+        self.refresh = refresh
+        self.margin = round(10 * scale)
+        self.font = get_font(15, scale)
+        self._panel = None
+        self._age = 0
+
+    def draw(self, surf, profiler, particles=None):
+        if self._panel is None or self._age >= self.refresh:
+            self._panel = self.render(profiler, particles)
+            self._age = 0
+        self._age += 1
+        return surf.blit(self._panel, (surf.get_width() - self._panel.get_width() - self.margin, self.margin))
+
+    def render(self, profiler, particles=None):
+        # Columns are laid out from rendered widths: the font may not be monospaced
+        rows = [("phase", "p50 ms", "p95 ms", "p99 ms")]
+        for phase, values in profiler.percentiles().items():
+            rows.append((phase,) + tuple(f"{v * 1000:.2f}" for v in values))
+        cells = [[self.font.render(text, True, WHITE) for text in row] for row in rows]
+        lines = [
+            f"leaves {profiler.leaves}   budget {profiler.budget * 1000:.1f} ms",
+            f"misses {profiler.recent_misses}/{len(profiler.totals)} recent, {profiler.misses} total",
+        ]
+        if particles is not None:
+            lines.append(f"particles {particles.count}/{particles.capacity} ({particles.occupancy:.0%}),"
+                         f" peak {particles.peak}, {particles.dropped} dropped")
+        footer = [self.font.render(line, True, WHITE) for line in lines]
+
+        widths = [max(row[c].get_width() for row in cells) for c in range(len(rows[0]))]
+        line_h = footer[0].get_height()
+        table_w = sum(widths) + 12 * (len(widths) - 1)
+        panel = pygame.Surface((max([table_w] + [f.get_width() for f in footer]) + 16,
+                                line_h * (len(cells) + len(footer)) + 12), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        y = 6
+        for row in cells:
+            x = 8
+            for c, cell in enumerate(row):
+                # phase names left-aligned, numbers right-aligned
+                panel.blit(cell, (x if c == 0 else x + widths[c] - cell.get_width(), y))
+                x += widths[c] + 12
+            y += line_h
+        for line in footer:
+            panel.blit(line, (8, y))
+            y += line_h
+        return panel
+
+
+def render_scale(text):
+    value = float(text)
+    if not 0.1 <= value <= 4.0:
+        raise argparse.ArgumentTypeError("render scale must be between 0.1 and 4")
+    return value
+
+
+def window_size(text):
+    w, sep, h = text.lower().partition("x")
+    try:
+        size = int(w), int(h)
+    except ValueError:
+        size = None
+    if not sep or size is None or min(size) < 1:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {text!r}")
+    return size
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Giraffe Game")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="update only changed screen regions (helps software-rendered displays)")
+    parser.add_argument("--fps", type=int, default=FPS,
+                        help="render frame cap; 0 = uncapped (default: %(default)s)")
+    parser.add_argument("--render-scale", type=render_scale, default=1.0, metavar="S",
+                        help="draw at S times %d x %d and scale the picture to the window (default: %%(default)s)"
+                             % (WIDTH, HEIGHT))
+    parser.add_argument("--window", type=window_size, default=None, metavar="WxH",
+                        help="window size in pixels (default: %d x %d)" % (WIDTH, HEIGHT))
+    parser.add_argument("--fullscreen", action="store_true", help="fill the screen at the desktop resolution")
+    parser.add_argument("--sdl-scaled", action="store_true",
+                        help="let SDL scale the picture on the GPU (pygame.SCALED) instead of pygame.transform")
+    parser.add_argument("--quality", choices=("auto",) + tuple(q.name for q in QUALITY_LEVELS), default="auto",
+                        help="visual quality; auto lowers it while frames run over budget (default: %(default)s)")
+    parser.add_argument("--sim-hz", type=int, default=SIM_HZ,
+                        help="fixed simulation tick rate (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed every round with this value (default: a fresh random seed per round)")
+    parser.add_argument("--record", metavar="PATH", default=None,
+                        help="save the latest round's seed and per-tick inputs here (see giraffe_replay.py)")
+    parser.add_argument("--autopilot", action="store_true",
+                        help="let the autopilot play (see giraffe_autopilot.py); the keys still pause and quit")
+    parser.add_argument("--telemetry", metavar="PATH", default=None,
+                        help="write every gameplay frame's giraffe, leaves, score and dt here (see giraffe_telemetry.py)")
+    parser.add_argument("--profile", action="store_true",
+                        help="start with the frame profiler overlay shown (F3 toggles it)")
+    parser.add_argument("--profile-out", metavar="PATH", default=None,
+                        help="profile every gameplay frame and write the timings here on exit (.csv or .json)")
+    parser.add_argument("--startup-time", action="store_true",
+                        help="print milliseconds from import to the first frame as JSON, then quit")
+    parser.add_argument("--scores", metavar="PATH", default=SCORES_PATH,
+                        help="high score and run history database (default: %(default)s)")
+    parser.add_argument("--no-scores", action="store_true", help="do not load or save high scores")
+    parser.add_argument("--async", dest="async_loop", action="store_true",
+                        help="run the game loop on asyncio, with saving and score submission as background tasks")
+    parser.add_argument("--submit-url", metavar="URL", default=None,
+                        help="POST each round's seed, time and score as JSON to this http:// URL")
+    options = parser.parse_args(argv)
+    if options.sim_hz < 1:
+        parser.error("--sim-hz must be at least 1")
+    if options.record:
+        # Checked now, not when the recording is saved at the end of the round
+        if options.seed is not None and not 0 <= options.seed <= MAX_SEED:
+            parser.error(f"--record needs a --seed between 0 and {MAX_SEED}")
+        if options.sim_hz > MAX_HZ:
+            parser.error(f"--record needs a --sim-hz of at most {MAX_HZ}")
+    if options.submit_url and urllib.parse.urlsplit(options.submit_url).scheme != "http":
+        parser.error("--submit-url must be an http:// URL")
+    return options
+
+
+def new_seed(options):
+    return options.seed if options.seed is not None else random.SystemRandom().randrange(2 ** 63)
+
+
+def startup_report(display_ready, first_frame):
+    """Milliseconds from the start of importing this module to each startup milestone."""
+    def ms(t):
+        return round((t - _IMPORT_START) * 1000, 2)
+    return {
+        "import": ms(_IMPORTED),
+        "display": ms(display_ready),
+        "first_frame": ms(first_frame),
+        "font_lookup": round(_startup.get("font_lookup", 0.0) * 1000, 2),
+    }
+
+
+async def submit_score(url, result, timeout=SUBMIT_TIMEOUT):
+    """POST ``result`` as JSON to the http:// ``url``; True if the server answered 2xx.
+
+    Failures are printed, not raised: a missing score server must not end the game.
+    """
+    parts = urllib.parse.urlsplit(url)
+    target = parts.path or "/"
+    if parts.query:
+        target += "?" + parts.query
+    body = json.dumps(result).encode()
+    head = (f"POST {target} HTTP/1.1\r\nHost: {parts.netloc}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n")
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(parts.hostname, parts.port or 80), timeout)
+        try:
+            writer.write(head.encode() + body)
+            status = await asyncio.wait_for(reader.readline(), timeout)
+        finally:
+            writer.close()
+        code = int(status.split()[1])
+        if not 200 <= code < 300:
+            raise OSError(f"server answered {code}")
+    except (OSError, asyncio.TimeoutError, ValueError, IndexError) as exc:
+        print(f"score submission to {url} failed: {exc or type(exc).__name__}", file=sys.stderr)
+        return False
+    return True
+
+
+def run_now(job, *args):
+    """The blocking loop's side jobs: run to completion on the frame that asked for them."""
+    if asyncio.iscoroutinefunction(job):
+        return asyncio.run(job(*args))
+    return job(*args)
+
+
+class BackgroundJobs:
+    """The asyncio loop's side jobs: coroutines run as tasks, plain functions in a worker thread."""
+
+    def __init__(self):
+        self.pending = set()
+
+    def __call__(self, job, *args):
+        coro = job(*args) if asyncio.iscoroutinefunction(job) else asyncio.to_thread(job, *args)
+        task = asyncio.ensure_future(coro)
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+        return task
+
+    async def drain(self):
+        """Wait for every job started so far (and any they start)."""
+        while self.pending:
+            await asyncio.gather(*self.pending)
+
+
+def run_blocking(loop, clock, fps):
+    """Drive ``game_loop`` with ``clock.tick``, sleeping on the event queue while it idles."""
+    idle = next(loop)
+    while True:
+        if idle:
+            # A static screen is on display: sleep until something happens
+            events = [pygame.event.wait(IDLE_WAIT_MS)] + pygame.event.get()
+            clock.tick()  # keep the idle wait out of the next frame's dt
+            dt = 0.0
+        else:
+            dt = clock.tick(fps) / 1000.0
+            events = pygame.event.get()
+        try:
+            idle = loop.send((dt, events))
+        except StopIteration:
+            return
+
+
+async def run_async(loop, clock, fps, jobs=None):
+    """Drive ``game_loop`` from asyncio, awaiting between frames so other tasks run.
+
+    Frames are paced against a running deadline, so a late frame does not
+    push back the ones after it (more than one frame late, the schedule
+    restarts from now). On exit, waits for ``jobs`` (a BackgroundJobs).
+    """
+    frame_time = 1.0 / fps if fps else 0.0
+    next_frame = time.perf_counter()
+    idle = next(loop)
+    while True:
+        if idle:
+            events = pygame.event.get()
+            give_up = time.perf_counter() + IDLE_WAIT_MS / 1000
+            while not events and time.perf_counter() < give_up:
+                await asyncio.sleep(IDLE_POLL_MS / 1000)
+                events = pygame.event.get()
+            clock.tick()
+            dt = 0.0
+            next_frame = time.perf_counter()
+        else:
+            next_frame += frame_time
+            delay = next_frame - time.perf_counter()
+            if delay < -frame_time:
+                next_frame -= delay
+            await asyncio.sleep(max(delay, 0.0))
+            dt = clock.tick() / 1000.0
+            events = pygame.event.get()
+        try:
+            idle = loop.send((dt, events))
+        except StopIteration:
+            break
+    if jobs is not None:
+        await jobs.drain()
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    window = Window(options.render_scale, options.window, options.fullscreen, options.sdl_scaled)
+    display_ready = time.perf_counter()
+    clock = pygame.time.Clock()
+    scores = None
+    if not options.no_scores:
+        try:
+            scores = ScoreStore(options.scores)
+        except (OSError, sqlite3.Error) as exc:
+            print(f"high scores disabled: cannot open {options.scores}: {exc}", file=sys.stderr)
+    telemetry = TelemetryWriter(options.telemetry) if options.telemetry else None
+    try:
+        if options.async_loop:
+            jobs = BackgroundJobs()
+            loop = game_loop(options, window, jobs, display_ready, scores, telemetry)
+            asyncio.run(run_async(loop, clock, options.fps, jobs))
+        else:
+            run_blocking(game_loop(options, window, run_now, display_ready, scores, telemetry), clock, options.fps)
+    finally:
+        if scores is not None:
+            scores.close()  # writes the runs still queued
+        if telemetry is not None:
+            telemetry.close()  # writes what is still buffered and moves the frame records in
+    pygame.quit()
+
+
+def game_loop(options, window, run_job=run_now, display_ready=None, scores=None, telemetry=None):
+    """The game, one frame per iteration of a generator.
+
+    Yields whether a static screen is on display (the driver may then sleep
+    until input arrives) and is sent ``(dt, events)`` for the next frame;
+    returns when the player quits. Saving, score submission and the profile
+    export go through ``run_job(job, *args)``: ``run_now`` (``run_blocking``)
+    or a ``BackgroundJobs`` (``run_async``). Finished rounds are recorded in
+    ``scores`` (a giraffe_scores.ScoreStore), whose writes never block, and
+    every gameplay frame is appended to ``telemetry`` (a
+    giraffe_telemetry.TelemetryWriter).
+    """
+    # Everything is laid out for WIDTH x HEIGHT and drawn onto a canvas ``scale`` times that
+    screen, scale = window.canvas, window.scale
+
+    def centered(size, text, color, y):
+        blit_centered(screen, render_text(get_font(size, scale), text, color), round(y * scale))
+
+    state = GameState(giraffe_cls=Giraffe, leaf_cls=Leaf, seed=new_seed(options), impacts=ImpactQueue())
+    recording = Recording(state.seed, options.sim_hz) if options.record else None
+    stepper = FixedStepper(options.sim_hz, recording=recording)
+    rank = None  # the last round's place in the high scores
+    particles = state.effects = ParticlePool()
+    particle_sprites = ParticleSprites(particles, scale)
+    autopilot = Autopilot() if options.autopilot else None
+
+    def save_recording():
+        if recording is not None and len(recording):
+            run_job(recording.save, options.record)
+
+    # The profiler only exists while its overlay is shown or an export was asked for
+    budget = 1.0 / (options.fps or FPS)
+    profiler = overlay = None
+    if options.profile or options.profile_out:
+        profiler = FrameProfiler(budget, keep_history=bool(options.profile_out))
+    if options.profile:
+        overlay = ProfilerOverlay(scale=scale)
+    state.profiler = profiler
+
+    def save_profile():
+        # The summary and a copy of the frames are taken here, so the profiler
+        # can keep recording while a background job writes them
+        if profiler is not None and options.profile_out:
+            run_job(write_export, options.profile_out, profiler.summary(), list(profiler.history))
+
+    def post_result():
+        if options.submit_url:
+            run_job(submit_score, options.submit_url,
+                    {"seed": state.seed, "elapsed": round(state.elapsed, 3), "score": state.score})
+
+    renderer_cls = DirtyRectRenderer if options.dirty_rects else FullFrameRenderer
+    renderer = renderer_cls(screen, render_background(scale), window)
+    timer_digits = GlyphStrip(get_font(FONT_SIZE, scale), DARK)
+    menus = {}
+
+    # Visual quality: pinned by --quality, or stepped by the governor from
+    # how long each gameplay frame took to make (the frame cap's wait excluded)
+    governor = None
+    level = 0
+    if options.quality == "auto":
+        governor = QualityGovernor(budget, len(QUALITY_LEVELS))
+    else:
+        level = [q.name for q in QUALITY_LEVELS].index(options.quality)
+    quality = QUALITY_LEVELS[level]
+    atlases = {True: LeafAtlas(scale=scale), False: LeafAtlas(1, scale, outline=False)}
 
     game_state = "start"
 
     while True:
-        dt = clock.tick(FPS) / 1000.0
+        dt, events = yield renderer.idle
+        frame_start = time.perf_counter()
+        if profiler is not None:
+            profiler.begin_frame()
 
         # -------------------------
         # EVENT HANDLING
         # -------------------------
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                save_recording()
+                save_profile()
+                return
+
+            if event.type == pygame.VIDEOEXPOSE:
+                renderer.invalidate()
+
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                overlay = None if overlay is not None else ProfilerOverlay(scale=scale)
+                if overlay is not None and profiler is None:
+                    profiler = FrameProfiler(budget)
+                elif overlay is None and not options.profile_out:
+                    profiler = None
+                state.profiler = profiler
 
             # START SCREEN
             if game_state == "start":
@@ -320,184 +1238,125 @@ def main():
                 if event.type == pygame.KEYDOWN and event.key == pygame.K_p:
                     game_state = "pause"
 
-                if event.type == pygame.KEYDOWN and game_over:
+                if event.type == pygame.KEYDOWN and state.game_over:
                     if event.key == pygame.K_r:
-                        giraffe = Giraffe()
-                        leaves = []
-                        elapsed = 0.0
-                        spawn_accum = 0.0
-                        score = 0
-                        game_over = False
-                        death_reason = ""
+                        state.reseed(new_seed(options))
+                        state.reset()
+                        stepper.reset()
+                        particles.clear()
+                        rank = None
+                        if recording is not None:
+                            recording = stepper.recording = Recording(state.seed, options.sim_hz)
                     if event.key == pygame.K_ESCAPE:
-                        pygame.quit()
-                        sys.exit()
+                        save_profile()
+                        return
 
         keys = pygame.key.get_pressed()
+        if profiler is not None:
+            profiler.lap("events")
 
         # -------------------------
         # START SCREEN DRAW
         # -------------------------
         if game_state == "start":
-            screen.fill(SKY)
-
-            title = bigfont.render("GIRAFFE GAME", True, DARK)
-            prompt = font.render("Press SPACE to Start", True, DARK)
-            inst = font.render("Press I for Instructions", True, DARK)
-
-            screen.blit(title, (WIDTH//2 - title.get_width()//2, HEIGHT//2 - 120))
-            screen.blit(prompt, (WIDTH//2 - prompt.get_width()//2, HEIGHT//2))
-            screen.blit(inst, (WIDTH//2 - inst.get_width()//2, HEIGHT//2 + 40))
-
-            pygame.display.flip()
+            if renderer.begin_static("start"):
+                if "start" not in menus:
+                    menus["start"] = scaled(compose_start_screen(scores.top(5) if scores is not None else ()), scale)
+                renderer.present_static(menus["start"])
+                if options.startup_time:
+                    report = startup_report(display_ready, time.perf_counter())
+                    print("startup", json.dumps(report))
+                    return
             continue
 
         # -------------------------
         # INSTRUCTIONS SCREEN DRAW
         # -------------------------
         if game_state == "instructions":
-            screen.fill(WHITE)
-
-            lines = [
-                "INSTRUCTIONS",
-                "",
-                "Move Left/Right: A/D or ←/→",
-                "Move Head Up/Down: W/S or ↑/↓",
-                "Eat green leaves to grow your neck",
-                "Avoid letting green leaves hit the ground",
-                "",
-                "Press B to go back"
-            ]
-
-            y = 120
-            for line in lines:
-                txt = font.render(line, True, DARK)
-                screen.blit(txt, (WIDTH//2 - txt.get_width()//2, y))
-                y += 40
-
-            pygame.display.flip()
+            if renderer.begin_static("instructions"):
+                if "instructions" not in menus:
+                    menus["instructions"] = scaled(compose_instructions_screen(), scale)
+                renderer.present_static(menus["instructions"])
             continue
 
         # -------------------------
         # GAMEPLAY LOGIC
         # -------------------------
-        if game_state == "play" and not game_over:
-            elapsed += dt
-
-            # Difficulty scaling
-            fall_speed = clamp(FALL_SPEED_START + FALL_ACCEL * elapsed, FALL_SPEED_START, FALL_SPEED_CAP)
-            spawn_rate = clamp(SPAWN_PER_SEC_START + SPAWN_ACCEL * elapsed, SPAWN_PER_SEC_START, SPAWN_PER_SEC_CAP)
-            move_speed = clamp(MOVE_SPEED_START + MOVE_ACCEL * elapsed, MOVE_SPEED_START, MOVE_SPEED_CAP)
-            head_speed = clamp(HEAD_MOVE_SPEED_START + HEAD_MOVE_ACCEL * elapsed, HEAD_MOVE_SPEED_START, HEAD_MOVE_SPEED_CAP)
-
-            giraffe.update(dt, keys, move_speed, head_speed)
-
-            # Leaf spawning
-            spawn_accum += spawn_rate * dt
-            while spawn_accum >= 1.0:
-                spawn_accum -= 1.0
-                x = rng.randint(40, WIDTH - 40)
-                y = -20
-                rotten = rng.random() < ROTTEN_CHANCE
-                leaves.append(Leaf(x, y, rotten, fall_speed))
-
-            # Update leaves
-            hx, hy = giraffe.head_pos()
-            for leaf in leaves:
-                leaf.update(dt)
-
-            # Collision with head
-            remaining = []
-            for leaf in leaves:
-                r = leaf.rect()
-                if circle_rect_collide(hx, hy, HEAD_RADIUS, r):
-                    if leaf.rotten:
-                        giraffe.apply_neck_change(-NECK_SHRINK)
-                    else:
-                        giraffe.apply_neck_change(+NECK_GROW)
-                        score += 1
-                else:
-                    remaining.append(leaf)
-            leaves = remaining
-
-            # Check if leaves hit ground
-            still = []
-            for leaf in leaves:
-                if leaf.y + leaf.h / 2 >= GROUND_Y:
-                    if leaf.rotten:
-                        continue
-                    else:
-                        game_over = True
-                        death_reason = "A green leaf touched the ground"
-                        still.append(leaf)
-                else:
-                    still.append(leaf)
-            leaves = still
+        if game_state == "play" and not state.game_over:
+            inputs = autopilot(state) if autopilot is not None else keys_to_inputs(keys)
+            particles.advance(dt)
+            stepper.advance(state, inputs, dt)
+            if telemetry is not None:
+                telemetry.append(state, dt, inputs)
+            if state.game_over:
+                if recording is not None:
+                    recording.finish(state)
+                    save_recording()
+                if scores is not None:
+                    rank = scores.record(state.seed, state.elapsed, state.score, state.death_reason)
+                post_result()
+                save_profile()
+            if profiler is not None:
+                profiler.lap("sim_update")
+
+        # Pause and game over are composited over the gameplay frame once, on entry
+        if game_state == "pause" and not renderer.begin_static("pause"):
+            continue
+        if game_state == "play" and state.game_over and not renderer.begin_static("game_over"):
+            continue
 
         # -------------------------
         # DRAW GAMEPLAY
         # -------------------------
-        screen.fill(SKY)
-
-        # Ground
-        pygame.draw.rect(screen, GROUND, pygame.Rect(0, GROUND_Y, WIDTH, HEIGHT - GROUND_Y))
-        pygame.draw.line(screen, DARK, (0, GROUND_Y), (WIDTH, GROUND_Y), 3)
-
-        # Leaves
-        for leaf in leaves:
-            leaf.draw(screen)
-
-        # Giraffe
-        giraffe.draw(screen)
-
-        # HUD
-        timer_text = font.render(f"Time: {elapsed:0.1f}s", True, DARK)
-        score_text = font.render(f"Leaves eaten: {score}", True, DARK)
-        neck_text = font.render(f"Neck: {int(giraffe.neck)}/{int(NECK_CAP)}", True, DARK)
+        # Sky, ground and the controls line come from the cached background
+        renderer.clear()
+        if profiler is not None:
+            profiler.lap("clear")
 
-        screen.blit(timer_text, (18, 14))
-        screen.blit(score_text, (18, 40))
-        screen.blit(neck_text, (18, 66))
-
-        inst = font.render("Move: A/D or ←/→   Head: W/S or ↑/↓   P = Pause", True, DARK)
-        screen.blit(inst, (18, HEIGHT - 32))
+        dirty = draw_frame(screen, state, atlases[quality.fancy_leaves], timer_digits, stepper, scale, quality,
+                           particle_sprites)
+        if overlay is not None:
+            dirty.append(overlay.draw(screen, profiler, particles))
+            profiler.lap("overlay")
 
         # -------------------------
         # PAUSE SCREEN
         # -------------------------
         if game_state == "pause":
-            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 140))
-            screen.blit(overlay, (0, 0))
-
-            msg = bigfont.render("PAUSED", True, WHITE)
-            msg2 = font.render("Press P to Resume", True, WHITE)
+            screen.blit(dim_overlay(140, screen.get_size()), (0, 0))
+            centered(BIG_FONT_SIZE, "PAUSED", WHITE, HEIGHT // 2 - 40)
+            centered(FONT_SIZE, "Press P to Resume", WHITE, HEIGHT // 2 + 20)
 
-            screen.blit(msg, (WIDTH//2 - msg.get_width()//2, HEIGHT//2 - 40))
-            screen.blit(msg2, (WIDTH//2 - msg2.get_width()//2, HEIGHT//2 + 20))
-
-            pygame.display.flip()
+            renderer.present_static()
             continue
 
         # -------------------------
         # GAME OVER SCREEN
         # -------------------------
-        if game_over:
-            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 110))
-            screen.blit(overlay, (0, 0))
+        if state.game_over:
+            screen.blit(dim_overlay(110, screen.get_size()), (0, 0))
+            summary = f"Survived: {state.elapsed:0.1f}s   Good leaves eaten: {state.score}"
+            centered(BIG_FONT_SIZE, "GAME OVER", WHITE, HEIGHT // 2 - 90)
+            centered(FONT_SIZE, state.death_reason, WHITE, HEIGHT // 2 - 35)
+            centered(FONT_SIZE, summary, WHITE, HEIGHT // 2)
+            centered(FONT_SIZE, "Press R to restart, ESC to quit.", WHITE, HEIGHT // 2 + 35)
+            if rank is not None:
+                centered(FONT_SIZE, f"New high score: #{rank}", YELLOW, HEIGHT // 2 + 80)
+
+            renderer.present_static()
+            continue
 
-            msg1 = bigfont.render("GAME OVER", True, WHITE)
-            msg2 = font.render(death_reason, True, WHITE)
-            msg3 = font.render(f"Survived: {elapsed:0.1f}s   Good leaves eaten: {score}", True, WHITE)
-            msg4 = font.render("Press R to restart, ESC to quit.", True, WHITE)
+        renderer.present(dirty)
+        if profiler is not None:
+            profiler.lap("flip")
+            profiler.end_frame(len(state.leaves))
+        if governor is not None:
+            quality = QUALITY_LEVELS[governor.frame(time.perf_counter() - frame_start)]
 
-            screen.blit(msg1, (WIDTH // 2 - msg1.get_width() // 2, HEIGHT // 2 - 90))
-            screen.blit(msg2, (WIDTH // 2 - msg2.get_width() // 2, HEIGHT // 2 - 35))
-            screen.blit(msg3, (WIDTH // 2 - msg3.get_width() // 2, HEIGHT // 2))
-            screen.blit(msg4, (WIDTH // 2 - msg4.get_width() // 2, HEIGHT // 2 + 35))
 
-        pygame.display.flip()
+# End of the module's import (see startup_report)
+_IMPORTED = time.perf_counter()
+
 # -------------------------
 # RUN THE GAME
 # -------------------------
@@ -0,0 +1,208 @@
+"""
+NumPy struct-of-arrays leaf store for giraffe_sim.
+
+``LeafPool`` keeps every leaf attribute in its own array and runs the motion,
+head-collision and ground phases of ``giraffe_sim.step`` as batched array
+operations, so frame cost stays roughly flat with thousands of live leaves.
+``swept_circle_box_hits`` is the array form of the swept head test.
+
+It is optional (NumPy is not needed to play the game). Hand one to
+``GameState(leaf_pool=LeafPool())`` to use it instead of a list of ``Leaf``
+objects; the rules, including the order in which leaves are eaten, are the same.
+"""
+import math
+import random
+
+import numpy as np
+
+from giraffe_sim import LEAF_W, LEAF_H
+
+
+def swept_circle_box_hits(x0, y0, x1, y1, radius, left, top, right, bottom, box_dx=0.0, box_dy=0.0):
+    """Array version of ``giraffe_sim.swept_circle_box_collide``; every argument may be an array."""
+    end_x = x1 - np.minimum(np.maximum(x1, left), right)
+    end_y = y1 - np.minimum(np.maximum(y1, top), bottom)
+    hit = end_x * end_x + end_y * end_y <= radius * radius
+    sx = x0 + box_dx
+    sy = y0 + box_dy
+    near = ~((np.minimum(sx, x1) > right + radius) | (np.maximum(sx, x1) < left - radius)
+             | (np.minimum(sy, y1) > bottom + radius) | (np.maximum(sy, y1) < top - radius))
+    dx = x1 - sx
+    dy = y1 - sy
+    swept = (_segment_box_hits(sx, sy, dx, dy, left - radius, top, right + radius, bottom)
+             | _segment_box_hits(sx, sy, dx, dy, left, top - radius, right, bottom + radius)
+             | _segment_circle_hits(sx, sy, dx, dy, left, top, radius)
+             | _segment_circle_hits(sx, sy, dx, dy, right, top, radius)
+             | _segment_circle_hits(sx, sy, dx, dy, left, bottom, radius)
+             | _segment_circle_hits(sx, sy, dx, dy, right, bottom, radius))
+    return hit | (near & swept)
+
+
+def _segment_box_hits(sx, sy, dx, dy, left, top, right, bottom):
+    t0, t1 = 0.0, 1.0
+    for s, d, lo, hi in ((sx, dx, left, right), (sy, dy, top, bottom)):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            a = (lo - s) / d
+            b = (hi - s) / d
+        # A still coordinate either always or never lies in the slab
+        inside = (s >= lo) & (s <= hi)
+        still = d == 0.0
+        t0 = np.maximum(t0, np.where(still, np.where(inside, -np.inf, np.inf), np.minimum(a, b)))
+        t1 = np.minimum(t1, np.where(still, np.where(inside, np.inf, -np.inf), np.maximum(a, b)))
+    return t0 <= t1
+
+
+def _segment_circle_hits(sx, sy, dx, dy, cx, cy, radius):
+    length2 = dx * dx + dy * dy
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(length2 == 0.0, 0.0,
+                     np.clip(((cx - sx) * dx + (cy - sy) * dy) / length2, 0.0, 1.0))
+    ex = sx + dx * t - cx
+    ey = sy + dy * t - cy
+    return ex * ex + ey * ey <= radius * radius
+
+
+class LeafPool:
+    """Leaves stored as parallel arrays in spawn order.
+
+    Slots ``[0, n)`` are in use; eaten or rotted leaves just have ``alive``
+    cleared and are squeezed out by ``_compact`` once they outnumber the live
+    ones, which keeps spawn order (and therefore eat order) intact.
+    """
+
+    FIELDS = ("x", "y", "fall_speed", "angle", "spin", "rotten", "alive")
+
+    def __init__(self, capacity=256):
+        capacity = max(1, int(capacity))
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.fall_speed = np.zeros(capacity)
+        self.angle = np.zeros(capacity)
+        self.spin = np.zeros(capacity)
+        self.rotten = np.zeros(capacity, dtype=bool)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.n = 0
+        self.live_count = 0
+
+    def __len__(self):
+        return self.live_count
+
+    @property
+    def capacity(self):
+        return self.x.shape[0]
+
+    def clear(self):
+        self.alive[:self.n] = False
+        self.n = 0
+        self.live_count = 0
+
+    def spawn(self, x, y, rotten, fall_speed, rng=random):
+        """Add one leaf, drawing jitter, spin and angle exactly like ``giraffe_sim.Leaf``."""
+        if self.n == self.capacity:
+            self._compact()
+            if self.n == self.capacity:
+                self._grow(self.capacity * 2)
+        i = self.n
+        self.x[i] = x
+        self.y[i] = y
+        self.rotten[i] = rotten
+        self.fall_speed[i] = fall_speed * rng.uniform(0.85, 1.15)
+        self.spin[i] = rng.uniform(-2.5, 2.5)
+        self.angle[i] = rng.uniform(0, math.tau)
+        self.alive[i] = True
+        self.n = i + 1
+        self.live_count += 1
+
+    def update(self, dt):
+        n = self.n
+        self.y[:n] += self.fall_speed[:n] * dt
+        self.angle[:n] += self.spin[:n] * dt
+
+    def eat(self, hx, hy, radius, prev=None, dt=0.0):
+        """Remove leaves the head circle touched; return their rotten flags in spawn order.
+
+        ``prev`` and ``dt`` sweep the head and the leaves as in
+        ``giraffe_sim.LeafBroadphase.collide``.
+        """
+        n = self.n
+        if self.live_count == 0:
+            return []
+        x0, y0 = (hx, hy) if prev is None else prev
+        # Same integer rect as Leaf.bounds(): int() truncates toward zero.
+        left = np.trunc(self.x[:n] - LEAF_W / 2)
+        top = np.trunc(self.y[:n] - LEAF_H / 2)
+        fall = self.fall_speed[:n] * dt
+        # Only leaves whose path overlaps the head's get the exact test
+        near = ((left - radius <= max(x0, hx)) & (left + LEAF_W + radius >= min(x0, hx))
+                & (top - fall - radius <= max(y0, hy)) & (top + LEAF_H + radius >= min(y0, hy)))
+        idx = np.flatnonzero(near & self.alive[:n])
+        if idx.size == 0:
+            return []
+        left = left[idx]
+        top = top[idx]
+        idx = idx[swept_circle_box_hits(x0, y0, hx, hy, radius, left, top, left + LEAF_W, top + LEAF_H,
+                                        0.0, fall[idx])]
+        if idx.size == 0:
+            return []
+        self.alive[idx] = False
+        self.live_count -= idx.size
+        eaten = self.rotten[idx].tolist()
+        self._maybe_compact()
+        return eaten
+
+    def land(self, ground_y):
+        """Drop rotten leaves that reached ``ground_y``; return True if a green one did."""
+        n = self.n
+        if self.live_count == 0:
+            return False
+        down = (self.y[:n] + LEAF_H / 2 >= ground_y) & self.alive[:n]
+        if not down.any():
+            return False
+        rotten_down = down & self.rotten[:n]
+        gone = int(np.count_nonzero(rotten_down))
+        if gone:
+            self.alive[:n][rotten_down] = False
+            self.live_count -= gone
+            self._maybe_compact()
+        return gone < int(np.count_nonzero(down))
+
+    def live(self):
+        """(x, y, angle, rotten) arrays of the live leaves, in spawn order."""
+        keep = np.flatnonzero(self.alive[:self.n])
+        return self.x[keep], self.y[keep], self.angle[keep], self.rotten[keep]
+
+    def snapshot(self):
+        """Copies of the used slots, for ``restore``."""
+        n = self.n
+        return self.live_count, tuple([getattr(self, name)[:n].copy() for name in self.FIELDS])
+
+    def restore(self, snapshot):
+        live_count, arrays = snapshot
+        n = arrays[0].shape[0]
+        if n > self.capacity:
+            self._grow(n)
+        self.alive[n:self.n] = False
+        for name, saved in zip(self.FIELDS, arrays):
+            getattr(self, name)[:n] = saved
+        self.n = n
+        self.live_count = live_count
+
+    def _maybe_compact(self):
+        if self.n - self.live_count > self.live_count:
+            self._compact()
+
+    def _compact(self):
+        keep = np.flatnonzero(self.alive[:self.n])
+        k = keep.size
+        for name in self.FIELDS:
+            arr = getattr(self, name)
+            arr[:k] = arr[keep]
+        self.alive[k:self.n] = False
+        self.n = k
+
+    def _grow(self, capacity):
+        for name in self.FIELDS:
+            arr = getattr(self, name)
+            grown = np.zeros(capacity, dtype=arr.dtype)
+            grown[:arr.shape[0]] = arr
+            setattr(self, name, grown)
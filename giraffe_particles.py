@@ -0,0 +1,140 @@
+"""
+Fixed-capacity particle pool for eat, puff and splat effects.
+
+``ParticlePool`` keeps every particle in a handful of preallocated
+``array.array`` columns (no object per particle) used as a ring: bursts are
+written at the head and, once the pool is full, overwrite the oldest
+particles. Particles follow closed-form paths (start point, velocity and a
+per-kind gravity) and all live ``PARTICLE_LIFE`` seconds, so
+
+- ``advance(dt)`` only moves the clock and retires the particles that
+  expired, oldest first: nothing is touched per live particle;
+- ``live()`` works out every live particle's position in one pass, which
+  ``giraffe_game.ParticleSprites`` turns into a single ``Surface.blits``.
+
+Its ``eaten(leaf)`` and ``landed(leaf)`` methods make a pool the
+``GameState.effects`` hook. Bursts draw from the pool's own generator, never
+from the game's, so effects cannot change a seeded game or a replay.
+
+Like giraffe_sim, this module does not import pygame.
+"""
+import math
+import random
+from array import array
+
+from giraffe_sim import GROUND_Y
+
+# Particle kinds
+EAT = 0           # a green leaf eaten: a spray of bright crumbs
+PUFF = 1          # a rotten leaf eaten: a slow rising cloud
+SPLAT_GREEN = 2   # a green leaf on the ground
+SPLAT_ROTTEN = 3  # a rotten leaf on the ground
+KINDS = 4
+
+PARTICLE_LIFE = 0.5
+PARTICLE_CAPACITY = 256
+
+# count, speed range (px/s), direction range (radians, screen y down), gravity (px/s^2)
+BURSTS = (
+    (10, (60.0, 160.0), (0.0, math.tau), 300.0),
+    (8, (20.0, 70.0), (0.0, math.tau), -60.0),
+    (8, (80.0, 200.0), (math.pi + 0.3, math.tau - 0.3), 600.0),
+    (8, (80.0, 200.0), (math.pi + 0.3, math.tau - 0.3), 600.0),
+)
+
+
+class ParticlePool:
+    """At most ``capacity`` live particles in parallel arrays, used as a ring.
+
+    ``count`` is the number alive, ``occupancy`` the share of the pool that
+    is; ``peak`` is the highest count so far, ``emitted`` the particles ever
+    written and ``dropped`` those overwritten before they expired.
+    """
+
+    def __init__(self, capacity=PARTICLE_CAPACITY, rng=None):
+        self.capacity = capacity
+        self.rng = rng if rng is not None else random.Random(0)
+        self.x = array("d", bytes(8 * capacity))
+        self.y = array("d", bytes(8 * capacity))
+        self.vx = array("d", bytes(8 * capacity))
+        self.vy = array("d", bytes(8 * capacity))
+        self.born = array("d", bytes(8 * capacity))
+        self.kind = array("B", bytes(capacity))
+        self.clock = 0.0
+        self.head = 0  # slot the next particle goes into
+        self.count = 0
+        self.peak = 0
+        self.emitted = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def occupancy(self):
+        return self.count / self.capacity
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def burst(self, kind, x, y):
+        """Emit ``kind``'s burst of particles from (x, y)."""
+        n, (lo, hi), (a0, a1), _ = BURSTS[kind]
+        uniform = self.rng.uniform
+        cos, sin = math.cos, math.sin
+        cap = self.capacity
+        head = self.head
+        xs, ys, vxs, vys, born, kinds = self.x, self.y, self.vx, self.vy, self.born, self.kind
+        now = self.clock
+        for _ in range(min(n, cap)):
+            speed = uniform(lo, hi)
+            angle = uniform(a0, a1)
+            xs[head] = x
+            ys[head] = y
+            vxs[head] = speed * cos(angle)
+            vys[head] = speed * sin(angle)
+            born[head] = now
+            kinds[head] = kind
+            head = (head + 1) % cap
+        written = min(n, cap)
+        self.head = head
+        self.emitted += written
+        over = self.count + written - cap
+        if over > 0:
+            self.dropped += over
+        self.count = min(cap, self.count + written)
+        if self.count > self.peak:
+            self.peak = self.count
+
+    def eaten(self, leaf):
+        self.burst(PUFF if leaf.rotten else EAT, leaf.x, leaf.y)
+
+    def landed(self, leaf):
+        self.burst(SPLAT_ROTTEN if leaf.rotten else SPLAT_GREEN, leaf.x, GROUND_Y)
+
+    def advance(self, dt):
+        """Move the clock on by ``dt`` seconds and retire the particles that have expired."""
+        self.clock += dt
+        expired = self.clock - PARTICLE_LIFE
+        born = self.born
+        cap = self.capacity
+        tail = (self.head - self.count) % cap
+        while self.count and born[tail] <= expired:
+            tail = (tail + 1) % cap
+            self.count -= 1
+
+    def live(self):
+        """(kind, x, y, age) of every live particle, oldest first; ``age`` runs from 0 to 1 over its life."""
+        cap = self.capacity
+        start = (self.head - self.count) % cap
+        xs, ys, vxs, vys, born, kinds = self.x, self.y, self.vx, self.vy, self.born, self.kind
+        gravity = [b[3] * 0.5 for b in BURSTS]
+        now = self.clock
+        life = PARTICLE_LIFE
+        for i in range(start, start + self.count):
+            i %= cap
+            t = now - born[i]
+            kind = kinds[i]
+            y = ys[i] + (vys[i] + gravity[kind] * t) * t
+            yield kind, xs[i] + vxs[i] * t, (y if y < GROUND_Y else GROUND_Y), t / life
@@ -0,0 +1,205 @@
+"""
+Per-phase frame profiler for the game loop.
+
+``FrameProfiler`` splits each frame into the phases in ``PHASES`` with
+``lap(phase)`` calls: every lap charges the time since the previous one to
+``phase``, so a frame costs one clock read per phase boundary. Rolling
+percentiles cover the last ``window`` frames; ``export`` writes every frame
+as CSV or a summary plus frames as JSON.
+
+The simulation and the game only call into a profiler they have been given
+(``GameState.profiler``); with none set, the only cost is an ``is None`` test
+per phase. ``QualityGovernor`` turns the same kind of frame times into a
+visual quality level. Like giraffe_sim, this module does not import pygame.
+"""
+import csv
+import json
+import math
+import time
+from collections import deque
+
+from giraffe_sim import FPS
+
+PHASES = (
+    "events",        # event pump and key state
+    "sim_update",    # difficulty, giraffe steering, leaf motion, fixed-step bookkeeping
+    "spawn",
+    "collision",     # head vs leaves
+    "ground_check",
+    "clear",         # background restore
+    "draw_leaves",
+    "draw_particles",
+    "draw_giraffe",
+    "hud",
+    "overlay",       # drawing this profiler's own overlay
+    "flip",          # display flip / update
+)
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted sequence (0.0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class FrameProfiler:
+    """Rolling per-phase frame timings and frame-budget misses.
+
+    A frame is ``begin_frame()``, any number of ``lap(phase)`` calls (a phase
+    may be lapped several times a frame, e.g. once per simulation tick), then
+    ``end_frame(leaves)``. A frame whose lapped time exceeds ``budget``
+    seconds counts as a miss.
+    """
+
+    def __init__(self, budget=1.0 / FPS, window=240, keep_history=False, clock=time.perf_counter):
+        self.budget = budget
+        self.window = window
+        self.clock = clock
+        self.samples = {phase: deque(maxlen=window) for phase in PHASES}
+        self.totals = deque(maxlen=window)
+        self.frames = 0
+        self.misses = 0
+        self.leaves = 0
+        # Every frame as (leaves, total, *phases), for export
+        self.history = [] if keep_history else None
+        self._current = dict.fromkeys(PHASES, 0.0)
+        self._start = self._last = clock()
+
+    def begin_frame(self):
+        self._current = dict.fromkeys(PHASES, 0.0)
+        self._start = self._last = self.clock()
+
+    def lap(self, phase):
+        now = self.clock()
+        self._current[phase] += now - self._last
+        self._last = now
+
+    def end_frame(self, leaves=0):
+        current = self._current
+        total = self._last - self._start
+        for phase in PHASES:
+            self.samples[phase].append(current[phase])
+        self.totals.append(total)
+        self.frames += 1
+        self.leaves = leaves
+        if total > self.budget:
+            self.misses += 1
+        if self.history is not None:
+            self.history.append((leaves, total) + tuple(current[phase] for phase in PHASES))
+
+    @property
+    def recent_misses(self):
+        """Budget misses among the frames in the rolling window."""
+        return sum(1 for total in self.totals if total > self.budget)
+
+    def percentiles(self):
+        """{phase: (p50, p95, p99)} in seconds over the window; "total" is the whole frame."""
+        out = {}
+        for phase, values in list(self.samples.items()) + [("total", self.totals)]:
+            ordered = sorted(values)
+            out[phase] = tuple(percentile(ordered, q) for q in PERCENTILES)
+        return out
+
+    def summary(self):
+        return {
+            "frames": self.frames,
+            "window": len(self.totals),
+            "budget_ms": self.budget * 1000,
+            "misses": self.misses,
+            "recent_misses": self.recent_misses,
+            "leaves": self.leaves,
+            "percentiles_ms": {
+                phase: dict(zip((f"p{q}" for q in PERCENTILES), (v * 1000 for v in values)))
+                for phase, values in self.percentiles().items()
+            },
+        }
+
+    def export(self, path):
+        """Write ``path`` as CSV (one row per frame) or, for ``.json``, summary plus frames."""
+        write_export(path, self.summary(), self.history or ())
+
+
+def write_export(path, summary, history):
+    """``FrameProfiler.export`` from a ``summary()`` and a copy of ``history``.
+
+    Taking both on the game loop's thread lets the file be written from
+    another one while the profiler keeps recording.
+    """
+    columns = ("frame", "leaves", "total_ms") + tuple(f"{phase}_ms" for phase in PHASES)
+    rows = [(i, row[0]) + tuple(round(v * 1000, 4) for v in row[1:]) for i, row in enumerate(history)]
+    if path.endswith(".json"):
+        with open(path, "w") as f:
+            json.dump({"summary": summary, "columns": columns, "frames": rows}, f, indent=1)
+    else:
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            writer.writerows(rows)
+
+
+class QualityGovernor:
+    """Steps a quality level down under load and back up when there is headroom.
+
+    Levels run from 0 (best) to ``levels - 1``. ``frame(busy)`` takes the
+    seconds the game spent working on a frame, not counting the wait for the
+    frame cap, so headroom shows even while the frame rate is held. Frames
+    are judged in blocks of ``window``:
+
+    - a block whose ``q``th percentile passes ``high`` x ``budget`` lowers the
+      quality one level at once;
+    - ``settle`` frames in a row under ``low`` x ``budget`` raise it one level.
+
+    If a raise has to be taken back by the very next change, ``settle`` doubles
+    (up to ``max_settle``), so a level the machine cannot hold is not retried
+    every few seconds.
+    """
+
+    def __init__(self, budget=1.0 / FPS, levels=4, window=30, settle=120, high=0.9, low=0.5, q=90,
+                 max_settle=1920):
+        self.budget = budget
+        self.levels = levels
+        self.window = window
+        self.settle = settle
+        self.max_settle = max_settle
+        self.high = high
+        self.low = low
+        self.q = q
+        self.level = 0
+        self.changes = 0
+        self.load = 0.0  # the last block's percentile over the budget
+        self._samples = []
+        self._calm = 0
+        self._raised = False
+
+    def frame(self, busy):
+        """Record one frame's busy time; returns the level to draw the next frame at."""
+        samples = self._samples
+        samples.append(busy)
+        if len(samples) < self.window:
+            return self.level
+        samples.sort()
+        self.load = percentile(samples, self.q) / self.budget
+        samples.clear()
+        if self.load > self.high:
+            self._calm = 0
+            if self.level < self.levels - 1:
+                if self._raised:
+                    self.settle = min(self.settle * 2, self.max_settle)
+                self._change(+1)
+        elif self.load < self.low:
+            self._calm += self.window
+            if self._calm >= self.settle and self.level > 0:
+                self._change(-1)
+        else:
+            self._calm = 0
+        return self.level
+
+    def _change(self, step):
+        self.level += step
+        self.changes += 1
+        self._raised = step < 0
+        self._calm = 0
@@ -0,0 +1,168 @@
+"""
+Deterministic input recording and max-speed replay.
+
+A ``Recording`` is everything needed to reproduce a round: the seed, the
+simulation tick rate and one byte of INPUT_* bits per tick. Re-simulating it
+with ``replay`` runs headless (no pygame) as fast as the CPU allows and ends
+in exactly the same state, so a recording doubles as a regression check on
+the final score and elapsed time.
+
+Record a game with ``python giraffe_game.py --record run.grec``, then:
+
+    python giraffe_replay.py run.grec --check
+    python giraffe_replay.py run.grec --render 600 1200 --out frames/
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+import zlib
+
+import giraffe_sim as sim
+
+MAGIC = b"GRAFREC1"
+# magic, seed, tick rate, tick count, final elapsed, final score (-1 = unfinished)
+_HEADER = struct.Struct("<8sQHIdi")
+# The largest seed and tick rate the header holds (seeds cannot be negative)
+MAX_SEED = 2 ** 64 - 1
+MAX_HZ = 2 ** 16 - 1
+
+
+class Recording:
+    """Seed plus a compact per-tick input log."""
+
+    def __init__(self, seed, hz=sim.SIM_HZ, inputs=b""):
+        self.seed = seed
+        self.hz = hz
+        self.inputs = bytearray(inputs)
+        self.final_elapsed = None
+        self.final_score = None
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def append(self, inputs):
+        self.inputs.append(inputs)
+
+    def finish(self, state):
+        """Remember the outcome so replays can be checked against it."""
+        self.final_elapsed = state.elapsed
+        self.final_score = state.score
+
+    def to_bytes(self):
+        score = -1 if self.final_score is None else self.final_score
+        elapsed = 0.0 if self.final_elapsed is None else self.final_elapsed
+        header = _HEADER.pack(MAGIC, self.seed, self.hz, len(self.inputs), elapsed, score)
+        # Held keys repeat for many ticks, so the log compresses very well.
+        return header + zlib.compress(bytes(self.inputs), 9)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, seed, hz, ticks, elapsed, score = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a giraffe recording")
+        inputs = zlib.decompress(data[_HEADER.size:])
+        if len(inputs) != ticks:
+            raise ValueError(f"recording is truncated: {len(inputs)} of {ticks} ticks")
+        rec = cls(seed, hz, inputs)
+        if score >= 0:
+            rec.final_elapsed = elapsed
+            rec.final_score = score
+        return rec
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def replay(recording, state=None, on_tick=None):
+    """Re-simulate ``recording`` from a fresh seeded state and return the final state.
+
+    ``on_tick(tick, state)`` is called after every tick (ticks count from 1).
+    """
+    if state is None:
+        state = sim.GameState(seed=recording.seed)
+    dt = 1.0 / recording.hz
+    for tick, inputs in enumerate(recording.inputs, 1):
+        sim.step(state, inputs, dt)
+        if on_tick is not None:
+            on_tick(tick, state)
+    return state
+
+
+def matches(recording, state):
+    """Whether ``state`` ended where the recorded game did."""
+    return state.score == recording.final_score and state.elapsed == recording.final_elapsed
+
+
+def render_ticks(recording, ticks, out_dir):
+    """Replay ``recording`` and save a PNG of the game screen at each tick in ``ticks``."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    import giraffe_game as gg
+
+    os.makedirs(out_dir, exist_ok=True)
+    wanted = set(ticks)
+    surf = pygame.Surface((gg.WIDTH, gg.HEIGHT))
+    background = gg.render_background()
+    leaf_atlas = gg.LeafAtlas()
+    timer_digits = gg.GlyphStrip(gg.get_font(), gg.DARK)
+    paths = []
+
+    def on_tick(tick, state):
+        if tick in wanted:
+            surf.blit(background, (0, 0))
+            gg.draw_frame(surf, state, leaf_atlas, timer_digits)
+            path = os.path.join(out_dir, f"tick_{tick:06d}.png")
+            pygame.image.save(surf, path)
+            paths.append(path)
+
+    state = gg.GameState(giraffe_cls=gg.Giraffe, leaf_cls=gg.Leaf, seed=recording.seed)
+    replay(recording, state, on_tick)
+    return state, paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded giraffe game headless.")
+    parser.add_argument("path", help="recording written by giraffe_game.py --record")
+    parser.add_argument("--check", action="store_true",
+                        help="exit with status 1 unless the replay reproduces the recorded score and time")
+    parser.add_argument("--render", type=int, nargs="+", metavar="TICK", default=[],
+                        help="save a PNG of the screen at these ticks (needs pygame)")
+    parser.add_argument("--out", default="replay_frames", help="directory for --render images")
+    args = parser.parse_args(argv)
+
+    recording = Recording.load(args.path)
+    start = time.perf_counter()
+    if args.render:
+        state, paths = render_ticks(recording, args.render, args.out)
+    else:
+        state, paths = replay(recording), []
+    took = time.perf_counter() - start
+
+    print(f"seed {recording.seed}  {len(recording)} ticks @ {recording.hz} Hz  "
+          f"replayed in {took:.3f}s ({len(recording) / max(took, 1e-9):,.0f} ticks/s)")
+    print(f"elapsed {state.elapsed:.3f}s  score {state.score}  game over: {state.game_over}")
+    for path in paths:
+        print(f"wrote {path}")
+
+    if recording.final_score is not None:
+        ok = matches(recording, state)
+        print("matches recording" if ok else
+              f"MISMATCH: recorded elapsed {recording.final_elapsed:.3f}s score {recording.final_score}")
+        if args.check and not ok:
+            return 1
+    elif args.check:
+        print("recording has no final result to check against")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
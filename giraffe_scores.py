@@ -0,0 +1,177 @@
+"""
+Persistent high scores and run history.
+
+Every finished round is one row of an SQLite table. ``ScoreStore.record``
+never touches the disk: it updates an in-memory top list and puts the row on
+a bounded queue, and a writer thread inserts whatever has queued up in one
+transaction. The top list is loaded through an index on (score, elapsed)
+when the store opens, so the start screen never scans the history.
+
+    python giraffe_scores.py --top 10
+    python giraffe_scores.py --recent 20
+
+Like giraffe_sim, this module does not import pygame.
+"""
+import argparse
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+
+DEFAULT_PATH = os.path.join(os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share"),
+                            "giraffe_game", "scores.sqlite3")
+# How many of the best runs are kept in memory
+TOP_CACHED = 10
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    finished REAL NOT NULL,
+    seed INTEGER,
+    elapsed REAL NOT NULL,
+    score INTEGER NOT NULL,
+    reason TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_rank ON runs (score DESC, elapsed DESC);
+"""
+_COLUMNS = "finished, seed, elapsed, score, reason"
+
+Run = namedtuple("Run", "finished seed elapsed score reason")
+
+
+def _rank(run):
+    """Sort key: more good leaves first, then longer survival (ties keep the earlier run first)."""
+    return -run.score, -run.elapsed
+
+
+class ScoreStore:
+    """High scores and run history in the SQLite file ``path``.
+
+    ``record`` is safe to call from the game loop; at most ``maxsize`` runs
+    wait for the writer, and a run that finds the queue full is dropped and
+    counted in ``dropped``. ``close`` writes what is queued and stops the
+    writer.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, maxsize=64):
+        self.path = path
+        self.dropped = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        db = sqlite3.connect(path)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")  # readers do not wait for the writer
+            db.executescript(_SCHEMA)
+        finally:
+            db.close()
+        self._top = self.best(TOP_CACHED)
+        self._queue = queue.Queue(maxsize)
+        self._writer = threading.Thread(target=self._write_loop, name="score-writer", daemon=True)
+        self._writer.start()
+
+    def record(self, seed, elapsed, score, reason=""):
+        """Remember a finished round; returns its 1-based rank among the cached best, or None.
+
+        Until the table is full any round makes it in, so one that scored
+        nothing only gets a rank by pushing another round out.
+        """
+        run = Run(time.time(), seed, elapsed, score, reason)
+        try:
+            self._queue.put_nowait(run)
+        except queue.Full:
+            self.dropped += 1
+        top = self._top
+        full = len(top) >= TOP_CACHED
+        rank = next((i for i, other in enumerate(top) if _rank(run) < _rank(other)), len(top))
+        if rank >= TOP_CACHED:
+            return None
+        top.insert(rank, run)
+        del top[TOP_CACHED:]
+        if score <= 0 and not full:
+            return None
+        return rank + 1
+
+    def top(self, n=TOP_CACHED):
+        """The best ``n`` runs (at most TOP_CACHED), including ones not yet written."""
+        return self._top[:n]
+
+    def best(self, n):
+        """The best ``n`` runs written to disk, read in index order."""
+        return self._query("ORDER BY score DESC, elapsed DESC", n)
+
+    def recent(self, n=20):
+        """The last ``n`` runs written to disk, newest first."""
+        return self._query("ORDER BY id DESC", n)
+
+    def _query(self, order, n):
+        db = sqlite3.connect(self.path)
+        try:
+            return [Run(*row) for row in db.execute(f"SELECT {_COLUMNS} FROM runs {order} LIMIT ?", (n,))]
+        finally:
+            db.close()
+
+    def flush(self):
+        """Block until every queued run is written."""
+        self._queue.join()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+    def _write_loop(self):
+        db = sqlite3.connect(self.path)
+        try:
+            while True:
+                batch = [self._queue.get()]
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                runs = [run for run in batch if run is not None]
+                try:
+                    with db:
+                        db.executemany(f"INSERT INTO runs ({_COLUMNS}) VALUES (?, ?, ?, ?, ?)", runs)
+                except sqlite3.Error as exc:
+                    print(f"could not save {len(runs)} run(s) to {self.path}: {exc}", file=sys.stderr)
+                for _ in batch:
+                    self._queue.task_done()
+                if len(runs) < len(batch):
+                    return
+        finally:
+            db.close()
+
+
+def format_runs(runs):
+    lines = [f"{'#':>3} {'score':>6} {'time s':>8}  {'finished':<19}  seed"]
+    for i, run in enumerate(runs, 1):
+        finished = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run.finished))
+        lines.append(f"{i:>3} {run.score:>6} {run.elapsed:>8.1f}  {finished:<19}  {run.seed}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show the giraffe game's high scores and run history.")
+    parser.add_argument("--db", default=DEFAULT_PATH, help="score database (default: %(default)s)")
+    parser.add_argument("--top", type=int, default=TOP_CACHED, help="best runs to show (default: %(default)s)")
+    parser.add_argument("--recent", type=int, metavar="N", help="show the last N runs instead")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"no scores yet ({args.db})")
+        return 0
+    store = ScoreStore(args.db)
+    try:
+        print(format_runs(store.recent(args.recent) if args.recent else store.best(args.top)))
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,774 @@
+"""
+Headless simulation core for the giraffe game.
+
+Nothing in here imports pygame or touches a display. ``giraffe_game`` layers
+drawing and keyboard handling on top of these classes, while tools and tests
+can drive ``step`` directly and run games far faster than real time.
+"""
+import copy
+import heapq
+import math
+import random
+from collections import namedtuple
+
+# ----------------------------
+# Game constants
+# ----------------------------
+
+WIDTH, HEIGHT = 1000, 700
+FPS = 60
+
+GROUND_Y = HEIGHT - 60
+
+# Difficulty scaling
+FALL_SPEED_START = 180.0
+FALL_SPEED_CAP = 520.0
+FALL_ACCEL = 6.0
+
+SPAWN_PER_SEC_START = 0.85
+SPAWN_PER_SEC_CAP = 3.6
+SPAWN_ACCEL = 0.035
+
+MOVE_SPEED_START = 260.0
+MOVE_SPEED_CAP = 520.0
+MOVE_ACCEL = 4.5
+
+HEAD_MOVE_SPEED_START = 260.0
+HEAD_MOVE_SPEED_CAP = 520.0
+HEAD_MOVE_ACCEL = 4.5
+
+ROTTEN_CHANCE = 0.22
+
+# Neck growth
+NECK_START = 90.0
+NECK_CAP = 520.0
+NECK_GROW = 18.0
+NECK_SHRINK = 26.0
+NECK_MIN = 40.0
+
+HEAD_RADIUS = 18
+LEAF_W, LEAF_H = 18, 12
+
+# Fixed simulation tick used by the windowed game (see FixedStepper)
+SIM_HZ = 120
+MAX_CATCHUP_STEPS = 8
+
+# Input bits held during a step (see giraffe_game.keys_to_inputs)
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_UP = 4
+INPUT_DOWN = 8
+
+
+def clamp(v, lo, hi):
+    return lo if v < lo else hi if v > hi else v
+
+
+def lerp(a, b, t):
+    """Linear interpolation between a and b by t in [0, 1].
+    Accepts t outside [0,1] and extrapolates accordingly for generality.
+    """
+    return a + (b - a) * t
+
+
+def circle_box_collide(cx, cy, radius, left, top, right, bottom):
+    closest_x = clamp(cx, left, right)
+    closest_y = clamp(cy, top, bottom)
+    dx = cx - closest_x
+    dy = cy - closest_y
+    return (dx * dx + dy * dy) <= radius * radius
+
+
+def circle_rect_collide(cx, cy, radius, rect) -> bool:
+    """Circle vs. anything with left/top/right/bottom (e.g. a pygame.Rect)."""
+    return circle_box_collide(cx, cy, radius, rect.left, rect.top, rect.right, rect.bottom)
+
+
+def swept_circle_box_collide(x0, y0, x1, y1, radius, left, top, right, bottom, box_dx=0.0, box_dy=0.0):
+    """Whether a circle moving from (x0, y0) to (x1, y1) touches a moving box on the way.
+
+    (left, top, right, bottom) is where the box ends up after moving by
+    (box_dx, box_dy) over the same interval; both move in straight lines at
+    constant speed. Unlike ``circle_box_collide`` at the end positions, a fast
+    box cannot pass through the circle between the two.
+    """
+    if circle_box_collide(x1, y1, radius, left, top, right, bottom):
+        return True
+    # Seen from the box, the centre moves from (sx, sy) to (x1, y1)
+    sx = x0 + box_dx
+    sy = y0 + box_dy
+    if (min(sx, x1) > right + radius or max(sx, x1) < left - radius
+            or min(sy, y1) > bottom + radius or max(sy, y1) < top - radius):
+        return False
+    # The box grown by the radius is two crossed rectangles and four corner circles
+    dx = x1 - sx
+    dy = y1 - sy
+    return (_segment_box(sx, sy, dx, dy, left - radius, top, right + radius, bottom)
+            or _segment_box(sx, sy, dx, dy, left, top - radius, right, bottom + radius)
+            or _segment_circle(sx, sy, dx, dy, left, top, radius)
+            or _segment_circle(sx, sy, dx, dy, right, top, radius)
+            or _segment_circle(sx, sy, dx, dy, left, bottom, radius)
+            or _segment_circle(sx, sy, dx, dy, right, bottom, radius))
+
+
+def _segment_box(sx, sy, dx, dy, left, top, right, bottom):
+    """Whether the segment from (sx, sy) to (sx + dx, sy + dy) meets the box (slab test)."""
+    t0, t1 = 0.0, 1.0
+    for s, d, lo, hi in ((sx, dx, left, right), (sy, dy, top, bottom)):
+        if d == 0.0:
+            if s < lo or s > hi:
+                return False
+            continue
+        a = (lo - s) / d
+        b = (hi - s) / d
+        t0 = max(t0, min(a, b))
+        t1 = min(t1, max(a, b))
+        if t0 > t1:
+            return False
+    return True
+
+
+def _segment_circle(sx, sy, dx, dy, cx, cy, radius):
+    """Whether the segment from (sx, sy) to (sx + dx, sy + dy) comes within ``radius`` of (cx, cy)."""
+    length2 = dx * dx + dy * dy
+    t = 0.0 if length2 == 0.0 else clamp(((cx - sx) * dx + (cy - sy) * dy) / length2, 0.0, 1.0)
+    ex = sx + dx * t - cx
+    ey = sy + dy * t - cy
+    return ex * ex + ey * ey <= radius * radius
+
+
+class Leaf:
+    def __init__(self, x, y, rotten, fall_speed, rng=random):
+        self.x = x
+        self.y = y
+        self.rotten = rotten
+        self.fall_speed = fall_speed * rng.uniform(0.85, 1.15)
+        self.w = LEAF_W
+        self.h = LEAF_H
+        self.spin = rng.uniform(-2.5, 2.5)
+        self.angle = rng.uniform(0, math.tau)
+
+    def bounds(self):
+        """Integer (left, top, right, bottom), matching what ``pygame.Rect`` would hold."""
+        left = int(self.x - self.w / 2)
+        top = int(self.y - self.h / 2)
+        return left, top, left + self.w, top + self.h
+
+    def update(self, dt):
+        self.y += self.fall_speed * dt
+        self.angle += self.spin * dt
+
+    def swept_by(self, x0, y0, x1, y1, radius, dt):
+        """Whether a circle moving from (x0, y0) to (x1, y1) touched this leaf during its last ``update(dt)``."""
+        return swept_circle_box_collide(x0, y0, x1, y1, radius, *self.bounds(), 0.0, self.fall_speed * dt)
+
+
+class Giraffe:
+    def __init__(self):
+        self.base_x = WIDTH // 2
+        self.base_y = GROUND_Y
+        self.neck = NECK_START
+        self.head_offset = self.neck * 0.7  # head starts 70% up the neck
+
+    def head_pos(self):
+        return self.base_x, self.base_y - self.head_offset
+
+    def top_pos(self):
+        return self.base_x, self.base_y - self.neck
+
+    def pose(self):
+        return self.base_x, self.head_offset, self.neck
+
+    def interpolated(self, prev_pose, alpha):
+        """Copy of this giraffe placed ``alpha`` of the way from ``prev_pose`` to now."""
+        if prev_pose is None:
+            return self
+        view = copy.copy(self)
+        view.base_x = lerp(prev_pose[0], self.base_x, alpha)
+        view.head_offset = lerp(prev_pose[1], self.head_offset, alpha)
+        view.neck = lerp(prev_pose[2], self.neck, alpha)
+        return view
+
+    def steer(self, dt, inputs, move_speed, head_speed):
+        """Move body and head for ``dt`` seconds with the INPUT_* bits in ``inputs`` held."""
+        # Move body left/right
+        dx = 0.0
+        if inputs & INPUT_LEFT:
+            dx -= move_speed
+        if inputs & INPUT_RIGHT:
+            dx += move_speed
+        self.base_x += dx * dt
+        self.base_x = clamp(self.base_x, 60, WIDTH - 60)
+
+        # Move head up/down
+        dh = 0.0
+        if inputs & INPUT_UP:
+            dh += head_speed
+        if inputs & INPUT_DOWN:
+            dh -= head_speed
+        self.head_offset += dh * dt
+        self.head_offset = clamp(self.head_offset, 20.0, self.neck)
+
+    def apply_neck_change(self, delta):
+        # Keep head at same percentage of neck
+        if self.neck > 0:
+            ratio = self.head_offset / self.neck
+        else:
+            ratio = 0.7  # fallback
+
+        new_neck = clamp(self.neck + delta, NECK_MIN, NECK_CAP)
+
+        # When the neck shrinks all the way to NECK_MIN, tests expect the head to be
+        # clamped up to NECK_MIN as well (so it sits at the very top of the neck),
+        # not the generic 20.0 lower bound used otherwise.
+        min_head = NECK_MIN if new_neck <= NECK_MIN else 20.0
+
+        self.neck = new_neck
+        self.head_offset = clamp(new_neck * ratio, min_head, new_neck)
+
+
+class LeafBroadphase:
+    """Uniform x-column buckets used to cut down head-vs-leaf narrow-phase tests.
+
+    Leaves fall straight down, so a leaf's column never changes after spawning:
+    it is bucketed once on insert and dropped on removal. ``collide`` only runs
+    the narrow-phase test on leaves whose column is within reach of the head's
+    path; ``skipped`` counts the tests avoided so far.
+    """
+
+    def __init__(self, cell=2 * HEAD_RADIUS + LEAF_W):
+        self.cell = cell
+        self.buckets = {}
+        self.count = 0
+        self.tested = 0
+        self.skipped = 0
+        self._seq = 0
+
+    def clear(self):
+        self.buckets.clear()
+        self.count = 0
+
+    def insert(self, leaf):
+        col = int(leaf.x // self.cell)
+        self.buckets.setdefault(col, []).append((self._seq, leaf))
+        self._seq += 1
+        self.count += 1
+
+    def remove(self, leaf):
+        bucket = self.buckets.get(int(leaf.x // self.cell))
+        if not bucket:
+            return
+        for i, (_, other) in enumerate(bucket):
+            if other is leaf:
+                del bucket[i]
+                self.count -= 1
+                return
+
+    def collide(self, hx, hy, radius, prev=None, dt=0.0):
+        """Remove and return the leaves the head circle touched, in insertion order.
+
+        ``prev`` is where the head was ``dt`` seconds ago (default: at (hx, hy));
+        the head and the leaves are swept over that interval (see ``Leaf.swept_by``).
+        """
+        x0, y0 = (hx, hy) if prev is None else prev
+        # int() in Leaf.bounds() can shift the rect left by up to one pixel.
+        reach = radius + LEAF_W / 2 + 1
+        hits = []
+        examined = 0
+        for col in range(int((min(x0, hx) - reach) // self.cell), int((max(x0, hx) + reach) // self.cell) + 1):
+            bucket = self.buckets.get(col)
+            if not bucket:
+                continue
+            examined += len(bucket)
+            kept = []
+            for entry in bucket:
+                if entry[1].swept_by(x0, y0, hx, hy, radius, dt):
+                    hits.append(entry)
+                else:
+                    kept.append(entry)
+            if len(kept) != len(bucket):
+                self.buckets[col] = kept
+        self.tested += examined
+        self.skipped += self.count - examined
+        self.count -= len(hits)
+        hits.sort(key=lambda entry: entry[0])
+        return [leaf for _, leaf in hits]
+
+
+class ImpactQueue:
+    """Ground impacts of the list leaf store, scheduled once per leaf on a heap.
+
+    A leaf falls at a constant ``fall_speed``, so when it will reach the ground
+    is known as soon as it is inserted. ``advance`` moves the queue's clock on
+    by a step and pops only the leaves due by then; each is still checked with
+    the exact ``leaf.y + leaf.h / 2 >= GROUND_Y`` test, so results match a scan
+    of every leaf. ``discard`` (a leaf eaten before landing) only marks its
+    entry, which is dropped when it comes up. ``checked`` counts the leaves
+    tested so far and ``stale`` the discarded entries popped.
+    """
+
+    # Due times are sums of step lengths, as leaf positions are; this covers their rounding.
+    SLACK = 1e-6
+
+    def __init__(self):
+        self.heap = []
+        self.clock = 0.0
+        self.checked = 0
+        self.stale = 0
+        self._entries = {}
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self.heap.clear()
+        self._entries.clear()
+        self.clock = 0.0
+
+    def insert(self, leaf):
+        """Schedule ``leaf`` from where it is now; call before the step that first moves it."""
+        left = GROUND_Y - leaf.h / 2 - leaf.y
+        if left <= 0:
+            due = self.clock
+        elif leaf.fall_speed > 0:
+            due = self.clock + left / leaf.fall_speed
+        else:
+            due = math.inf
+        entry = [due, self._seq, leaf]
+        self._seq += 1
+        self._entries[leaf] = entry
+        heapq.heappush(self.heap, entry)
+
+    def discard(self, leaf):
+        entry = self._entries.pop(leaf, None)
+        if entry is not None:
+            entry[2] = None
+
+    def advance(self, dt):
+        """Move the clock on by ``dt`` and remove and return the leaves on the ground, in insertion order."""
+        self.clock += dt
+        heap = self.heap
+        horizon = self.clock + self.SLACK
+        landed = []
+        early = []
+        while heap and heap[0][0] <= horizon:
+            entry = heapq.heappop(heap)
+            leaf = entry[2]
+            if leaf is None:
+                self.stale += 1
+                continue
+            self.checked += 1
+            if leaf.y + leaf.h / 2 >= GROUND_Y:
+                del self._entries[leaf]
+                landed.append(entry)
+            else:
+                early.append(entry)  # due within rounding; checked again next step
+        for entry in early:
+            heapq.heappush(heap, entry)
+        landed.sort(key=lambda entry: entry[1])
+        return [entry[2] for entry in landed]
+
+
+def difficulty(elapsed):
+    """(fall_speed, spawn_rate, move_speed, head_speed) after ``elapsed`` seconds."""
+    fall_speed = clamp(FALL_SPEED_START + FALL_ACCEL * elapsed, FALL_SPEED_START, FALL_SPEED_CAP)
+    spawn_rate = clamp(SPAWN_PER_SEC_START + SPAWN_ACCEL * elapsed, SPAWN_PER_SEC_START, SPAWN_PER_SEC_CAP)
+    move_speed = clamp(MOVE_SPEED_START + MOVE_ACCEL * elapsed, MOVE_SPEED_START, MOVE_SPEED_CAP)
+    head_speed = clamp(HEAD_MOVE_SPEED_START + HEAD_MOVE_ACCEL * elapsed, HEAD_MOVE_SPEED_START, HEAD_MOVE_SPEED_CAP)
+    return fall_speed, spawn_rate, move_speed, head_speed
+
+
+# A whole round frozen by ``GameState.snapshot``. Leaves and giraffe are attribute
+# dicts (pooled leaves: ``LeafPool.snapshot`` arrays) and the RNGs ``getstate()`` tuples.
+Snapshot = namedtuple("Snapshot", "seed rng leaf_rng giraffe leaves elapsed spawn_accum score game_over death_reason")
+
+
+def _fresh_rng(rng):
+    """An unseeded generator of ``rng``'s type, to be ``setstate``-d (the ``random`` module gives a Random)."""
+    cls = type(rng) if isinstance(rng, random.Random) else random.Random
+    return cls.__new__(cls)
+
+
+class GameState:
+    """Everything that changes during a round.
+
+    ``giraffe_cls`` and ``leaf_cls`` let the windowed game plug in its drawable
+    subclasses; headless callers keep the plain ones from this module.
+
+    ``leaf_pool`` swaps the list of ``leaf_cls`` objects for a batched store such
+    as ``giraffe_leafpool.LeafPool``; ``leaves`` then refers to the pool.
+
+    ``broadphase`` (a ``LeafBroadphase``) limits the head test of the list store
+    to leaves near the head. Leaves spawned by ``step`` are indexed
+    automatically; anything appended to ``leaves`` by hand must also be
+    ``broadphase.insert``-ed.
+
+    ``impacts`` (an ``ImpactQueue``) replaces the list store's per-step ground
+    scan: each leaf is scheduled once when spawned and only leaves that are
+    due are checked. As with ``broadphase``, leaves added by hand must be
+    ``impacts.insert``-ed.
+
+    ``seed`` makes the round reproducible: spawning draws from ``rng`` and
+    each leaf's speed jitter, spin and angle from ``leaf_rng``, two streams
+    derived from the seed; the global ``random`` module is not used. Without
+    one, spawning draws from ``rng`` (by default an OS-seeded generator, so
+    two unseeded rounds differ) and leaves from a private generator seeded
+    with one draw from the global ``random`` module when the state is made.
+    That draw is the only use of the global stream: an unseeded state given
+    the same ``rng`` after the same ``random.seed`` plays the same round.
+
+    ``profiler`` (a ``giraffe_profile.FrameProfiler``) is lapped between the
+    phases of ``step``; with None, stepping pays nothing for it.
+
+    ``effects`` (e.g. a ``giraffe_particles.ParticlePool``) is told about each
+    leaf of the list store that is eaten (``effects.eaten(leaf)``) or reaches
+    the ground (``effects.landed(leaf)``). It is for show: it must not change
+    the state or draw from its RNGs.
+
+    ``snapshot`` freezes the round, RNG state included, for ``restore``
+    (rewind) or ``clone`` (an independent copy to play ahead in). Both cost
+    microseconds, so a bot can branch many futures per frame.
+    """
+
+    def __init__(self, rng=None, giraffe_cls=Giraffe, leaf_cls=Leaf, leaf_pool=None, broadphase=None,
+                 seed=None, profiler=None, impacts=None, effects=None):
+        if leaf_pool is not None and broadphase is not None:
+            raise ValueError("broadphase only applies to the list leaf store")
+        if leaf_pool is not None and impacts is not None:
+            raise ValueError("impacts only applies to the list leaf store")
+        if seed is not None:
+            self.reseed(seed)
+        else:
+            self.seed = None
+            self.rng = rng if rng is not None else random.Random()
+            self.leaf_rng = random.Random(random.getrandbits(64))
+        self.giraffe_cls = giraffe_cls
+        self.leaf_cls = leaf_cls
+        self.leaf_pool = leaf_pool
+        self.broadphase = broadphase
+        self.impacts = impacts
+        self.profiler = profiler
+        self.effects = effects
+        self.reset()
+
+    def reseed(self, seed):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.leaf_rng = random.Random(f"{seed}:leaves")
+
+    def reset(self):
+        self.giraffe = self.giraffe_cls()
+        if self.leaf_pool is not None:
+            self.leaf_pool.clear()
+            self.leaves = self.leaf_pool
+        else:
+            self.leaves = []
+        if self.broadphase is not None:
+            self.broadphase.clear()
+        if self.impacts is not None:
+            self.impacts.clear()
+        self.elapsed = 0.0
+        self.spawn_accum = 0.0
+        self.score = 0
+        self.game_over = False
+        self.death_reason = ""
+
+    def snapshot(self):
+        """The round as it stands, as a ``Snapshot``; later play does not change it."""
+        pool = self.leaf_pool
+        if pool is not None:
+            leaves = pool.snapshot()
+        else:
+            leaves = tuple([leaf.__dict__.copy() for leaf in self.leaves])
+        return Snapshot(self.seed, self.rng.getstate(), self.leaf_rng.getstate(), self.giraffe.__dict__.copy(),
+                        leaves, self.elapsed, self.spawn_accum, self.score, self.game_over, self.death_reason)
+
+    def restore(self, snapshot):
+        """Put the round back to ``snapshot``; it can be restored again later.
+
+        Only this state's own generators are rewound. Returns the state for
+        convenience.
+        """
+        self.seed = snapshot.seed
+        self.rng.setstate(snapshot.rng)
+        self.leaf_rng.setstate(snapshot.leaf_rng)
+        new = object.__new__
+        self.giraffe = new(self.giraffe_cls)
+        self.giraffe.__dict__ = snapshot.giraffe.copy()
+        pool = self.leaf_pool
+        if pool is not None:
+            pool.restore(snapshot.leaves)
+            self.leaves = pool
+        else:
+            leaf_cls = self.leaf_cls
+            self.leaves = leaves = []
+            append = leaves.append
+            for fields in snapshot.leaves:
+                leaf = new(leaf_cls)
+                leaf.__dict__ = fields.copy()
+                append(leaf)
+            index = self.broadphase
+            if index is not None:
+                index.clear()
+                for leaf in leaves:
+                    index.insert(leaf)
+            impacts = self.impacts
+            if impacts is not None:
+                impacts.clear()
+                for leaf in leaves:
+                    impacts.insert(leaf)
+        self.elapsed = snapshot.elapsed
+        self.spawn_accum = snapshot.spawn_accum
+        self.score = snapshot.score
+        self.game_over = snapshot.game_over
+        self.death_reason = snapshot.death_reason
+        return self
+
+    def clone(self, snapshot=None):
+        """An independent state at ``snapshot`` (default: now) with its own RNGs, leaf store and index.
+
+        The clone plays on exactly as this state would; it has no profiler or effects.
+        """
+        twin = copy.copy(self)
+        twin.rng = _fresh_rng(self.rng)
+        twin.leaf_rng = _fresh_rng(self.leaf_rng)
+        if self.leaf_pool is not None:
+            twin.leaf_pool = type(self.leaf_pool)(self.leaf_pool.capacity)
+        if self.broadphase is not None:
+            twin.broadphase = LeafBroadphase(self.broadphase.cell)
+        if self.impacts is not None:
+            twin.impacts = ImpactQueue()
+        twin.profiler = None
+        twin.effects = None
+        return twin.restore(self.snapshot() if snapshot is None else snapshot)
+
+
+def step(state, inputs, dt):
+    """Advance ``state`` by ``dt`` seconds with ``inputs`` (INPUT_* bits) held.
+
+    Runs one frame of gameplay: difficulty ramp, giraffe movement, spawning,
+    leaf motion, head collision (swept over ``dt``, so a long step cannot
+    skip a leaf past the head) and the ground check. Does nothing once the
+    game is over. Returns ``state`` for convenience.
+    """
+    if state.game_over:
+        return state
+
+    state.elapsed += dt
+    fall_speed, spawn_rate, move_speed, head_speed = difficulty(state.elapsed)
+
+    giraffe = state.giraffe
+    head_start = giraffe.head_pos()
+    giraffe.steer(dt, inputs, move_speed, head_speed)
+    prof = state.profiler
+    if prof is not None:
+        prof.lap("sim_update")
+
+    # Leaf spawning
+    pool = state.leaf_pool
+    rng = state.rng
+    state.spawn_accum += spawn_rate * dt
+    while state.spawn_accum >= 1.0:
+        state.spawn_accum -= 1.0
+        x = rng.randint(40, WIDTH - 40)
+        y = -20
+        rotten = rng.random() < ROTTEN_CHANCE
+        if pool is None:
+            leaf = state.leaf_cls(x, y, rotten, fall_speed, state.leaf_rng)
+            state.leaves.append(leaf)
+            if state.broadphase is not None:
+                state.broadphase.insert(leaf)
+            if state.impacts is not None:
+                state.impacts.insert(leaf)
+        else:
+            pool.spawn(x, y, rotten, fall_speed, state.leaf_rng)
+    if prof is not None:
+        prof.lap("spawn")
+
+    hx, hy = giraffe.head_pos()
+    if pool is None:
+        _advance_leaf_list(state, head_start, hx, hy, dt)
+    else:
+        _advance_leaf_pool(state, pool, head_start, hx, hy, dt)
+    return state
+
+
+def _eat(state, rotten):
+    if rotten:
+        state.giraffe.apply_neck_change(-NECK_SHRINK)
+    else:
+        state.giraffe.apply_neck_change(+NECK_GROW)
+        state.score += 1
+
+
+def _land(state):
+    state.game_over = True
+    state.death_reason = "A green leaf touched the ground"
+
+
+def _advance_leaf_list(state, head_start, hx, hy, dt):
+    # Update leaves
+    leaves = state.leaves
+    for leaf in leaves:
+        leaf.update(dt)
+    prof = state.profiler
+    if prof is not None:
+        prof.lap("sim_update")
+
+    # Collision with head, swept over the step so fast leaves cannot pass through it
+    index = state.broadphase
+    impacts = state.impacts
+    effects = state.effects
+    if index is None:
+        x0, y0 = head_start
+        remaining = []
+        for leaf in leaves:
+            if leaf.swept_by(x0, y0, hx, hy, HEAD_RADIUS, dt):
+                _eat(state, leaf.rotten)
+                if impacts is not None:
+                    impacts.discard(leaf)
+                if effects is not None:
+                    effects.eaten(leaf)
+            else:
+                remaining.append(leaf)
+    else:
+        eaten = index.collide(hx, hy, HEAD_RADIUS, head_start, dt)
+        remaining = leaves
+        if eaten:
+            gone = {id(leaf) for leaf in eaten}
+            remaining = [leaf for leaf in leaves if id(leaf) not in gone]
+            for leaf in eaten:
+                _eat(state, leaf.rotten)
+                if impacts is not None:
+                    impacts.discard(leaf)
+                if effects is not None:
+                    effects.eaten(leaf)
+    if prof is not None:
+        prof.lap("collision")
+
+    if impacts is not None:
+        _land_due(state, impacts.advance(dt), remaining, index)
+        if prof is not None:
+            prof.lap("ground_check")
+        return
+
+    # Check if leaves hit ground
+    still = []
+    for leaf in remaining:
+        if leaf.y + leaf.h / 2 >= GROUND_Y:
+            if effects is not None:
+                effects.landed(leaf)
+            if leaf.rotten:
+                if index is not None:
+                    index.remove(leaf)
+                continue
+            _land(state)
+        still.append(leaf)
+    state.leaves = still
+    if prof is not None:
+        prof.lap("ground_check")
+
+
+def _land_due(state, landed, remaining, index):
+    """Ground handling for the leaves ``ImpactQueue.advance`` found on the ground this step."""
+    effects = state.effects
+    gone = set()
+    for leaf in landed:
+        if effects is not None:
+            effects.landed(leaf)
+        if leaf.rotten:
+            gone.add(id(leaf))
+            if index is not None:
+                index.remove(leaf)
+        else:
+            _land(state)
+    if gone:
+        # One pass per step, as for eaten leaves, instead of a list search per landing
+        remaining = [leaf for leaf in remaining if id(leaf) not in gone]
+    state.leaves = remaining
+
+
+def _advance_leaf_pool(state, pool, head_start, hx, hy, dt):
+    prof = state.profiler
+    pool.update(dt)
+    if prof is not None:
+        prof.lap("sim_update")
+    for rotten in pool.eat(hx, hy, HEAD_RADIUS, head_start, dt):
+        _eat(state, rotten)
+    if prof is not None:
+        prof.lap("collision")
+    if pool.land(GROUND_Y):
+        _land(state)
+    if prof is not None:
+        prof.lap("ground_check")
+
+
+class FixedStepper:
+    """Runs ``step`` at a fixed tick rate, independent of the render frame rate.
+
+    ``advance`` banks real frame time and runs as many whole ticks as it covers,
+    at most ``max_steps`` per call. Time beyond that is dropped (and added to
+    ``dropped``) so one long hitch slows the game down rather than snowballing
+    into ever longer catch-up frames.
+
+    For rendering, ``alpha`` says how far the leftover time reaches into the
+    next tick and ``prev_pose`` is the giraffe before the latest tick; drawing
+    at ``lag`` seconds behind the simulation interpolates between the two.
+
+    ``recording``, if set, gets ``append(inputs)`` once per tick run (see
+    ``giraffe_replay.Recording``).
+    """
+
+    def __init__(self, hz=SIM_HZ, max_steps=MAX_CATCHUP_STEPS, recording=None):
+        self.hz = hz
+        self.tick = 1.0 / hz
+        self.max_steps = max_steps
+        self.recording = recording
+        self.reset()
+
+    def reset(self):
+        self.accum = 0.0
+        self.prev_pose = None
+        self.ticks = 0
+        self.dropped = 0.0
+
+    def advance(self, state, inputs, frame_dt):
+        """Feed ``frame_dt`` seconds of real time; returns the number of ticks run."""
+        self.accum += frame_dt
+        steps = 0
+        while self.accum >= self.tick and not state.game_over:
+            if steps == self.max_steps:
+                behind = self.accum - self.accum % self.tick
+                self.dropped += behind
+                self.accum -= behind
+                break
+            self.prev_pose = state.giraffe.pose()
+            step(state, inputs, self.tick)
+            if self.recording is not None:
+                self.recording.append(inputs)
+            self.accum -= self.tick
+            steps += 1
+        self.ticks += steps
+        return steps
+
+    @property
+    def alpha(self):
+        return min(self.accum / self.tick, 1.0)
+
+    @property
+    def lag(self):
+        """Seconds the interpolated frame trails the latest simulated tick."""
+        return (1.0 - self.alpha) * self.tick
+
+
+def run(state, policy, dt=1.0 / FPS, max_frames=None):
+    """Step ``state`` until game over (or ``max_frames``) using ``policy(state) -> inputs``.
+
+    Returns the number of frames simulated.
+    """
+    frames = 0
+    while not state.game_over and (max_frames is None or frames < max_frames):
+        step(state, policy(state), dt)
+        frames += 1
+    return frames
@@ -0,0 +1,267 @@
+"""
+Difficulty tuning sweep: many seeded headless games per parameter set.
+
+Each parameter set overrides some of giraffe_sim's tuning constants
+(``FALL_ACCEL``, ``SPAWN_ACCEL``, ``ROTTEN_CHANCE``, ``NECK_GROW`` ...). The
+games are played by a scripted policy on a process pool, every parameter set
+on the same seeds, and the survival times and scores are summarised per set:
+
+    python giraffe_sweep.py --games 1000 --set FALL_ACCEL=4,6,8 --set ROTTEN_CHANCE=0.15,0.22
+    python giraffe_sweep.py --games 200 --policy zigzag --json sweep.json
+
+Games are cut off after ``--max-time`` simulated seconds; the report counts
+them as ``capped``.
+"""
+import argparse
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import giraffe_sim as sim
+from giraffe_autopilot import Autopilot
+
+QUANTILES = (10, 25, 50, 75, 90)
+
+
+# ----------------------------
+# Scripted policies
+# ----------------------------
+
+def idle(state):
+    return 0
+
+
+def zigzag(state):
+    """Sweep the body across the field with the head low."""
+    frame = int(state.elapsed * 60)
+    horizontal = sim.INPUT_RIGHT if (frame // 90) % 2 else sim.INPUT_LEFT
+    return horizontal | sim.INPUT_DOWN
+
+
+def chase(state, reach=20.0, lookahead=6):
+    """Keep the head low and walk so the next few green leaves can all be caught.
+
+    Green leaves are taken in the order they will reach head height. Going
+    backwards from the last of them, each leaf narrows the range of body
+    positions from which it and every later one can still be reached at the
+    current walking speed; the giraffe heads for the nearest point of the
+    range for the first leaf. Leaves that cannot all be saved are dropped from
+    the end of the plan.
+    """
+    giraffe = state.giraffe
+    head_y = giraffe.base_y - 20.0
+    move_speed = sim.difficulty(state.elapsed)[2]
+    upcoming = sorted(((head_y - leaf.y) / leaf.fall_speed, leaf.x)
+                      for leaf in state.leaves if not leaf.rotten and leaf.y < head_y)[:lookahead]
+
+    target = None
+    while upcoming and target is None:
+        lo, hi = -float("inf"), float("inf")
+        later = None
+        for eta, x in reversed(upcoming):
+            if later is not None:
+                slack = move_speed * (later - eta)
+                lo, hi = lo - slack, hi + slack
+            lo, hi = max(lo, x - reach), min(hi, x + reach)
+            if lo > hi:
+                break
+            later = eta
+        else:
+            target = sim.clamp(giraffe.base_x, lo, hi)
+        upcoming.pop()
+
+    inputs = sim.INPUT_DOWN
+    if target is not None:
+        dx = target - giraffe.base_x
+        if dx > 2:
+            inputs |= sim.INPUT_RIGHT
+        elif dx < -2:
+            inputs |= sim.INPUT_LEFT
+    return inputs
+
+
+# No wall-clock budget, so a sweep plays the same games every time
+POLICIES = {"idle": idle, "zigzag": zigzag, "chase": chase, "autopilot": Autopilot(budget=None)}
+
+
+# ----------------------------
+# Playing games
+# ----------------------------
+
+def tunables():
+    """Names of giraffe_sim's difficulty constants, the ones a sweep may override.
+
+    These are its float constants: speeds, ramps, spawn rates, neck growth and
+    ``ROTTEN_CHANCE``. The integer ones (``WIDTH``, ``GROUND_Y``, ``SIM_HZ``,
+    ``LEAF_W`` ...) are geometry and timing that other constants and modules
+    derive from at import time, so overriding them would not stay consistent.
+    """
+    return sorted(name for name, value in vars(sim).items() if name.isupper() and isinstance(value, float))
+
+
+@contextmanager
+def overridden(params):
+    """Temporarily set giraffe_sim constants from ``params`` ({name: value})."""
+    allowed = set(tunables())
+    unknown = sorted(set(params) - allowed)
+    if unknown:
+        raise ValueError(f"not a tunable giraffe_sim constant: {', '.join(unknown)}")
+    saved = {name: getattr(sim, name) for name in params}
+    try:
+        for name, value in params.items():
+            setattr(sim, name, value)
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(sim, name, value)
+
+
+def play(seed, policy, max_time, hz=sim.SIM_HZ):
+    """One game at the current constants; returns (elapsed, score, capped)."""
+    state = sim.GameState(seed=seed)
+    sim.run(state, policy, 1.0 / hz, max_frames=int(max_time * hz))
+    return state.elapsed, state.score, not state.game_over
+
+
+def play_batch(params, seeds, policy_name, max_time, hz=sim.SIM_HZ):
+    """Worker entry point: play ``seeds`` under ``params``; a list of ``play`` results."""
+    policy = POLICIES[policy_name]
+    with overridden(params):
+        return [play(seed, policy, max_time, hz) for seed in seeds]
+
+
+def _chunks(seeds, size):
+    for i in range(0, len(seeds), size):
+        yield seeds[i:i + size]
+
+
+def sweep(param_sets, games, policy_name="chase", max_time=300.0, seed=0, workers=None, hz=sim.SIM_HZ):
+    """Play ``games`` games for each of ``param_sets`` and return one summary per set.
+
+    Every set plays the same seeds, so differences between sets are not down
+    to luck of the draw. ``workers=1`` plays in this process.
+    """
+    if policy_name not in POLICIES:
+        raise ValueError(f"unknown policy {policy_name!r} (choose from {', '.join(POLICIES)})")
+    for params in param_sets:
+        with overridden(params):  # validate names before starting any worker
+            pass
+    seeds = list(range(seed, seed + games))
+    workers = workers or os.cpu_count() or 1
+    # A few chunks per worker keeps the pool busy without paying per-game IPC
+    size = max(1, min(250, games * len(param_sets) // (workers * 4)))
+    jobs = [(i, chunk) for i in range(len(param_sets)) for chunk in _chunks(seeds, size)]
+
+    results = [[] for _ in param_sets]
+    if workers == 1:
+        for i, chunk in jobs:
+            results[i].extend(play_batch(param_sets[i], chunk, policy_name, max_time, hz))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [(i, pool.submit(play_batch, param_sets[i], chunk, policy_name, max_time, hz))
+                       for i, chunk in jobs]
+            for i, future in futures:
+                results[i].extend(future.result())
+    return [summarise(params, games_played) for params, games_played in zip(param_sets, results)]
+
+
+# ----------------------------
+# Report
+# ----------------------------
+
+def _quantiles(values):
+    ordered = sorted(values)
+    n = len(ordered)
+    return {f"p{q}": ordered[min(n - 1, q * n // 100)] for q in QUANTILES}
+
+
+def summarise(params, games_played):
+    elapsed = [g[0] for g in games_played]
+    scores = [g[1] for g in games_played]
+    return {
+        "params": dict(params),
+        "games": len(games_played),
+        "capped": sum(1 for g in games_played if g[2]),
+        "survival": {"mean": statistics.fmean(elapsed), "min": min(elapsed), "max": max(elapsed),
+                     **_quantiles(elapsed)},
+        "score": {"mean": statistics.fmean(scores), "min": min(scores), "max": max(scores),
+                  **_quantiles(scores)},
+    }
+
+
+def format_report(summaries):
+    lines = [f"{'params':<36} {'games':>6} {'capped':>6}   "
+             f"{'survival s  p10 / p50 / p90':>28}   {'score  p10 / p50 / p90':>22}"]
+    for s in summaries:
+        label = " ".join(f"{k}={v:g}" for k, v in s["params"].items()) or "(defaults)"
+        surv, score = s["survival"], s["score"]
+        lines.append(f"{label:<36} {s['games']:>6} {s['capped']:>6}   "
+                     f"{surv['p10']:>8.1f} /{surv['p50']:>7.1f} /{surv['p90']:>7.1f}   "
+                     f"{score['p10']:>8} /{score['p50']:>5} /{score['p90']:>5}")
+    return "\n".join(lines)
+
+
+def parse_set(text):
+    """``NAME=v1,v2,...`` -> (NAME, [v1, v2, ...])."""
+    name, sep, values = text.partition("=")
+    if not sep or not values:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE[,VALUE...], got {text!r}")
+    try:
+        return name.strip().upper(), [float(v) for v in values.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"values for {name} must be numbers") from None
+
+
+def grid(sets):
+    """Cartesian product of ``[(name, values), ...]`` as a list of {name: value} dicts."""
+    names = [name for name, _ in sets]
+    return [dict(zip(names, combo)) for combo in itertools.product(*(values for _, values in sets))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep giraffe_sim difficulty constants over headless games.")
+    parser.add_argument("--set", type=parse_set, action="append", default=[], metavar="NAME=V1,V2",
+                        help="values to try for a giraffe_sim constant (repeat for a grid)")
+    parser.add_argument("--games", type=int, default=200, help="games per parameter set (default: %(default)s)")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="chase")
+    parser.add_argument("--max-time", type=float, default=300.0,
+                        help="stop a game after this many simulated seconds (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="first game seed (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--json", metavar="PATH", help="also write the report as JSON")
+    parser.add_argument("--list", action="store_true", help="list the constants that can be swept")
+    args = parser.parse_args(argv)
+
+    if args.games < 1:
+        parser.error("--games must be at least 1")
+    if args.list:
+        for name in tunables():
+            print(f"{name:<24} {getattr(sim, name)}")
+        return 0
+
+    param_sets = grid(args.set)
+    start = time.perf_counter()
+    try:
+        summaries = sweep(param_sets, args.games, args.policy, args.max_time, args.seed, args.workers)
+    except ValueError as exc:
+        parser.error(str(exc))
+    took = time.perf_counter() - start
+
+    total = args.games * len(param_sets)
+    print(format_report(summaries))
+    print(f"\n{total} games in {took:.1f}s ({total / took:,.0f} games/s)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"policy": args.policy, "max_time": args.max_time, "seed": args.seed,
+                       "sets": summaries}, f, indent=2)
+        print(f"wrote {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
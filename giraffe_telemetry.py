@@ -0,0 +1,303 @@
+"""
+Compact binary per-frame telemetry: giraffe, score, timing and every leaf.
+
+A telemetry file is a header, every leaf record and then every frame record:
+
+- the header holds the record sizes, the tick rate, the frame count and
+  where the frame records start;
+- the leaf region is one fixed 16-byte record per live leaf per frame
+  (``LEAF_FIELDS``), frame after frame;
+- the frame region is one fixed 40-byte record per frame (``FRAME_FIELDS``),
+  each with the index of its first leaf record and its leaf count.
+
+``TelemetryWriter`` streams frames from the game loop (``--telemetry PATH``)
+or a headless run through bounded in-memory buffers, and needs only the
+standard library. Leaf records go straight to ``PATH``; frame records go to
+a ``PATH.frames`` side file that ``close`` appends to ``PATH`` and removes.
+``TelemetryReader`` maps the file and hands out NumPy views straight onto
+it, so any frame, the frame records of any range and the leaves of any
+range are each one slice that copies nothing; it needs NumPy. A file whose
+writer never closed is still readable from ``PATH`` and ``PATH.frames``.
+
+    python giraffe_telemetry.py run.gtel
+    python giraffe_telemetry.py run.gtel --frame 600
+    python giraffe_telemetry.py run.gtel --from-recording run.grec
+
+Like giraffe_sim, this module does not import pygame.
+"""
+import argparse
+import mmap
+import os
+import shutil
+import struct
+import sys
+from itertools import starmap
+
+MAGIC = b"GRAFTEL2"
+# magic, frame record size, leaf record size, tick rate (0 = per rendered frame), frames,
+# offset of the frame records (0 = unfinished: they are still in the side file)
+_HEADER = struct.Struct("<8sHHIQQ")
+# first_leaf, leaves, inputs, flags, dt, elapsed, base_x, head_offset, neck, score
+_FRAME = struct.Struct("<QIBB2xfffffI")
+# x, y, angle, rotten
+_LEAF = struct.Struct("<fffB3x")
+
+FRAME_FIELDS = ("first_leaf", "leaves", "inputs", "flags", "dt", "elapsed", "base_x", "head_offset", "neck", "score")
+LEAF_FIELDS = ("x", "y", "angle", "rotten")
+
+# Frame record flags
+GAME_OVER = 1
+
+
+def record_dtypes():
+    """NumPy (frame, leaf) dtypes laid out exactly like the records on disk."""
+    import numpy as np
+
+    frame = np.dtype({
+        "names": list(FRAME_FIELDS),
+        "formats": ["<u8", "<u4", "u1", "u1", "<f4", "<f4", "<f4", "<f4", "<f4", "<u4"],
+        "offsets": [0, 8, 12, 13, 16, 20, 24, 28, 32, 36],
+        "itemsize": _FRAME.size,
+    })
+    leaf = np.dtype({
+        "names": list(LEAF_FIELDS),
+        "formats": ["<f4", "<f4", "<f4", "?"],
+        "offsets": [0, 4, 8, 12],
+        "itemsize": _LEAF.size,
+    })
+    return frame, leaf
+
+
+def frames_path(path):
+    """The side file holding the frame records of ``path`` until its writer closes."""
+    return path + ".frames"
+
+
+class TelemetryWriter:
+    """Streams frames to the telemetry file ``path``.
+
+    ``append`` packs a frame's leaves and its frame record into two buffers
+    that are written out once either holds ``buffer_size`` bytes, so memory
+    stays bounded and the caller pays for a ``write`` every few hundred
+    frames. ``close`` appends the frame records to the leaves and writes the
+    final header.
+
+    ``hz`` records the tick rate when one frame is appended per simulation
+    tick; leave it 0 when frames are rendered frames with varying ``dt``.
+    """
+
+    def __init__(self, path, hz=0, buffer_size=1 << 16):
+        self.path = path
+        self.hz = hz
+        self.buffer_size = buffer_size
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, _FRAME.size, _LEAF.size, hz, 0, 0))
+        self._frame_file = open(frames_path(path), "wb")
+        self._leaf_buffer = bytearray()
+        self._frame_buffer = bytearray()
+        self._frames = 0
+        self._leaves = 0  # leaf records so far, the index of the next one
+
+    def __len__(self):
+        return self._frames
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, state, dt=0.0, inputs=0):
+        """Add one frame: ``state`` (a giraffe_sim.GameState) after a step of ``dt`` with ``inputs`` held."""
+        if state.leaf_pool is not None:
+            xs, ys, angles, rottens = state.leaf_pool.live()
+            leaves = zip(xs.tolist(), ys.tolist(), angles.tolist(), rottens.tolist())
+        else:
+            leaves = ((leaf.x, leaf.y, leaf.angle, leaf.rotten) for leaf in state.leaves)
+        leaf_records = b"".join(starmap(_LEAF.pack, leaves))
+        count = len(leaf_records) // _LEAF.size
+        giraffe = state.giraffe
+        self._leaf_buffer += leaf_records
+        self._frame_buffer += _FRAME.pack(self._leaves, count, inputs, GAME_OVER if state.game_over else 0, dt,
+                                          state.elapsed, giraffe.base_x, giraffe.head_offset, giraffe.neck,
+                                          state.score)
+        self._leaves += count
+        self._frames += 1
+        if len(self._leaf_buffer) >= self.buffer_size or len(self._frame_buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        # Leaves first, so the side file never lists a frame whose leaves are not on disk
+        if self._leaf_buffer:
+            self._file.write(self._leaf_buffer)
+            self._leaf_buffer.clear()
+        if self._frame_buffer:
+            self._file.flush()
+            self._frame_file.write(self._frame_buffer)
+            self._frame_buffer.clear()
+
+    def close(self):
+        """Write what is buffered, move the frame records into ``path`` and write the final header."""
+        if self._file.closed:
+            return
+        self.flush()
+        self._frame_file.close()
+        frames_at = _HEADER.size + _LEAF.size * self._leaves
+        with open(frames_path(self.path), "rb") as f:
+            shutil.copyfileobj(f, self._file)
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(MAGIC, _FRAME.size, _LEAF.size, self.hz, self._frames, frames_at))
+        self._file.close()
+        os.remove(frames_path(self.path))
+
+
+def _map(path):
+    """A read-only mapping of ``path``, or empty bytes for an empty file (which cannot be mapped)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class TelemetryReader:
+    """Random access to a telemetry file through read-only memory maps.
+
+    ``frame(i)`` returns NumPy views of one frame record and its leaves;
+    ``frames(start, stop)`` the frame records of a range and
+    ``leaves(start, stop)`` all their leaf records, in frame order, each as
+    a single view (split the leaves by ``frames(...)["leaves"]``). Views
+    stay valid after ``close``: a mapping is released once the last one
+    using it is gone.
+    """
+
+    def __init__(self, path):
+        import numpy as np
+
+        self.frame_dtype, self.leaf_dtype = record_dtypes()
+        self._frames = np.empty(0, self.frame_dtype)
+        self._leaves = np.empty(0, self.leaf_dtype)
+        self._maps = [_map(path)]
+        mm = self._maps[0]
+        if len(mm) < _HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is not a giraffe telemetry file")
+        magic, frame_size, leaf_size, self.hz, frames, frames_at = _HEADER.unpack_from(mm)
+        if magic != MAGIC or (frame_size, leaf_size) != (_FRAME.size, _LEAF.size):
+            self.close()
+            raise ValueError(f"{path} is not a giraffe telemetry file")
+        self.complete = frames_at != 0
+        if self.complete:
+            self.size = len(mm)
+            self._leaves = np.frombuffer(mm, self.leaf_dtype, (frames_at - _HEADER.size) // _LEAF.size,
+                                         _HEADER.size)
+            self._frames = np.frombuffer(mm, self.frame_dtype, frames, frames_at)
+        else:
+            self._read_unfinished(path)
+
+    def _read_unfinished(self, path):
+        """Frames of a file whose writer never closed: the side file's whole records whose leaves are on disk."""
+        import numpy as np
+
+        mm = self._maps[0]
+        self._leaves = np.frombuffer(mm, self.leaf_dtype, (len(mm) - _HEADER.size) // _LEAF.size, _HEADER.size)
+        try:
+            side = _map(frames_path(path))
+        except FileNotFoundError:
+            self.close()
+            raise ValueError(f"{path} was not finished and its frame records are gone") from None
+        self._maps.append(side)
+        frames = np.frombuffer(side, self.frame_dtype, len(side) // _FRAME.size)
+        ends = frames["first_leaf"] + frames["leaves"]
+        self._frames = frames[:int(np.searchsorted(ends, len(self._leaves), "right"))]
+        self.size = len(mm) + len(side)
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def frame(self, i):
+        """(frame record, leaf records) of frame ``i``, both views onto the file."""
+        record = self._frames[range(len(self))[i]]
+        first = int(record["first_leaf"])
+        return record, self._leaves[first:first + int(record["leaves"])]
+
+    def frames(self, start=0, stop=None):
+        """Frame records ``start:stop`` as one view onto the file."""
+        return self._frames[start:stop]
+
+    def leaves(self, start=0, stop=None):
+        """Leaf records of every frame in ``start:stop``, in frame order, as one view onto the file."""
+        frames = self._frames[start:stop]
+        if not len(frames):
+            return self._leaves[:0]
+        first = int(frames["first_leaf"][0])
+        return self._leaves[first:int(frames["first_leaf"][-1] + frames["leaves"][-1])]
+
+    def close(self):
+        # Let go of this reader's own views first, or the mappings could never close
+        self._frames = self._frames[:0].copy()
+        self._leaves = self._leaves[:0].copy()
+        for mm in self._maps:
+            if not isinstance(mm, mmap.mmap):
+                continue
+            try:
+                mm.close()
+            except BufferError:
+                pass  # views handed out still use the mapping; it goes with the last of them
+
+
+def from_recording(recording, path):
+    """Replay a giraffe_replay.Recording headless, writing one telemetry frame per tick to ``path``."""
+    from giraffe_replay import replay
+
+    dt = 1.0 / recording.hz
+    with TelemetryWriter(path, recording.hz) as writer:
+        replay(recording, on_tick=lambda tick, state: writer.append(state, dt, recording.inputs[tick - 1]))
+        return len(writer)
+
+
+def describe(reader):
+    frames = reader.frames()
+    lines = [f"{len(reader)} frames" + (f" at {reader.hz} Hz" if reader.hz else "")
+             + ("" if reader.complete else " (no index: writer did not finish)")]
+    if len(frames):
+        size = reader.size
+        lines.append(f"{float(frames['dt'].sum()):.1f} s played, {int((frames['flags'] & GAME_OVER).astype(bool).sum())}"
+                     f" game-over frames, final score {int(frames['score'][-1])}")
+        lines.append(f"leaves per frame: mean {float(frames['leaves'].mean()):.1f}, max {int(frames['leaves'].max())}")
+        lines.append(f"{size / len(frames):.0f} bytes per frame")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or write giraffe game telemetry.")
+    parser.add_argument("path", help="telemetry file (.gtel)")
+    parser.add_argument("--frame", type=int, metavar="N", help="print frame N and its leaves")
+    parser.add_argument("--from-recording", metavar="GREC",
+                        help="replay this recording headless and write its telemetry to PATH first")
+    args = parser.parse_args(argv)
+
+    if args.from_recording:
+        from giraffe_replay import Recording
+
+        frames = from_recording(Recording.load(args.from_recording), args.path)
+        print(f"wrote {frames} frames to {args.path}")
+    with TelemetryReader(args.path) as reader:
+        if args.frame is None:
+            print(describe(reader))
+            return 0
+        record, leaves = reader.frame(args.frame)
+        print("  ".join(f"{name}={record[name]}" for name in FRAME_FIELDS))
+        for leaf in leaves:
+            print(f"  leaf x={leaf['x']:.1f} y={leaf['y']:.1f} angle={leaf['angle']:.2f}"
+                  + (" rotten" if leaf["rotten"] else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+"""
+Helpers shared by the headless test modules (not a test module itself).
+
+- ``zigzag``: a policy that walks left and right while bobbing the head, so
+  seeded games eat leaves, grow and shrink the neck and eventually end
+- ``outcome``: what two runs of the same game must agree on
+"""
+import giraffe_sim as sim
+
+
+def zigzag(state):
+    frame = int(state.elapsed * 60)
+    horizontal = sim.INPUT_RIGHT if (frame // 50) % 2 else sim.INPUT_LEFT
+    vertical = sim.INPUT_UP if (frame // 20) % 2 else sim.INPUT_DOWN
+    return horizontal | vertical
+
+
+def outcome(state):
+    return (state.elapsed, state.score, state.giraffe.pose(), state.game_over, state.death_reason,
+            [(leaf.x, leaf.y, leaf.angle, leaf.rotten) for leaf in state.leaves])
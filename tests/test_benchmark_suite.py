@@ -0,0 +1,34 @@
+"""
+Unit tests for the regression check in benchmarks/suite.py.
+
+Only the pure ``compare`` function is exercised; timing itself needs pygame.
+
+How to run:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+import importlib.util
+import os
+import unittest
+
+_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "suite.py")
+_spec = importlib.util.spec_from_file_location("benchmark_suite", _PATH)
+suite = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(suite)
+
+
+class TestCompare(unittest.TestCase):
+    def test_flags_only_real_slowdowns(self):
+        baseline = {"results": {"collision": {"100": 100.0, "1000": 1000.0}, "hud": {"10": 1.0}}}
+        current = {"results": {"collision": {"100": 110.0, "1000": 1500.0, "10000": 9.0},
+                               "hud": {"10": 2.5}, "new_phase": {"10": 5.0}}}
+        rows = {(name, count): (ratio, regressed) for name, count, _, _, ratio, regressed
+                in suite.compare(baseline, current, threshold=0.25)}
+        self.assertEqual(set(rows), {("collision", "100"), ("collision", "1000"), ("hud", "10")})
+        self.assertFalse(rows["collision", "100"][1])
+        self.assertEqual(rows["collision", "1000"], (1.5, True))
+        # 2.5x slower, but only 1.5 us: within timer noise
+        self.assertFalse(rows["hud", "10"][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+Unit tests for giraffe_autopilot.py (catch-planning autopilot).
+
+These run without pygame.
+
+Covered:
+- the intercept math: reachable, out of reach in time, already too low
+- a lone green leaf is caught; a rotten one falling onto the head is dodged
+- an order that catches everything is preferred to earliest-first greed
+- with no time budget play is reproducible; a reset state starts a new plan
+- it outlives the chase policy on the same seeds, by the measured margin
+- the games it loses were already lost when the last leaf spawned
+- the soak command line and the sweep policy
+
+How to run:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+import contextlib
+import io
+import statistics
+import unittest
+
+import giraffe_autopilot as ap
+import giraffe_sim as sim
+import giraffe_sweep as sw
+
+NO_SPAWNS = {"SPAWN_PER_SEC_START": 0.0, "SPAWN_ACCEL": 0.0}
+
+
+def _leaf(x, y, rotten=False, fall_speed=100.0):
+    leaf = sim.Leaf(x, y, rotten, fall_speed)
+    leaf.fall_speed = fall_speed
+    leaf.spin = 0.0
+    return leaf
+
+
+def _quiet_state(*leaves):
+    state = sim.GameState(seed=1)
+    state.leaves = list(leaves)
+    return state
+
+
+class TestCatch(unittest.TestCase):
+    def test_walks_to_the_leaf(self):
+        g = sim.Giraffe()
+        leaf = _leaf(g.base_x + 220, sim.GROUND_Y - g.head_offset - 100)  # at head height in one second
+        when, x, h = ap.catch(leaf, 0.0, g.base_x, g.head_offset, g.neck, 200.0, 240.0)
+        self.assertAlmostEqual(when, 1.0)  # 200 px to walk at 200 px/s, leaving REACH to spare
+        self.assertEqual(x, leaf.x - ap.REACH)
+        self.assertAlmostEqual(h, sim.GROUND_Y - leaf.y - leaf.fall_speed * when)
+
+    def test_too_far_to_reach_in_time(self):
+        g = sim.Giraffe()
+        leaf = _leaf(g.base_x + 600, sim.GROUND_Y - 100)  # lands in one second
+        self.assertIsNone(ap.catch(leaf, 0.0, g.base_x, g.head_offset, g.neck, 200.0, 240.0))
+
+    def test_head_cannot_chase_down_a_faster_leaf(self):
+        g = sim.Giraffe()
+        leaf = _leaf(g.base_x, g.base_y - 20.0, fall_speed=300.0)
+        self.assertIsNone(ap.catch(leaf, 0.0, g.base_x, g.neck, g.neck, 200.0, 240.0))
+
+
+class TestSteering(unittest.TestCase):
+    def test_catches_a_lone_leaf(self):
+        with sw.overridden(NO_SPAWNS):
+            state = _quiet_state(_leaf(800, 50))
+            sim.run(state, ap.Autopilot(budget=None), 1 / 120, max_frames=120 * 10)
+        self.assertEqual(state.score, 1)
+        self.assertFalse(state.game_over)
+
+    def test_dodges_a_rotten_leaf(self):
+        with sw.overridden(NO_SPAWNS):
+            state = _quiet_state()
+            hx, hy = state.giraffe.head_pos()
+            state.leaves = [_leaf(hx, hy - 60, rotten=True, fall_speed=150.0)]
+            neck = state.giraffe.neck
+            sim.run(state, ap.Autopilot(budget=None), 1 / 120, max_frames=120 * 5)
+        self.assertEqual(state.giraffe.neck, neck)
+        self.assertEqual(state.leaves, [])
+
+    def test_search_prefers_an_order_that_catches_everything(self):
+        # The right leaf lands first, but waiting for it leaves no time to walk
+        # to the left one; the slow left leaf can be met on the way instead.
+        g = sim.Giraffe()
+        right = _leaf(g.base_x + 50, 250, fall_speed=100.0)
+        left = _leaf(g.base_x - 250, 400, fall_speed=60.0)
+        self.assertLess(ap._deadline(right), ap._deadline(left))
+        pilot = ap.Autopilot(budget=None)
+        pose = (0.0, g.base_x, g.head_offset, g.neck, 200.0, 240.0)
+        self.assertEqual(len(pilot._walk([right, left], *pose)), 1)
+        plan = pilot._search([right, left], g, 200.0, 240.0)
+        self.assertEqual(plan, [left, right])
+        self.assertEqual(len(pilot._walk(plan, *pose)), 2)
+
+    def test_reproducible_without_budget(self):
+        games = []
+        for _ in range(2):
+            state = sim.GameState(seed=11)
+            sim.run(state, ap.Autopilot(budget=None), 1 / 120, max_frames=120 * 60)
+            games.append((state.elapsed, state.score, state.death_reason))
+        self.assertEqual(games[0], games[1])
+
+    def test_reset_state_starts_a_new_plan(self):
+        pilot = ap.Autopilot(budget=None)
+        state = sim.GameState(seed=2)
+        sim.run(state, pilot, 1 / 120, max_frames=600)
+        self.assertTrue(pilot._plan)
+        state.reset()
+        pilot(state)
+        self.assertEqual((pilot._plan, pilot._known), ([], set()))
+
+    def test_outlives_chase(self):
+        # Measured over these seeds: mean 9.33 s against 7.60 s, median 7.53 s against 6.81 s
+        seeds = range(40)
+        autopilot = [sw.play(seed, ap.Autopilot(budget=None), 120.0, 120)[0] for seed in seeds]
+        chase = [sw.play(seed, sw.chase, 120.0, 120)[0] for seed in seeds]
+        self.assertTrue(all(a >= c for a, c in zip(autopilot, chase)))
+        self.assertGreaterEqual(statistics.fmean(autopilot), 1.2 * statistics.fmean(chase))
+        self.assertGreaterEqual(statistics.median(autopilot), 1.1 * statistics.median(chase))
+
+    def test_lost_games_were_decided_by_a_spawn(self):
+        # When the leaf that ends the game appeared, not even an exhaustive
+        # search could order the green leaves on screen to catch them all.
+        for seed in range(10):
+            state = sim.GameState(seed=seed)
+            pilot = ap.Autopilot(budget=None)
+            seen, hopeless = set(), set()
+            while not state.game_over:
+                new = [leaf for leaf in state.leaves if leaf not in seen and not leaf.rotten]
+                seen.update(state.leaves)
+                if new:
+                    greens = [leaf for leaf in state.leaves if not leaf.rotten]
+                    _, _, move_speed, head_speed = sim.difficulty(state.elapsed)
+                    oracle = ap.Autopilot(budget=None, max_nodes=10 ** 6, horizon=len(greens))
+                    plan = oracle._search(greens, state.giraffe, move_speed, head_speed)
+                    if len(oracle._walk(plan, 0.0, *state.giraffe.pose(), move_speed, head_speed)) < len(greens):
+                        hopeless.update(new)
+                sim.step(state, pilot(state), 1 / 120)
+            landed, = [leaf for leaf in state.leaves if not leaf.rotten and leaf.y + leaf.h / 2 >= sim.GROUND_Y]
+            self.assertIn(landed, hopeless, f"seed {seed}")
+
+
+class TestSoak(unittest.TestCase):
+    def test_soak_times_every_step(self):
+        results, timings, pilot = ap.soak(3, max_time=20.0, budget=0.01)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(len(timings), pilot.calls)
+        self.assertEqual(len(timings), round(sum(r[0] for r in results) * sim.SIM_HZ))
+        self.assertGreaterEqual(pilot.worst, max(timings) * 0.5)
+        self.assertIn("planner us per step: p50", ap.format_latency(timings, 0.01))
+
+    def test_command_line(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(ap.main(["--games", "2", "--max-time", "10", "--set", "SPAWN_PER_SEC_CAP=3"]), 0)
+        text = out.getvalue()
+        self.assertIn("2 games, SPAWN_PER_SEC_CAP=3", text)
+        self.assertIn("us budget", text)
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                ap.main(["--set", "SPAWN_PER_SEC_CAP=3,4"])
+            with self.assertRaises(SystemExit):
+                ap.main(["--games", "0"])
+
+    def test_sweep_policy(self):
+        summary, = sw.sweep([{}], 2, "autopilot", max_time=20.0, workers=1)
+        self.assertEqual(summary["games"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
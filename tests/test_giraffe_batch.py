@@ -0,0 +1,159 @@
+"""
+Unit tests for giraffe_batch.py (vectorized multi-game stepper).
+
+Skipped when NumPy is not installed; the game itself does not need it.
+
+Covered:
+- a batch game follows giraffe_sim.step tick for tick (movement, bites in
+  spawn order, neck clamps, rotten leaves landing, game over)
+- long steps use the same swept head test as giraffe_sim (fast leaves and a
+  sweeping head are still caught)
+- spawning keeps pace with the difficulty ramp and grows the leaf rows
+- games that end are reset in the same step and report their result
+
+How to run:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+import random
+import unittest
+
+import giraffe_sim as sim
+
+try:
+    import numpy as np
+    from giraffe_batch import BatchEnv, chase
+except ImportError:
+    BatchEnv = None
+
+
+def _place(env, game, slot, x, y, rotten, fall_speed):
+    env.leaf_x[game, slot] = x
+    env.leaf_y[game, slot] = y
+    env.leaf_rotten[game, slot] = rotten
+    env.leaf_speed[game, slot] = fall_speed
+    env.leaf_alive[game, slot] = True
+    env.leaf_order[game, slot] = slot
+
+
+@unittest.skipUnless(BatchEnv, "numpy not installed")
+class TestBatchRules(unittest.TestCase):
+    def setUp(self):
+        self.saved = sim.SPAWN_PER_SEC_START, sim.SPAWN_ACCEL
+
+    def tearDown(self):
+        sim.SPAWN_PER_SEC_START, sim.SPAWN_ACCEL = self.saved
+
+    def _pair(self, leaves):
+        """A GameState and a one-game BatchEnv holding the same hand-placed leaves, no spawning."""
+        sim.SPAWN_PER_SEC_START, sim.SPAWN_ACCEL = 0.0, 0.0
+        state = sim.GameState(rng=random.Random(0))
+        env = BatchEnv(1, slots=len(leaves), seed=0)
+        for slot, (x, y, rotten, fall_speed) in enumerate(leaves):
+            leaf = sim.Leaf(x, y, rotten, fall_speed)
+            leaf.fall_speed = fall_speed
+            state.leaves.append(leaf)
+            _place(env, 0, slot, x, y, rotten, fall_speed)
+        return state, env
+
+    def _assert_same(self, state, env):
+        self.assertAlmostEqual(env.base_x[0], state.giraffe.base_x)
+        self.assertAlmostEqual(env.head_offset[0], state.giraffe.head_offset)
+        self.assertAlmostEqual(env.neck[0], state.giraffe.neck)
+        self.assertEqual(env.score[0], state.score)
+        self.assertEqual(int(env.leaf_alive[0].sum()), len(state.leaves))
+
+    def test_matches_sim_step(self):
+        hx = sim.WIDTH // 2
+        leaves = [
+            (hx, 500.0, False, 300.0),        # falls onto the head
+            (hx + 150, 300.0, True, 250.0),   # rotten, walked into
+            (hx + 160, 290.0, False, 250.0),
+            (80, 300.0, True, 200.0),         # rotten, lands
+            (700, -400.0, False, 120.0),      # green, lands last: game over
+        ]
+        state, env = self._pair(leaves)
+        script = [sim.INPUT_DOWN] * 60 + [sim.INPUT_RIGHT | sim.INPUT_UP] * 80 + [sim.INPUT_LEFT] * 400
+        for tick, inputs in enumerate(script * 3):
+            elapsed = state.elapsed
+            sim.step(state, inputs, env.dt)
+            done = env.step(np.array([inputs]))
+            if state.game_over:
+                self.assertTrue(done[0], tick)
+                self.assertAlmostEqual(env.last_elapsed[0], state.elapsed)
+                self.assertEqual(env.last_score[0], state.score)
+                break
+            self.assertFalse(done[0], tick)
+            self.assertAlmostEqual(env.elapsed[0], elapsed + env.dt)
+            self._assert_same(state, env)
+        self.assertTrue(state.game_over)
+        self.assertEqual(state.score, 2)
+
+    def test_simultaneous_bites_apply_in_spawn_order(self):
+        hx, hy = sim.WIDTH // 2, sim.GROUND_Y - 35.0
+        # Near NECK_MIN the order matters: a rotten leaf first pins the head to
+        # the top of the neck, so the green one then lifts it all the way.
+        outcomes = set()
+        for rotten_first in (True, False):
+            state, env = self._pair([(hx, hy, False, 0.0), (hx + 4, hy, True, 0.0)])
+            if rotten_first:
+                env.leaf_order[0] = [1, 0]
+                state.leaves.reverse()
+            state.giraffe.neck, state.giraffe.head_offset = env.neck[0], env.head_offset[0] = 50.0, 35.0
+            sim.step(state, 0, env.dt)
+            env.step(np.zeros(1, dtype=int))
+            self._assert_same(state, env)
+            outcomes.add(round(state.giraffe.head_offset, 6))
+        self.assertEqual(len(outcomes), 2)
+
+    def test_long_step_sweeps_head_and_leaves(self):
+        hx, hy = sim.WIDTH // 2, sim.GROUND_Y - sim.NECK_START * 0.7
+        fast = sim.FALL_SPEED_CAP * 1.15
+        state, env = self._pair([(hx, hy - 25, False, fast),      # falls right past the head
+                                 (hx + 40, hy, True, 0.0),        # in the head's path
+                                 (hx - 40, hy - 25, False, fast)])
+        env.dt = 0.1
+        sim.step(state, sim.INPUT_RIGHT, env.dt)
+        env.step(np.array([sim.INPUT_RIGHT]))
+        self._assert_same(state, env)
+        self.assertEqual((state.score, len(state.leaves)), (1, 1))
+
+
+@unittest.skipUnless(BatchEnv, "numpy not installed")
+class TestBatchEnv(unittest.TestCase):
+    def test_spawning_keeps_pace_and_grows_rows(self):
+        env = BatchEnv(64, slots=1, seed=3)
+        state = sim.GameState(rng=random.Random(0))
+        for _ in range(360):
+            sim.step(state, 0, env.dt)
+            env.step(np.zeros(64, dtype=int))
+        self.assertEqual(env.episodes, 0)
+        self.assertTrue(np.allclose(env.spawn_accum, state.spawn_accum))
+        self.assertTrue((env.leaf_alive.sum(axis=1) == len(state.leaves)).all())
+        self.assertGreater(env.slots, 1)
+        live = env.leaf_alive
+        self.assertTrue(((env.leaf_x[live] >= 40) & (env.leaf_x[live] <= sim.WIDTH - 40)).all())
+
+    def test_game_over_resets_game(self):
+        env = BatchEnv(3, seed=0)
+        _place(env, 1, 0, 500, sim.GROUND_Y, False, 0.0)
+        env.score[1] = 4
+        done = env.step(np.zeros(3, dtype=int))
+        self.assertEqual(done.tolist(), [False, True, False])
+        self.assertEqual(env.last_score[1], 4)
+        self.assertAlmostEqual(env.last_elapsed[1], env.dt)
+        self.assertEqual((env.elapsed[1], env.score[1], env.episodes), (0.0, 0, 1))
+        self.assertFalse(env.leaf_alive[1].any())
+        self.assertAlmostEqual(env.elapsed[0], env.dt)
+
+    def test_chase_outlives_idle(self):
+        lengths = []
+        for policy in (lambda env: np.zeros(env.n, dtype=int), chase):
+            env = BatchEnv(256, seed=1)
+            for _ in range(1200):
+                env.step(policy(env))
+            lengths.append(env.episodes)
+        self.assertLess(lengths[1], lengths[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,6 +10,18 @@ Covered:
 - circle_rect_collide collision checks (inside, outside, grazing)
 - Giraffe.apply_neck_change clamping of neck and head_offset
 - Leaf.update vertical motion (with randomized variance disabled for the test)
+- LeafAtlas angle quantization and single-call blits drawing
+- ParticleSprites: one blits call per pool, shrinking sprites, off at low quality
+- the lower quality levels: flat leaf sprites, plain giraffe, quality in the HUD
+- Giraffe.draw static layer caching and invalidation
+- DirtyRectRenderer background restore and partial display updates
+- TextCache LRU behaviour and GlyphStrip digit drawing
+- static screens: composed once, idle tracking, shared dim overlays
+- lazy start-up: no window or font at import, cached font lookup
+- render scale: layout rects, leaf sprites and HUD positions on a smaller
+  canvas, --render-scale / --window parsing
+- asyncio loop driver: frames go on while side jobs are pending, jobs are
+  awaited on exit; score submission to a local HTTP server
 
 How to run:
     python -m unittest discover -s tests -p "test_*.py" -v
@@ -18,9 +30,17 @@ Notes:
 - The tests never call main(); they only exercise pure logic.
 - The stub is local to the test process and won’t affect running the game.
 """
+import asyncio
+import contextlib
+import io
+import json
+import os
 import sys
+import tempfile
+import threading
 import types
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 # ---- Minimal pygame stub so we can import giraffe_game without a real display or pygame installed
 pygame_stub = types.ModuleType("pygame")
@@ -37,6 +57,7 @@ pygame_stub.K_s = 8
 pygame_stub.K_r = 9
 pygame_stub.K_ESCAPE = 10
 pygame_stub.SRCALPHA = 32
+pygame_stub.RLEACCEL = 16384
 
 
 def _noop(*args, **kwargs):
@@ -44,19 +65,35 @@ def _noop(*args, **kwargs):
 
 
 class _Surface:
-    def __init__(self, size=(0, 0)):
+    def __init__(self, size=(0, 0), flags=0):
         self.size = size
+        self.blit_calls = []
+        self.blits_calls = []
 
     def fill(self, *args, **kwargs):
         return None
 
     def blit(self, *args, **kwargs):
+        self.blit_calls.append(args)
+        return None
+
+    def blits(self, blit_sequence, doreturn=True):
+        self.blits_calls.append(list(blit_sequence))
         return None
 
     def get_width(self):
         # minimal method used by some font surfaces, if ever called
         return self.size[0] if self.size else 0
 
+    def get_height(self):
+        return self.size[1] if self.size else 0
+
+    def get_size(self):
+        return self.size
+
+    def set_colorkey(self, color, flags=0):
+        self.colorkey = color
+
 
 class _Rect:
     def __init__(self, left, top, width, height):
@@ -101,20 +138,39 @@ class _Rect:
 
 
 class _Clock:
-    def tick(self, fps):
+    def tick(self, fps=0):
         return 16  # pretend ~60 FPS
 
 
 class _Font:
+    def __init__(self):
+        self.renders = 0
+
     def render(self, text, antialias, color):
-        return _Surface((100, 20))
+        self.renders += 1
+        return _Surface((10 * len(text), 20))
 
 
 class _DisplayNS:
+    def __init__(self):
+        self.flips = 0
+        self.updates = []
+        self.modes = []
+
     def set_caption(self, *args, **kwargs):
         return None
 
+    def flip(self):
+        self.flips += 1
+
+    def update(self, rects=None):
+        self.updates.append(rects)
+
+    def init(self):
+        return None
+
     def set_mode(self, size):
+        self.modes.append(size)
         return _Surface(size)
 
 
@@ -122,12 +178,40 @@ class _TimeNS:
     def Clock(self):
         return _Clock()
 
+    def get_ticks(self):
+        return 0
+
 
 class _FontNS:
+    def __init__(self):
+        self.initialised = False
+        self.lookups = []
+
+    def init(self):
+        self.initialised = True
+
+    def get_init(self):
+        return self.initialised
+
+    def match_font(self, name):
+        self.lookups.append(name)
+        return None
+
+    def Font(self, path, size):
+        return _Font()
+
     def SysFont(self, *args, **kwargs):
         return _Font()
 
 
+class _TransformNS:
+    def smoothscale(self, surf, size):
+        return _Surface(size, getattr(surf, "flags", 0))
+
+    def scale(self, surf, size):
+        return _Surface(size, getattr(surf, "flags", 0))
+
+
 class _DrawNS:
     def polygon(self, *args, **kwargs):
         return None
@@ -141,6 +225,9 @@ class _DrawNS:
     def circle(self, *args, **kwargs):
         return None
 
+    def ellipse(self, *args, **kwargs):
+        return None
+
 
 # attach namespaces and functions
 pygame_stub.init = _noop
@@ -149,7 +236,9 @@ pygame_stub.display = _DisplayNS()
 pygame_stub.time = _TimeNS()
 pygame_stub.font = _FontNS()
 pygame_stub.draw = _DrawNS()
+pygame_stub.transform = _TransformNS()
 pygame_stub.Rect = _Rect
+pygame_stub.Surface = _Surface
 
 # very small event/key stubs used only when running the real game loop (not in these tests)
 class _EventNS:
@@ -171,6 +260,12 @@ pygame_stub.key = _KeyNS()
 sys.modules["pygame"] = pygame_stub
 
 import giraffe_game as gg
+import giraffe_particles
+
+_MODES_AT_IMPORT = list(pygame_stub.display.modes)
+# keep the stub's font lookups out of the real per-user cache
+_font_cache_dir = tempfile.TemporaryDirectory()
+gg.FONT_CACHE = os.path.join(_font_cache_dir.name, "fonts.json")
 
 
 class TestUtils(unittest.TestCase):
@@ -251,6 +346,50 @@ class TestGiraffe(unittest.TestCase):
         self.assertEqual(g.head_offset, gg.NECK_MIN)  # since NECK_MIN=40 and min head clamp is 20, expect 40
 
 
+class TestGiraffeDraw(unittest.TestCase):
+    def setUp(self):
+        gg.Giraffe._layers = None
+        gg.Giraffe._layers_key = None
+        gg.Giraffe._plain = None
+        gg.Giraffe._plain_key = None
+
+    def test_static_layers_built_once(self):
+        surface = gg.pygame.display.set_mode((gg.WIDTH, gg.HEIGHT))
+        g = gg.Giraffe()
+        g.draw(surface)
+        layers = gg.Giraffe._layers
+        self.assertIsNotNone(layers)
+        g.base_x += 37.5
+        g.apply_neck_change(+50)
+        gg.Giraffe().draw(surface)
+        g.draw(surface)
+        self.assertIs(gg.Giraffe._layers, layers)
+
+    def test_colour_change_invalidates_layers(self):
+        surface = gg.pygame.display.set_mode((gg.WIDTH, gg.HEIGHT))
+        g = gg.Giraffe()
+        g.draw(surface)
+        layers = gg.Giraffe._layers
+        original = gg.BROWN
+        try:
+            gg.BROWN = (1, 2, 3)
+            g.draw(surface)
+            self.assertIsNot(gg.Giraffe._layers, layers)
+        finally:
+            gg.BROWN = original
+
+    def test_plain_giraffe_is_one_colour_keyed_body_blit(self):
+        g = gg.Giraffe()
+        fancy, plain = gg.pygame.Surface((gg.WIDTH, gg.HEIGHT)), gg.pygame.Surface((gg.WIDTH, gg.HEIGHT))
+        self.assertEqual(g.draw(fancy).left, g.draw(plain, fancy=False).left)
+        body = plain.blit_calls[0][0]
+        self.assertIs(body, gg.Giraffe._plain)
+        self.assertEqual(body.colorkey, gg.COLORKEY)
+        self.assertIsNot(fancy.blit_calls[0][0], body)
+        g.draw(plain, fancy=False)
+        self.assertIs(gg.Giraffe._plain, body)
+
+
 class TestLeaf(unittest.TestCase):
     def test_leaf_rect_and_draw(self):
         leaf = gg.Leaf(x=100, y=200, rotten=True, fall_speed=120.0)
@@ -281,5 +420,336 @@ class TestLeaf(unittest.TestCase):
         self.assertAlmostEqual(leaf.angle, leaf.spin * dt, delta=0.0001)
 
 
+class TestLeafAtlas(unittest.TestCase):
+    def test_build_and_quantize(self):
+        atlas = gg.LeafAtlas(steps=8)
+        atlas.build()
+        self.assertEqual(len(atlas.green), 8)
+        self.assertEqual(len(atlas.rotten), 8)
+        self.assertIs(atlas.sprite(0.0, False), atlas.green[0])
+        self.assertIs(atlas.sprite(gg.math.pi / 8, True), atlas.rotten[1])
+        # the leaf shape repeats every half turn
+        self.assertIs(atlas.sprite(gg.math.pi + gg.math.pi / 8, False), atlas.green[1])
+
+    def test_draw_uses_one_blits_call(self):
+        atlas = gg.LeafAtlas(steps=4)
+        leaves = [gg.Leaf(x=100 + i * 50, y=200, rotten=i % 2 == 0, fall_speed=100.0) for i in range(5)]
+        for leaf in leaves:
+            leaf.angle = 0.0
+        surface = gg.pygame.Surface((gg.WIDTH, gg.HEIGHT))
+        atlas.draw(surface, leaves)
+        self.assertEqual(len(surface.blits_calls), 1)
+        seq = surface.blits_calls[0]
+        self.assertEqual(len(seq), 5)
+        self.assertIs(seq[0][0], atlas.rotten[0])
+        self.assertIs(seq[1][0], atlas.green[0])
+        # sprite centred on the leaf rect centre
+        r = leaves[1].rect()
+        self.assertEqual(seq[1][1], (r.centerx - atlas.half, r.centery - atlas.half))
+
+    def test_draw_with_lag_interpolates_back(self):
+        atlas = gg.LeafAtlas(steps=4)
+        leaf = gg.Leaf(x=100, y=200, rotten=False, fall_speed=100.0)
+        leaf.fall_speed = 100.0
+        leaf.angle = 0.0
+        surface = gg.pygame.Surface((gg.WIDTH, gg.HEIGHT))
+        atlas.draw(surface, [leaf])
+        atlas.draw(surface, [leaf], lag=0.1)
+        (_, now), = surface.blits_calls[0]
+        (_, before), = surface.blits_calls[1]
+        self.assertEqual(now[1] - before[1], 10)
+
+    def test_flat_atlas_draws_one_unrotated_sprite_per_colour(self):
+        atlas = gg.LeafAtlas(1, outline=False)
+        leaves = [gg.Leaf(x=100 + i * 50, y=200, rotten=i == 1, fall_speed=100.0) for i in range(3)]
+        for i, leaf in enumerate(leaves):
+            leaf.angle = i * 0.7
+        seq = atlas._blit_all(_RecordingSurface(), [(l.x, l.y, l.angle, l.rotten) for l in leaves], False)
+        self.assertEqual([sprite for sprite, _ in seq], [atlas.green[0], atlas.rotten[0], atlas.green[0]])
+        self.assertEqual(atlas.green[0].colorkey, gg.COLORKEY)
+        r = leaves[0].rect()
+        self.assertEqual(seq[0][1], (r.centerx - atlas.half, r.centery - atlas.half))
+
+
+class TestParticleSprites(unittest.TestCase):
+    def test_pool_drawn_with_one_blits_call(self):
+        pool = gg.ParticlePool(32)
+        pool.burst(gg.EAT, 100.0, 200.0)
+        pool.burst(gg.SPLAT_ROTTEN, 300.0, gg.GROUND_Y)
+        sprites = gg.ParticleSprites(pool)
+        surface = gg.pygame.Surface((gg.WIDTH, gg.HEIGHT))
+        sprites.draw(surface)
+        self.assertEqual(len(surface.blits_calls), 1)
+        seq = surface.blits_calls[0]
+        self.assertEqual(len(seq), len(pool))
+        self.assertEqual(len(sprites.sprites), gg.KINDS * gg.PARTICLE_SIZE_STEPS)
+        sprite, radius = sprites.sprites[gg.EAT * gg.PARTICLE_SIZE_STEPS]
+        self.assertEqual((seq[0][0], seq[0][1]), (sprite, (100 - radius, 200 - radius)))
+        pool.advance(giraffe_particles.PARTICLE_LIFE * 0.9)
+        sprites.draw(surface)
+        self.assertIs(surface.blits_calls[1][0][0], sprites.sprites[gg.PARTICLE_SIZE_STEPS - 1][0])
+
+    def test_low_quality_leaves_particles_out(self):
+        state = gg.GameState(giraffe_cls=gg.Giraffe, leaf_cls=gg.Leaf, seed=1)
+        pool = gg.ParticlePool(32)
+        pool.burst(gg.PUFF, 100.0, 200.0)
+        digits = gg.GlyphStrip(gg.get_font(), gg.DARK)
+        atlas = gg.LeafAtlas(1, outline=False)
+        for quality, drawn in ((gg.QUALITY_LEVELS[0], 1), (gg.QUALITY_LEVELS[-1], 0)):
+            surface = gg.pygame.Surface((gg.WIDTH, gg.HEIGHT))
+            gg.draw_frame(surface, state, atlas, digits, quality=quality, particles=gg.ParticleSprites(pool))
+            particle_calls = [c for c in surface.blits_calls if len(c) == len(pool)]
+            self.assertEqual(len(particle_calls), drawn)
+
+
+class TestDirtyRectRenderer(unittest.TestCase):
+    def setUp(self):
+        self.display = gg.pygame.display
+        self.display.flips = 0
+        self.display.updates = []
+        self.screen = gg.pygame.Surface((gg.WIDTH, gg.HEIGHT))
+        self.background = gg.pygame.Surface((gg.WIDTH, gg.HEIGHT))
+        self.renderer = gg.DirtyRectRenderer(self.screen, self.background)
+
+    def test_first_frame_is_full_then_partial(self):
+        a = gg.pygame.Rect(10, 10, 5, 5)
+        b = gg.pygame.Rect(40, 40, 5, 5)
+        self.renderer.clear()
+        self.assertEqual(self.screen.blit_calls, [(self.background, (0, 0))])
+        self.renderer.present([a])
+        self.assertEqual(self.display.flips, 1)
+
+        self.screen.blit_calls = []
+        self.renderer.clear()
+        self.assertEqual(self.screen.blit_calls, [(self.background, a, a)])
+        self.renderer.present([b])
+        self.assertEqual(self.display.flips, 1)
+        self.assertEqual(self.display.updates, [[a, b]])
+
+    def test_static_screen_drawn_once(self):
+        self.assertTrue(self.renderer.begin_static("pause"))
+        self.renderer.present_static()
+        self.assertFalse(self.renderer.begin_static("pause"))
+        self.renderer.invalidate()
+        self.assertTrue(self.renderer.begin_static("pause"))
+
+    def test_full_frame_renderer_idles_on_static_screens(self):
+        renderer = gg.FullFrameRenderer(self.screen, self.background)
+        self.assertFalse(renderer.idle)
+        self.assertTrue(renderer.begin_static("start"))
+        composed = gg.compose_start_screen()
+        renderer.present_static(composed)
+        self.assertEqual(self.screen.blit_calls, [(composed, (0, 0))])
+        self.assertTrue(renderer.idle)
+        self.assertFalse(renderer.begin_static("start"))
+        self.assertTrue(renderer.begin_static("instructions"))
+        renderer.present([])
+        self.assertFalse(renderer.idle)
+        self.assertEqual(self.display.flips, 2)
+
+    def test_dim_overlay_allocated_once(self):
+        self.assertIs(gg.dim_overlay(140), gg.dim_overlay(140))
+        self.assertIsNot(gg.dim_overlay(140), gg.dim_overlay(110))
+
+
+class TestTextCache(unittest.TestCase):
+    def test_hits_and_lru_eviction(self):
+        fnt = gg.pygame.font.SysFont("consolas", 22)
+        cache = gg.TextCache(maxsize=2)
+        a = cache.render(fnt, "a", gg.DARK)
+        self.assertIs(cache.render(fnt, "a", gg.DARK), a)
+        self.assertIsNot(cache.render(fnt, "a", gg.WHITE), a)  # colour is part of the key
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        cache.render(fnt, "a", gg.DARK)      # "a"/DARK is now most recent
+        cache.render(fnt, "b", gg.DARK)      # evicts "a"/WHITE
+        self.assertEqual(len(cache), 2)
+        renders = fnt.renders
+        cache.render(fnt, "a", gg.DARK)
+        self.assertEqual(fnt.renders, renders)
+        cache.render(fnt, "a", gg.WHITE)
+        self.assertEqual(fnt.renders, renders + 1)
+
+    def test_glyph_strip_blits_cached_digits(self):
+        fnt = gg.pygame.font.SysFont("consolas", 22)
+        strip = gg.GlyphStrip(fnt, gg.DARK)
+        renders = fnt.renders
+        surface = gg.pygame.Surface((gg.WIDTH, gg.HEIGHT))
+        rect = strip.draw(surface, "12.5", (30, 14))
+        self.assertEqual(fnt.renders, renders)
+        seq = surface.blits_calls[-1]
+        self.assertEqual([pos for _, pos in seq], [(30, 14), (40, 14), (50, 14), (60, 14)])
+        self.assertIs(seq[0][0], strip.glyphs["1"])
+        self.assertEqual((rect.left, rect.top, rect.width, rect.height), (30, 14, 40, 20))
+
+
+class TestLazyInit(unittest.TestCase):
+    def test_import_opens_no_window(self):
+        self.assertEqual(_MODES_AT_IMPORT, [])
+
+    def test_font_lookup_cached_across_runs(self):
+        fonts = gg.pygame.font
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = os.path.join(tmp, "sub", "fonts.json")
+            lookups = len(fonts.lookups)
+            self.assertIsNone(gg.find_font("consolas", cache))
+            self.assertIsNone(gg.find_font("consolas", cache))
+            self.assertEqual(len(fonts.lookups), lookups + 1)
+            # a cached path that no longer exists is looked up again
+            with open(cache, "w") as f:
+                f.write('{"consolas": "/no/such/font.ttf"}')
+            gg.find_font("consolas", cache)
+            self.assertEqual(len(fonts.lookups), lookups + 2)
+
+    def test_get_font_loads_each_size_once(self):
+        self.assertIs(gg.get_font(31), gg.get_font(31))
+        self.assertIsNot(gg.get_font(31), gg.get_font(32))
+        self.assertTrue(gg.pygame.font.get_init())
+
+
+class TestRenderScale(unittest.TestCase):
+    def test_scale_rect_covers_layout_rect(self):
+        r = gg.scale_rect(gg.pygame.Rect(11, 7, 5, 5), 0.5)
+        self.assertEqual((r.left, r.top, r.right, r.bottom), (5, 3, 8, 6))
+        same = gg.pygame.Rect(1, 2, 3, 4)
+        self.assertIs(gg.scale_rect(same, 1.0), same)
+
+    def test_atlas_sprites_and_positions_scale(self):
+        full, half = gg.LeafAtlas(steps=4), gg.LeafAtlas(steps=4, scale=0.5)
+        leaf = gg.Leaf(x=101, y=201, rotten=False, fall_speed=100.0)
+        leaf.angle = 0.0
+        for atlas in (full, half):
+            atlas.draw(gg.pygame.Surface((gg.WIDTH, gg.HEIGHT)), [leaf])
+        self.assertEqual(half.green[0].size, (full.half, full.half))
+        r = leaf.rect()
+        ((_, pos),) = half._blit_all(_RecordingSurface(), [(leaf.x, leaf.y, 0.0, False)], False)
+        self.assertEqual(pos, (int((r.centerx - full.half) * 0.5), int((r.centery - full.half) * 0.5)))
+
+    def test_giraffe_bounds_and_hud_scale(self):
+        g = gg.Giraffe()
+        full, half = g.bounds(), g.bounds(0.5)
+        self.assertLessEqual(half.left, full.left / 2)
+        self.assertGreaterEqual(half.right, full.right / 2)
+        self.assertLessEqual(half.right - full.right / 2, 1)
+        state = gg.GameState(giraffe_cls=gg.Giraffe, leaf_cls=gg.Leaf, seed=1)
+        surface = gg.pygame.Surface((gg.WIDTH // 2, gg.HEIGHT // 2))
+        digits = gg.GlyphStrip(gg.get_font(gg.FONT_SIZE, 0.5), gg.DARK)
+        gg.draw_hud(surface, state, digits, 0.5)
+        positions = [call[1] for call in surface.blit_calls]
+        # "Time: " label, then score and neck lines at half the layout offsets
+        self.assertEqual([positions[0], positions[-2], positions[-1]], [(9, 7), (9, 20), (9, 33)])
+
+    def test_hud_shows_quality(self):
+        state = gg.GameState(giraffe_cls=gg.Giraffe, leaf_cls=gg.Leaf, seed=1)
+        surface = gg.pygame.Surface((gg.WIDTH, gg.HEIGHT))
+        digits = gg.GlyphStrip(gg.get_font(), gg.DARK)
+        gg.draw_hud(surface, state, digits)
+        self.assertNotEqual(surface.blit_calls[-1][1], (18, 92))
+        gg.draw_frame(surface, state, gg.LeafAtlas(1, outline=False), digits, quality=gg.QUALITY_LEVELS[-1])
+        self.assertEqual(surface.blit_calls[-1][1], (18, 92))
+
+    def test_quality_option(self):
+        self.assertEqual(gg.parse_args([]).quality, "auto")
+        self.assertEqual(gg.parse_args(["--quality", "low"]).quality, "low")
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                gg.parse_args(["--quality", "ultra"])
+
+    def test_options(self):
+        options = gg.parse_args(["--render-scale", "0.5", "--window", "1920x1080"])
+        self.assertEqual((options.render_scale, options.window), (0.5, (1920, 1080)))
+        self.assertIsNone(options.telemetry)
+        self.assertFalse(options.autopilot)
+        self.assertTrue(gg.parse_args(["--autopilot"]).autopilot)
+        self.assertEqual(gg.parse_args(["--telemetry", "run.gtel"]).telemetry, "run.gtel")
+        self.assertEqual(gg.parse_args(["--seed", "-1"]).seed, -1)  # fine when not recording
+        with contextlib.redirect_stderr(io.StringIO()):
+            for bad in (["--render-scale", "0"], ["--window", "1920"], ["--window", "0x10"], ["--sim-hz", "0"],
+                        ["--record", "run.grec", "--seed", "-1"], ["--record", "run.grec", "--seed", str(2 ** 64)],
+                        ["--record", "run.grec", "--sim-hz", "70000"]):
+                with self.assertRaises(SystemExit):
+                    gg.parse_args(bad)
+
+
+class _RecordingSurface(gg.pygame.Surface):
+    def blits(self, blit_sequence, doreturn=True):
+        return list(blit_sequence)
+
+
+class _ScoreHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.server.received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+        self.send_response(self.server.status)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestAsyncLoop(unittest.TestCase):
+    def _frames(self, jobs, log, count=20, release_at=None):
+        """A stand-in for game_loop: starts a job on the second frame, then quits.
+
+        The job waits until frame ``release_at`` lets it finish (default: after
+        the last frame). Each frame logs its number and whether the job was
+        still pending.
+        """
+        release = asyncio.Event()
+
+        async def job():
+            await release.wait()
+            log.append("job done")
+
+        yield False
+        for frame in range(count):
+            yield False
+            log.append((frame, bool(jobs.pending)))
+            if frame == 1:
+                jobs(job)
+            if frame == release_at:
+                release.set()
+        release.set()
+
+    def test_frames_keep_pace_while_job_runs(self):
+        jobs, log = gg.BackgroundJobs(), []
+        asyncio.run(gg.run_async(self._frames(jobs, log, release_at=10), gg.pygame.time.Clock(), 1000, jobs))
+        frames = [entry for entry in log if entry != "job done"]
+        self.assertEqual([frame for frame, _ in frames], list(range(20)))
+        # frames went on while the job was pending, and it finished once released
+        self.assertTrue(all(pending for frame, pending in frames[2:11]))
+        self.assertGreater(log.index("job done"), log.index((10, True)))
+        self.assertFalse(jobs.pending)
+
+    def test_run_async_waits_for_jobs_on_exit(self):
+        jobs, log = gg.BackgroundJobs(), []
+        asyncio.run(gg.run_async(self._frames(jobs, log, count=3), gg.pygame.time.Clock(), 100, jobs))
+        self.assertEqual(log[-2:], [(2, True), "job done"])
+        self.assertFalse(jobs.pending)
+
+    def test_run_now_completes_jobs_inline(self):
+        async def coro(x):
+            return x * 2
+        self.assertEqual(gg.run_now(coro, 4), 8)
+        self.assertEqual(gg.run_now(sorted, [2, 1]), [1, 2])
+
+    def test_submit_score(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _ScoreHandler)
+        server.received, server.status = [], 204
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/scores"
+        try:
+            result = {"seed": 7, "elapsed": 12.5, "score": 3}
+            self.assertTrue(gg.run_now(gg.submit_score, url, result))
+            self.assertEqual(server.received, [result])
+            server.status = 500
+            with contextlib.redirect_stderr(io.StringIO()) as err:
+                self.assertFalse(gg.run_now(gg.submit_score, url, result))
+        finally:
+            server.shutdown()
+            server.server_close()
+        with contextlib.redirect_stderr(io.StringIO()) as err:
+            self.assertFalse(gg.run_now(gg.submit_score, url, result))
+        self.assertIn("failed", err.getvalue())
+
+
 if __name__ == "__main__":
     unittest.main()
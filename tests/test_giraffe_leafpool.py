@@ -0,0 +1,138 @@
+"""
+Unit tests for giraffe_leafpool.py (NumPy leaf store).
+
+Skipped when NumPy is not installed; the game itself does not need it.
+
+Covered:
+- spawn/update/eat/land on the pool arrays
+- compaction keeps spawn order and growth past the initial capacity
+- GameState with a LeafPool plays out exactly like the list of Leaf objects
+- swept_circle_box_hits agrees with giraffe_sim.swept_circle_box_collide
+- snapshot/restore/clone of a pooled GameState
+
+How to run:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+import random
+import unittest
+
+import giraffe_sim as sim
+from support import zigzag
+
+try:
+    import numpy  # noqa: F401
+    from giraffe_leafpool import LeafPool, swept_circle_box_hits
+except ImportError:
+    LeafPool = None
+
+
+@unittest.skipUnless(LeafPool, "numpy not installed")
+class TestLeafPool(unittest.TestCase):
+    def test_update_moves_live_leaves(self):
+        pool = LeafPool()
+        pool.spawn(100, 0, False, 100.0)
+        pool.fall_speed[0] = 100.0
+        pool.spin[0] = 2.0
+        pool.angle[0] = 0.0
+        pool.update(0.25)
+        self.assertAlmostEqual(pool.y[0], 25.0)
+        self.assertAlmostEqual(pool.angle[0], 0.5)
+
+    def test_eat_returns_rotten_flags_in_spawn_order(self):
+        pool = LeafPool()
+        pool.spawn(100, 100, True, 0.0)
+        pool.spawn(500, 100, False, 0.0)
+        pool.spawn(100, 100, False, 0.0)
+        self.assertEqual(pool.eat(100, 100, sim.HEAD_RADIUS), [True, False])
+        self.assertEqual(len(pool), 1)
+        self.assertEqual(pool.eat(100, 100, sim.HEAD_RADIUS), [])
+
+    def test_land_drops_rotten_and_reports_green(self):
+        pool = LeafPool()
+        pool.spawn(100, sim.GROUND_Y, True, 0.0)
+        self.assertFalse(pool.land(sim.GROUND_Y))
+        self.assertEqual(len(pool), 0)
+        pool.spawn(100, sim.GROUND_Y, False, 0.0)
+        self.assertTrue(pool.land(sim.GROUND_Y))
+        self.assertEqual(len(pool), 1)
+
+    def test_grow_and_compact_keep_order(self):
+        pool = LeafPool(capacity=2)
+        for i in range(5):
+            pool.spawn(100 + i * 100, 0, False, 0.0)
+        self.assertGreaterEqual(pool.capacity, 5)
+        pool.eat(100, 0, 1)
+        pool.eat(200, 0, 1)
+        pool.eat(300, 0, 1)
+        x, _, _, _ = pool.live()
+        self.assertEqual(x.tolist(), [400.0, 500.0])
+        self.assertEqual(pool.n, 2)
+
+    def test_matches_leaf_list(self):
+        for seed in range(5):
+            results = []
+            for pool in (None, LeafPool(capacity=4)):
+                random.seed(seed)
+                state = sim.GameState(rng=random.Random(seed), leaf_pool=pool)
+                frames = sim.run(state, zigzag, max_frames=20_000)
+                results.append((frames, state.score, state.elapsed, state.giraffe.neck, len(state.leaves)))
+            self.assertEqual(results[0], results[1])
+
+    def test_collisions_match_leaf_list(self):
+        states = [sim.GameState(rng=random.Random(0)),
+                  sim.GameState(rng=random.Random(0), leaf_pool=LeafPool())]
+        hx, hy = states[0].giraffe.head_pos()
+        for state in states:
+            random.seed(0)
+            for dx, rotten in ((0, False), (20, True), (-25, False), (40, False)):
+                if state.leaf_pool is None:
+                    state.leaves.append(sim.Leaf(hx + dx, hy, rotten, 0.0))
+                else:
+                    state.leaf_pool.spawn(hx + dx, hy, rotten, 0.0)
+            sim.step(state, 0, 0.001)
+        self.assertEqual(states[0].score, states[1].score)
+        self.assertEqual(states[0].giraffe.neck, states[1].giraffe.neck)
+        self.assertEqual(len(states[0].leaves), len(states[1].leaves))
+
+    def test_swept_hits_match_scalar(self):
+        rng = random.Random(1)
+        cases = []
+        for _ in range(2000):
+            left, top = rng.randint(-30, 30), rng.randint(-30, 30)
+            cases.append((rng.choice((0.0, rng.uniform(-60, 60))), rng.uniform(-60, 60),
+                          rng.uniform(-60, 60), rng.choice((0.0, rng.uniform(-60, 60))),
+                          sim.HEAD_RADIUS, left, top, left + sim.LEAF_W, top + sim.LEAF_H,
+                          0.0, rng.choice((0.0, rng.uniform(0, 60)))))
+        expected = [sim.swept_circle_box_collide(*case) for case in cases]
+        got = swept_circle_box_hits(*(numpy.array(column) for column in zip(*cases)))
+        self.assertEqual(got.tolist(), expected)
+        self.assertGreater(sum(expected), 100)
+
+    def test_long_steps_match_leaf_list(self):
+        for seed in range(3):
+            results = []
+            for pool in (None, LeafPool()):
+                random.seed(seed)
+                state = sim.GameState(rng=random.Random(seed), leaf_pool=pool)
+                frames = sim.run(state, zigzag, dt=0.05, max_frames=2_000)
+                results.append((frames, state.score, state.elapsed, state.giraffe.neck, len(state.leaves)))
+            self.assertEqual(results[0], results[1])
+
+    def test_snapshot_restore_and_clone(self):
+        state = sim.GameState(seed=8, leaf_pool=LeafPool(capacity=4))
+        sim.run(state, zigzag, max_frames=200)
+        snap = state.snapshot()
+        twin = state.clone()
+        self.assertIsNot(twin.leaf_pool, state.leaf_pool)
+        sim.run(state, zigzag, max_frames=20_000)
+        ahead = (state.elapsed, state.score, state.giraffe.pose(), [a.tolist() for a in state.leaf_pool.live()])
+        sim.run(twin, zigzag, max_frames=20_000)
+        state.restore(snap)
+        self.assertEqual(len(state.leaves), snap.leaves[0])
+        sim.run(state, zigzag, max_frames=20_000)
+        for s in (state, twin):
+            self.assertEqual((s.elapsed, s.score, s.giraffe.pose(), [a.tolist() for a in s.leaf_pool.live()]), ahead)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Unit tests for giraffe_particles.py (pooled particle effects).
+
+These run without pygame.
+
+Covered:
+- bursts fill the preallocated arrays; count, occupancy and peak
+- particles retire after PARTICLE_LIFE, oldest first, as the clock advances
+- a full pool overwrites its oldest particles and counts them as dropped
+- positions follow each kind's path and never go below the ground
+- as GameState.effects: told about eaten and landed leaves, and the game
+  plays exactly as it does without effects
+
+How to run:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+import random
+import unittest
+
+import giraffe_particles as gp
+import giraffe_sim as sim
+from support import outcome, zigzag
+
+
+class _Leaf:
+    def __init__(self, x, y, rotten=False):
+        self.x, self.y, self.rotten = x, y, rotten
+
+
+class TestPool(unittest.TestCase):
+    def test_burst_and_stats(self):
+        pool = gp.ParticlePool(64)
+        pool.burst(gp.EAT, 100.0, 200.0)
+        n = gp.BURSTS[gp.EAT][0]
+        self.assertEqual((len(pool), pool.peak, pool.emitted, pool.dropped), (n, n, n, 0))
+        self.assertAlmostEqual(pool.occupancy, n / 64)
+        self.assertEqual(len(pool.x), 64)
+        live = list(pool.live())
+        self.assertEqual(len(live), n)
+        self.assertTrue(all(p == (gp.EAT, 100.0, 200.0, 0.0) for p in live))
+
+    def test_particles_expire_oldest_first(self):
+        pool = gp.ParticlePool(64)
+        pool.burst(gp.EAT, 100.0, 200.0)
+        pool.advance(gp.PARTICLE_LIFE / 2)
+        pool.burst(gp.PUFF, 300.0, 200.0)
+        self.assertEqual([p[0] for p in pool.live()][-1], gp.PUFF)
+        pool.advance(gp.PARTICLE_LIFE / 2 + 1e-9)
+        self.assertEqual({p[0] for p in pool.live()}, {gp.PUFF})
+        self.assertTrue(all(0.0 <= p[3] < 1.0 for p in pool.live()))
+        pool.advance(gp.PARTICLE_LIFE)
+        self.assertEqual(len(pool), 0)
+        self.assertEqual(list(pool.live()), [])
+
+    def test_full_pool_drops_the_oldest(self):
+        pool = gp.ParticlePool(20)
+        for kind in (gp.EAT, gp.PUFF, gp.SPLAT_GREEN):
+            pool.burst(kind, 500.0, 300.0)
+        self.assertEqual((len(pool), pool.occupancy, pool.peak), (20, 1.0, 20))
+        self.assertEqual(pool.dropped, 26 - 20)
+        kinds = [p[0] for p in pool.live()]
+        self.assertEqual(kinds.count(gp.EAT), 4)
+        self.assertEqual(kinds[-8:], [gp.SPLAT_GREEN] * 8)
+
+    def test_paths(self):
+        pool = gp.ParticlePool(64, rng=random.Random(3))
+        pool.landed(_Leaf(400.0, sim.GROUND_Y + 3, rotten=True))
+        pool.eaten(_Leaf(600.0, 100.0, rotten=True))
+        pool.advance(0.1)
+        splats = [p for p in pool.live() if p[0] == gp.SPLAT_ROTTEN]
+        puffs = [p for p in pool.live() if p[0] == gp.PUFF]
+        self.assertTrue(splats and puffs)
+        self.assertTrue(all(y < sim.GROUND_Y for _, _, y, _ in splats))  # thrown up off the ground
+        pool.advance(gp.PARTICLE_LIFE * 0.8)
+        self.assertTrue(all(y <= sim.GROUND_Y for _, _, y, _ in pool.live()))
+        for _, _, _, age in pool.live():
+            self.assertAlmostEqual(age, 0.9)
+        pool.clear()
+        self.assertEqual(len(pool), 0)
+
+
+class _Recorder(gp.ParticlePool):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def eaten(self, leaf):
+        self.calls.append(("eaten", leaf.rotten))
+        super().eaten(leaf)
+
+    def landed(self, leaf):
+        self.calls.append(("landed", leaf.rotten))
+        super().landed(leaf)
+
+
+class TestEffectsHook(unittest.TestCase):
+    def test_effects_see_every_eaten_and_landed_leaf(self):
+        for queue in (None, sim.ImpactQueue):
+            random.seed(1)
+            plain = sim.GameState(rng=random.Random(1), impacts=queue and queue())
+            sim.run(plain, zigzag, 1 / 120, max_frames=120 * 120)
+
+            random.seed(1)
+            recorder = _Recorder()
+            state = sim.GameState(rng=random.Random(1), impacts=queue and queue(), effects=recorder)
+            while not state.game_over:
+                recorder.advance(1 / 120)
+                sim.step(state, zigzag(state), 1 / 120)
+            self.assertEqual(outcome(state), outcome(plain))
+            eaten = [rotten for what, rotten in recorder.calls if what == "eaten"]
+            self.assertEqual(eaten.count(False), state.score)
+            self.assertEqual(recorder.calls[-1], ("landed", False))
+            kinds = {("eaten", False): gp.EAT, ("eaten", True): gp.PUFF,
+                     ("landed", False): gp.SPLAT_GREEN, ("landed", True): gp.SPLAT_ROTTEN}
+            self.assertEqual(recorder.emitted, sum(gp.BURSTS[kinds[call]][0] for call in recorder.calls))
+
+    def test_clone_has_no_effects(self):
+        state = sim.GameState(seed=3, effects=gp.ParticlePool())
+        self.assertIsNone(state.clone().effects)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+Unit tests for giraffe_profile.py (per-phase frame profiler).
+
+These run without pygame.
+
+Covered:
+- laps charge time to phases, repeated laps accumulate within a frame
+- rolling window, nearest-rank percentiles and frame-budget misses
+- step laps the simulation phases and plays out the same with or without a profiler
+- CSV and JSON export
+- QualityGovernor: drops a level on a slow block, raises it after a calm
+  stretch, backs off from a level it could not hold
+
+How to run:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+import csv
+import json
+import os
+import tempfile
+import unittest
+
+import giraffe_sim as sim
+from giraffe_profile import PHASES, FrameProfiler, QualityGovernor, percentile
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _frame(profiler, clock, **costs):
+    profiler.begin_frame()
+    for phase, cost in costs.items():
+        clock.now += cost
+        profiler.lap(phase)
+    profiler.end_frame(leaves=len(costs))
+
+
+class TestFrameProfiler(unittest.TestCase):
+    def test_laps_accumulate_per_phase(self):
+        clock = _Clock()
+        prof = FrameProfiler(budget=1.0, clock=clock)
+        prof.begin_frame()
+        for cost in (0.25, 0.5):
+            clock.now += cost
+            prof.lap("collision")
+        clock.now += 0.125
+        prof.lap("flip")
+        prof.end_frame(leaves=7)
+        self.assertEqual(prof.samples["collision"][-1], 0.75)
+        self.assertEqual(prof.samples["flip"][-1], 0.125)
+        self.assertEqual(prof.samples["spawn"][-1], 0.0)
+        self.assertEqual(prof.totals[-1], 0.875)
+        self.assertEqual((prof.frames, prof.leaves, prof.misses), (1, 7, 0))
+
+    def test_percentiles_over_window(self):
+        clock = _Clock()
+        prof = FrameProfiler(budget=0.0505, window=100, clock=clock)
+        for ms in range(1, 201):
+            _frame(prof, clock, hud=ms / 1000)
+        p50, p95, p99 = prof.percentiles()["hud"]
+        # only frames 101..200 are in the window
+        self.assertAlmostEqual(p50, 0.150)
+        self.assertAlmostEqual(p95, 0.195)
+        self.assertAlmostEqual(p99, 0.199)
+        self.assertEqual(prof.misses, 150)
+        self.assertEqual(prof.recent_misses, 100)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_step_laps_sim_phases_without_changing_outcome(self):
+        results = []
+        for prof in (None, FrameProfiler()):
+            state = sim.GameState(seed=9, profiler=prof)
+            frames = sim.run(state, lambda s: sim.INPUT_LEFT, max_frames=3_000)
+            results.append((frames, state.score, state.elapsed, len(state.leaves)))
+        self.assertEqual(results[0], results[1])
+        # run() never ends a frame, so everything sits in the current one
+        for phase in ("sim_update", "spawn", "collision", "ground_check"):
+            self.assertGreater(prof._current[phase], 0.0, phase)
+
+    def test_export(self):
+        clock = _Clock()
+        prof = FrameProfiler(clock=clock, keep_history=True)
+        _frame(prof, clock, events=0.001, draw_leaves=0.002)
+        _frame(prof, clock, events=0.001, flip=0.004)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "frames.csv")
+            prof.export(path)
+            with open(path, newline="") as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual(len(rows), 2)
+            self.assertEqual(float(rows[0]["draw_leaves_ms"]), 2.0)
+            self.assertEqual(float(rows[1]["total_ms"]), 5.0)
+
+            path = os.path.join(tmp, "frames.json")
+            prof.export(path)
+            with open(path) as f:
+                data = json.load(f)
+            self.assertEqual(data["summary"]["frames"], 2)
+            self.assertEqual(set(data["summary"]["percentiles_ms"]), set(PHASES) | {"total"})
+            self.assertEqual(len(data["frames"]), 2)
+
+
+
+class TestQualityGovernor(unittest.TestCase):
+    def _feed(self, governor, busy, frames):
+        return [governor.frame(busy) for _ in range(frames)][-1]
+
+    def test_steps_down_then_back_up(self):
+        gov = QualityGovernor(budget=0.016, levels=3, window=10, settle=40)
+        self.assertEqual(self._feed(gov, 0.010, 50), 0)          # busy, but within budget
+        self.assertEqual(self._feed(gov, 0.020, 9), 0)           # block not complete yet
+        self.assertEqual(gov.frame(0.020), 1)
+        self.assertGreater(gov.load, 1.0)
+        self.assertEqual(self._feed(gov, 0.020, 30), 2)          # one level per slow block, down to the last
+        self.assertEqual(self._feed(gov, 0.020, 30), 2)
+        self.assertEqual(self._feed(gov, 0.005, 30), 2)          # calm, but not for long enough
+        self.assertEqual(self._feed(gov, 0.005, 10), 1)
+        self.assertEqual(self._feed(gov, 0.010, 100), 1)         # neither slow nor calm: stay
+        self.assertEqual(self._feed(gov, 0.005, 40), 0)
+        self.assertEqual(gov.changes, 4)
+
+    def test_a_few_slow_frames_are_tolerated(self):
+        gov = QualityGovernor(budget=0.016, levels=3, window=10)
+        for _ in range(20):
+            self._feed(gov, 0.005, 9)
+            gov.frame(0.050)                                     # one hitch per block: under the p90
+        self.assertEqual(gov.level, 0)
+
+    def test_backs_off_after_a_failed_raise(self):
+        gov = QualityGovernor(budget=0.016, levels=2, window=10, settle=20, max_settle=80)
+        self._feed(gov, 0.020, 10)
+        self._feed(gov, 0.005, 20)
+        self.assertEqual(gov.level, 0)
+        self._feed(gov, 0.020, 10)                               # the raise did not hold
+        self.assertEqual((gov.level, gov.settle), (1, 40))
+        self.assertEqual(self._feed(gov, 0.005, 30), 1)
+        self.assertEqual(self._feed(gov, 0.005, 10), 0)
+        for _ in range(3):
+            self._feed(gov, 0.020, 10)
+            self._feed(gov, 0.005, gov.settle)
+        self.assertEqual(gov.settle, 80)
+
+
+if __name__ == "__main__":
+    unittest.main()
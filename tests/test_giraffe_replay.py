@@ -0,0 +1,121 @@
+"""
+Unit tests for giraffe_replay.py (input recording and headless replay).
+
+These run without pygame.
+
+Covered:
+- seeded GameState plays the same game every time, independent of the global RNG
+- Recording survives a to_bytes/from_bytes round trip, up to MAX_SEED and MAX_HZ,
+  and rejects bad data
+- a game recorded through FixedStepper replays to the same score and time
+- the command line --check exit status
+
+How to run:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+import os
+import random
+import struct
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+import giraffe_sim as sim
+import giraffe_replay as gr
+from support import zigzag
+
+
+def _record(seed, frame_dts):
+    state = sim.GameState(seed=seed)
+    recording = gr.Recording(seed)
+    stepper = sim.FixedStepper(recording=recording)
+    for dt in frame_dts:
+        if state.game_over:
+            break
+        stepper.advance(state, zigzag(state), dt)
+    recording.finish(state)
+    return recording, state
+
+
+class TestSeededState(unittest.TestCase):
+    def test_same_seed_same_game(self):
+        results = []
+        for noise in (1, 2):
+            random.seed(noise)  # the global RNG must not leak into a seeded game
+            state = sim.GameState(seed=7)
+            frames = sim.run(state, zigzag, max_frames=20_000)
+            results.append((frames, state.score, state.elapsed, state.giraffe.neck))
+        self.assertEqual(results[0], results[1])
+
+    def test_reseed_restarts_the_same_game(self):
+        state = sim.GameState(seed=3)
+        sim.run(state, zigzag, max_frames=500)
+        first = (state.score, state.elapsed, len(state.leaves))
+        state.reseed(3)
+        state.reset()
+        sim.run(state, zigzag, max_frames=500)
+        self.assertEqual((state.score, state.elapsed, len(state.leaves)), first)
+
+
+class TestRecording(unittest.TestCase):
+    def test_round_trip(self):
+        rec = gr.Recording(2**63 - 1, 240, bytes([sim.INPUT_LEFT] * 1000 + [sim.INPUT_UP] * 5))
+        rec.final_elapsed, rec.final_score = 12.5, 9
+        data = rec.to_bytes()
+        self.assertLess(len(data), 100)
+        back = gr.Recording.from_bytes(data)
+        self.assertEqual((back.seed, back.hz, back.inputs), (rec.seed, rec.hz, rec.inputs))
+        self.assertEqual((back.final_elapsed, back.final_score), (12.5, 9))
+
+    def test_header_limits(self):
+        back = gr.Recording.from_bytes(gr.Recording(gr.MAX_SEED, gr.MAX_HZ).to_bytes())
+        self.assertEqual((back.seed, back.hz), (gr.MAX_SEED, gr.MAX_HZ))
+        for seed, hz in ((-1, 120), (gr.MAX_SEED + 1, 120), (1, gr.MAX_HZ + 1)):
+            with self.assertRaises(struct.error):
+                gr.Recording(seed, hz).to_bytes()
+
+    def test_unfinished_round_trip(self):
+        back = gr.Recording.from_bytes(gr.Recording(1).to_bytes())
+        self.assertIsNone(back.final_score)
+        self.assertEqual(len(back), 0)
+
+    def test_rejects_bad_data(self):
+        with self.assertRaises(ValueError):
+            gr.Recording.from_bytes(b"X" * 40)
+
+
+class TestReplay(unittest.TestCase):
+    def test_replay_matches_recorded_game(self):
+        jitter = random.Random(0)
+        frame_dts = [jitter.choice((0.004, 0.016, 0.033)) for _ in range(20_000)]
+        recording, played = _record(11, frame_dts)
+        self.assertTrue(played.game_over)
+        self.assertEqual(len(recording), round(played.elapsed * recording.hz))
+
+        replayed = gr.replay(gr.Recording.from_bytes(recording.to_bytes()))
+        self.assertTrue(gr.matches(recording, replayed))
+        self.assertEqual(replayed.giraffe.pose(), played.giraffe.pose())
+
+    def test_on_tick_sees_every_tick(self):
+        recording, _ = _record(4, [1 / 60] * 30)
+        ticks = []
+        gr.replay(recording, on_tick=lambda tick, state: ticks.append(tick))
+        self.assertEqual(ticks, list(range(1, len(recording) + 1)))
+
+    def test_check_exit_status(self):
+        recording, _ = _record(5, [1 / 60] * 120)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "run.grec")
+            recording.save(path)
+            with redirect_stdout(StringIO()):
+                self.assertEqual(gr.main([path, "--check"]), 0)
+                recording.final_score += 1
+                recording.save(path)
+                self.assertEqual(gr.main([path, "--check"]), 1)
+                gr.Recording(5, inputs=recording.inputs).save(path)
+                self.assertEqual(gr.main([path, "--check"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Unit tests for giraffe_scores.py (high scores and run history).
+
+These run without pygame.
+
+Covered:
+- record ranks runs in memory at once and the writer persists them
+- a round that scored nothing gets no rank until the table is full
+- the top list is reloaded (through the index) when the store reopens
+- a full write queue drops runs instead of blocking the caller
+
+How to run:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+import giraffe_scores as gs
+
+
+class TestScoreStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "sub", "scores.sqlite3")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_record_ranks_and_persists(self):
+        store = gs.ScoreStore(self.path)
+        self.assertEqual(store.top(), [])
+        self.assertEqual(store.record(1, 10.0, 3, "Missed"), 1)
+        self.assertEqual(store.record(2, 20.0, 5), 1)
+        self.assertEqual(store.record(3, 12.0, 3), 2)  # same score, survived longer
+        self.assertEqual(store.record(4, 8.0, 3), 4)
+        self.assertEqual([run.seed for run in store.top(3)], [2, 3, 1])
+        store.flush()
+        self.assertEqual([run.seed for run in store.recent(2)], [4, 3])
+        store.close()
+
+        reopened = gs.ScoreStore(self.path)
+        self.assertEqual([run.seed for run in reopened.top()], [2, 3, 1, 4])
+        self.assertEqual(reopened.top(1)[0].reason, "")
+        self.assertEqual(reopened.best(1)[0].seed, 2)
+        reopened.close()
+
+    def test_no_rank_for_nothing(self):
+        store = gs.ScoreStore(self.path)
+        self.assertIsNone(store.record(1, 4.0, 0))
+        self.assertEqual([run.seed for run in store.top()], [1])
+        self.assertEqual(store.record(2, 3.0, 1), 1)
+        for seed in range(3, gs.TOP_CACHED + 1):
+            self.assertIsNone(store.record(seed, 2.0, 0))
+        self.assertEqual(len(store.top()), gs.TOP_CACHED)
+        # a full table: a scoreless round that outlasted one of them still places
+        self.assertEqual(store.record(20, 5.0, 0), 2)
+        self.assertIsNone(store.record(21, 1.0, 0))
+        store.close()
+
+    def test_top_list_is_bounded(self):
+        store = gs.ScoreStore(self.path)
+        for seed in range(gs.TOP_CACHED):
+            store.record(seed, 1.0, 10 + seed)
+        self.assertIsNone(store.record(99, 1.0, 0))
+        self.assertEqual(len(store.top()), gs.TOP_CACHED)
+        self.assertEqual(store.record(100, 1.0, 50), 1)
+        self.assertEqual(len(store.top()), gs.TOP_CACHED)
+        store.close()
+        self.assertEqual(len(store.recent(100)), gs.TOP_CACHED + 2)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        store = gs.ScoreStore(self.path, maxsize=1)
+        # Another connection holds the database, so the writer waits on its first run
+        other = sqlite3.connect(self.path, isolation_level=None)
+        other.execute("BEGIN EXCLUSIVE")
+        try:
+            store.record(1, 1.0, 1)
+            while store._queue.qsize():
+                time.sleep(0.001)
+            start = time.perf_counter()
+            store.record(2, 1.0, 2)   # queued
+            store.record(3, 1.0, 3)   # queue full: dropped
+            self.assertLess(time.perf_counter() - start, 0.1)
+            self.assertEqual(store.dropped, 1)
+            self.assertEqual(store.top(1)[0].seed, 3)
+        finally:
+            other.execute("ROLLBACK")
+            other.close()
+        store.close()
+        self.assertEqual(sorted(run.seed for run in store.recent()), [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
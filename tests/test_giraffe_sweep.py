@@ -0,0 +1,97 @@
+"""
+Unit tests for giraffe_sweep.py (difficulty tuning sweep).
+
+These run without pygame.
+
+Covered:
+- constant overrides are applied inside the context and always restored;
+  only the difficulty constants can be overridden
+- --set parsing and the parameter grid
+- sweeps are deterministic and give the same results in-process and on a pool
+- the chase policy outlives doing nothing; --games must be at least 1
+
+How to run:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+import argparse
+import contextlib
+import io
+import unittest
+
+import giraffe_sim as sim
+import giraffe_sweep as sw
+
+
+class TestOverrides(unittest.TestCase):
+    def test_overridden_restores_constants(self):
+        before = sim.FALL_ACCEL
+        with self.assertRaises(RuntimeError):
+            with sw.overridden({"FALL_ACCEL": 99.0}):
+                self.assertEqual(sim.FALL_ACCEL, 99.0)
+                self.assertEqual(sim.difficulty(1.0)[0], sim.FALL_SPEED_START + 99.0)
+                raise RuntimeError
+        self.assertEqual(sim.FALL_ACCEL, before)
+
+    def test_unknown_constant_rejected(self):
+        with self.assertRaises(ValueError):
+            with sw.overridden({"FALL_ACCELERATION": 1.0}):
+                pass
+        self.assertIn("ROTTEN_CHANCE", sw.tunables())
+
+    def test_geometry_constants_rejected(self):
+        for name in ("WIDTH", "HEIGHT", "GROUND_Y", "SIM_HZ", "LEAF_W"):
+            self.assertNotIn(name, sw.tunables())
+            with self.assertRaises(ValueError):
+                with sw.overridden({name: 800.0}):
+                    pass
+        self.assertEqual((sim.WIDTH, sim.HEIGHT), (1000, 700))
+
+
+class TestGrid(unittest.TestCase):
+    def test_parse_set(self):
+        self.assertEqual(sw.parse_set("fall_accel=4,6.5"), ("FALL_ACCEL", [4.0, 6.5]))
+        for bad in ("FALL_ACCEL", "FALL_ACCEL=", "FALL_ACCEL=fast"):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                sw.parse_set(bad)
+
+    def test_grid_is_cartesian_product(self):
+        sets = [("A", [1.0, 2.0]), ("B", [3.0, 4.0, 5.0])]
+        grid = sw.grid(sets)
+        self.assertEqual(len(grid), 6)
+        self.assertIn({"A": 2.0, "B": 4.0}, grid)
+        self.assertEqual(sw.grid([]), [{}])
+
+
+class TestSweep(unittest.TestCase):
+    def test_deterministic_and_pool_matches_inline(self):
+        sets = [{}, {"SPAWN_ACCEL": 0.0, "SPAWN_PER_SEC_START": 0.5}]
+        inline = sw.sweep(sets, 6, "chase", max_time=60.0, workers=1)
+        self.assertEqual(inline, sw.sweep(sets, 6, "chase", max_time=60.0, workers=1))
+        self.assertEqual(inline, sw.sweep(sets, 6, "chase", max_time=60.0, workers=2))
+        self.assertEqual([s["games"] for s in inline], [6, 6])
+        self.assertEqual(inline[1]["params"], sets[1])
+
+    def test_max_time_caps_games(self):
+        [summary] = sw.sweep([{"SPAWN_PER_SEC_START": 0.0, "SPAWN_ACCEL": 0.0}], 2, "idle",
+                             max_time=1.0, workers=1)
+        self.assertEqual(summary["capped"], 2)
+        self.assertAlmostEqual(summary["survival"]["max"], 1.0)
+
+    def test_chase_beats_idle(self):
+        idle, chase = (sw.sweep([{}], 20, policy, workers=1)[0] for policy in ("idle", "chase"))
+        self.assertGreater(chase["survival"]["mean"], idle["survival"]["mean"])
+        self.assertGreater(chase["score"]["mean"], idle["score"]["mean"])
+
+    def test_command_line_needs_a_game(self):
+        with contextlib.redirect_stderr(io.StringIO()) as err:
+            with self.assertRaises(SystemExit):
+                sw.main(["--games", "0"])
+        self.assertIn("--games must be at least 1", err.getvalue())
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            sw.sweep([{}], 1, "telepathy", workers=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
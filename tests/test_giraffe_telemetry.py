@@ -0,0 +1,199 @@
+"""
+Unit tests for giraffe_telemetry.py (binary per-frame telemetry).
+
+Writing runs without NumPy; the reader tests are skipped when it is not
+installed.
+
+Covered:
+- every field of every frame and leaf survives a write/read round trip
+- frame and leaf ranges are single views onto the file; random access,
+  negative indices
+- the writer's buffer stays bounded and is flushed in pieces
+- a file whose writer never closed is read with its side file of frame records
+- LeafPool states write the same frames as the list of Leaf objects
+- non-telemetry files are rejected; the command line summary
+
+How to run:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+import os
+import struct
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+import giraffe_sim as sim
+import giraffe_telemetry as gt
+from giraffe_replay import Recording
+from support import zigzag
+
+try:
+    import numpy as np
+    from giraffe_leafpool import LeafPool
+except ImportError:
+    np = None
+
+
+def _f32(value):
+    return struct.unpack("<f", struct.pack("<f", value))[0]
+
+
+def _play(writer, seed=9, frames=600, dt=1 / 60, leaf_pool=None):
+    """Play up to ``frames`` frames into ``writer``; returns what each frame should read back as."""
+    state = sim.GameState(seed=seed, leaf_pool=leaf_pool)
+    expected = []
+    for _ in range(frames):
+        if state.game_over:
+            break
+        inputs = zigzag(state)
+        sim.step(state, inputs, dt)
+        writer.append(state, dt, inputs)
+        g = state.giraffe
+        leaves = state.leaf_pool.live() if leaf_pool is not None else \
+            list(zip(*[(leaf.x, leaf.y, leaf.angle, leaf.rotten) for leaf in state.leaves])) or [(), (), (), ()]
+        expected.append(((inputs, state.game_over, g.base_x, g.head_offset, g.neck, state.score), leaves))
+    return expected
+
+
+class TestWriter(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "run.gtel")
+
+    def test_layout(self):
+        with gt.TelemetryWriter(self.path, hz=60) as writer:
+            expected = _play(writer, frames=50)
+        leaves = sum(len(xs) for _, (xs, *_rest) in expected)
+        size = os.path.getsize(self.path)
+        self.assertEqual(size, 32 + 16 * leaves + 40 * len(expected))
+        self.assertFalse(os.path.exists(gt.frames_path(self.path)))
+        with open(self.path, "rb") as f:
+            magic, frame_size, leaf_size, hz, frames, frames_at = struct.unpack("<8sHHIQQ", f.read(32))
+        self.assertEqual((magic, frame_size, leaf_size, hz, frames), (gt.MAGIC, 40, 16, 60, len(expected)))
+        self.assertEqual(frames_at, 32 + 16 * leaves)
+
+    def test_buffer_is_bounded(self):
+        writer = gt.TelemetryWriter(self.path, buffer_size=512)
+        writes = []
+        for f in (writer._file, writer._frame_file):
+            f.write = (lambda real: lambda data: writes.append(len(data)) or real(data))(f.write)
+        state = sim.GameState(seed=1)
+        for _ in range(300):
+            sim.step(state, 0, 1 / 60)
+            writer.append(state, 1 / 60)
+            self.assertLess(len(writer._leaf_buffer), 512)
+            self.assertLess(len(writer._frame_buffer), 512)
+        self.assertGreater(len(writes), 10)
+        self.assertTrue(all(n < 512 + 40 + 16 * len(state.leaves) + 256 for n in writes))
+        writer.close()
+        writer.close()  # a second close does nothing
+
+
+@unittest.skipUnless(np, "numpy not installed")
+class TestReader(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "run.gtel")
+
+    def assertFrame(self, reader, i, expected):
+        (inputs, game_over, base_x, head_offset, neck, score), (xs, ys, angles, rottens) = expected
+        record, leaves = reader.frame(i)
+        self.assertEqual((record["inputs"], bool(record["flags"] & gt.GAME_OVER), record["score"]),
+                         (inputs, game_over, score))
+        self.assertEqual([float(record[k]) for k in ("base_x", "head_offset", "neck")],
+                         [_f32(base_x), _f32(head_offset), _f32(neck)])
+        self.assertEqual(record["leaves"], len(xs))
+        self.assertEqual(leaves["x"].tolist(), [_f32(x) for x in xs])
+        self.assertEqual(leaves["y"].tolist(), [_f32(y) for y in ys])
+        self.assertEqual(leaves["angle"].tolist(), [_f32(a) for a in angles])
+        self.assertEqual(leaves["rotten"].tolist(), [bool(r) for r in rottens])
+
+    def test_round_trip(self):
+        with gt.TelemetryWriter(self.path, hz=60, buffer_size=4096) as writer:
+            expected = _play(writer, frames=2000)
+        with gt.TelemetryReader(self.path) as reader:
+            self.assertTrue(reader.complete)
+            self.assertEqual((len(reader), reader.hz), (len(expected), 60))
+            for i in (0, 1, 17, len(expected) // 2, len(expected) - 1):
+                self.assertFrame(reader, i, expected[i])
+            self.assertFrame(reader, -1, expected[-1])
+            with self.assertRaises(IndexError):
+                reader.frame(len(expected))
+
+            frames = reader.frames(100, 200)
+            self.assertEqual(len(frames), 100)
+            self.assertEqual(frames["score"].tolist(), [e[0][5] for e in expected[100:200]])
+            self.assertTrue(np.allclose(frames["dt"], 1 / 60))
+            leaves = reader.leaves(100, 200)
+            self.assertEqual(len(leaves), int(frames["leaves"].sum()))
+            self.assertEqual(leaves["x"].tolist(), [_f32(x) for e in expected[100:200] for x in e[1][0]])
+            # both are views onto the file, not copies
+            self.assertFalse(frames.flags.owndata or leaves.flags.owndata)
+            self.assertEqual(len(reader.leaves(5, 5)), 0)
+
+    def test_views_survive_close(self):
+        with gt.TelemetryWriter(self.path) as writer:
+            expected = _play(writer, frames=100)
+        reader = gt.TelemetryReader(self.path)
+        record, leaves = reader.frame(50)
+        reader.close()
+        self.assertEqual(record["score"], expected[50][0][5])
+        self.assertEqual(len(leaves), len(expected[50][1][0]))
+
+    def test_unclosed_file_is_readable(self):
+        writer = gt.TelemetryWriter(self.path, buffer_size=1)  # every frame reaches the files
+        expected = _play(writer, frames=300)
+        writer._file.flush()
+        writer._frame_file.flush()
+        with open(gt.frames_path(self.path), "ab") as f:
+            f.write(b"\0" * 20)  # a frame record torn off midway
+        with gt.TelemetryReader(self.path) as reader:
+            self.assertFalse(reader.complete)
+            self.assertEqual(len(reader), len(expected))
+            self.assertFrame(reader, len(expected) - 1, expected[-1])
+        writer.close()
+        os.truncate(self.path, 32)
+        with open(self.path, "r+b") as f:
+            f.write(struct.pack("<8sHHIQQ", gt.MAGIC, 40, 16, 0, 0, 0))
+        with self.assertRaises(ValueError):
+            gt.TelemetryReader(self.path)  # unfinished, and the side file is gone
+
+    def test_leaf_pool_writes_the_same_frames(self):
+        other = self.path + ".pool"
+        with gt.TelemetryWriter(self.path) as writer:
+            _play(writer, seed=4, frames=800)
+        with gt.TelemetryWriter(other) as writer:
+            _play(writer, seed=4, frames=800, leaf_pool=LeafPool())
+        with open(self.path, "rb") as a, open(other, "rb") as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_rejects_other_files(self):
+        for data in (b"", b"GRAFREC1" + b"\0" * 40):
+            with open(self.path, "wb") as f:
+                f.write(data)
+            with self.assertRaises(ValueError):
+                gt.TelemetryReader(self.path)
+
+    def test_command_line(self):
+        state = sim.GameState(seed=5)
+        recording = Recording(5)
+        stepper = sim.FixedStepper(recording=recording)
+        for _ in range(120):
+            stepper.advance(state, zigzag(state), 1 / 60)
+        rec_path = self.path + ".grec"
+        recording.save(rec_path)
+        out = StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(gt.main([self.path, "--from-recording", rec_path]), 0)
+            self.assertEqual(gt.main([self.path, "--frame", "-1"]), 0)
+        text = out.getvalue()
+        self.assertIn(f"wrote {len(recording)} frames", text)
+        self.assertIn(f"{len(recording)} frames at {recording.hz} Hz", text)
+        self.assertIn(f"score={state.score}", text)
+
+
+if __name__ == "__main__":
+    unittest.main()